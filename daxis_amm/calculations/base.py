@@ -4,6 +4,7 @@ import dataclasses as _dc
 
 from toolz import pipe as _pipe
 
+from daxis_amm.graphs.base import run_sync as _run_sync
 from daxis_amm.positions.base import BasePosition as _BasePosition
 
 
@@ -14,9 +15,13 @@ class BaseCalculator(_abc.ABC):
     "Abstract Method for Calculations."
 
     @_abc.abstractmethod
-    def get_data(self):
+    async def aget_data(self):
         "Get data for the calculator from a graph class."
 
+    def get_data(self):
+        "Get data for the calculator from a graph class, blocking until it has been fetched."
+        return _run_sync(self.aget_data())
+
     @_abc.abstractmethod
     def stage_data(self, data):
         "Stage data the data which will be used in in the calculation."
@@ -28,3 +33,7 @@ class BaseCalculator(_abc.ABC):
     def run(self):
         "Run all of the components in the calculator and return the result."
         return _pipe(self.get_data(), self.stage_data, self.calculation)
+
+    async def arun(self):
+        "Run all of the components in the calculator and return the result, without blocking the event loop."
+        return _pipe(await self.aget_data(), self.stage_data, self.calculation)
@@ -1,14 +1,93 @@
 """
 Module defining Montecarlo calculations.
 """
+import copy as _copy
+import itertools as _itertools
+import multiprocessing as _multiprocessing
+import time as _time
 import typing as _tp
+import warnings as _warnings
+from concurrent.futures import ProcessPoolExecutor as _ProcessPoolExecutor
 
 import numpy as _np
 import pandas as _pd
 
+from daxis_amm.calculations.paths import PathCache as _PathCache
+from daxis_amm.calculations.stats import RunningStats as _RunningStats
+
+SAMPLERS = ("pseudo", "sobol")
+
+
+def brownian_bridge(normals: _np.ndarray) -> _np.ndarray:
+    """
+    Turn standard normals into unit-step Brownian increments with a Brownian bridge.
+
+    The first normal sets the terminal value, the next ones the midpoints of ever smaller intervals, so the
+    leading (best distributed) quasi-random dimensions drive the coarse shape of each path.
+
+    :param normals: Standard normals of shape (num_increments, num_paths).
+    :type normals: numpy.ndarray
+    :return: Standard normal increments of the same shape.
+    :rtype: numpy.ndarray
+    """
+    steps = normals.shape[0]
+    path = _np.zeros((steps + 1,) + normals.shape[1:])
+    path[steps] = _np.sqrt(steps) * normals[0]
+    intervals, dimension = [(0, steps)], 1
+    while intervals:
+        left, right = intervals.pop(0)
+        if right - left < 2:
+            continue
+        middle = (left + right) // 2
+        path[middle] = ((right - middle) * path[left] + (middle - left) * path[right]) / (right - left)
+        path[middle] += _np.sqrt((middle - left) * (right - middle) / (right - left)) * normals[dimension]
+        dimension += 1
+        intervals += [(left, middle), (middle, right)]
+    return _np.diff(path, axis=0)
+
+
+# Function, batch simulator, arguments and shared result block of the batches run by a worker process.
+_WORKER: dict = {}
+
+
+def _init_worker(func: _tp.Callable, simulator: "MonteCarlo", args: tuple, buffer: _tp.Any, shape: _tp.Tuple[int, ...]):
+    "Store the batch function and a view of the shared result block in a worker process."
+    _WORKER.update(func=func, simulator=simulator, args=args, block=_np.frombuffer(buffer, dtype=_np.float64).reshape(shape))
+
+
+def _run_batch(slot: int, batch: int):
+    "Run a batch in a worker process, writing the result into its slot of the shared result block."
+    _WORKER["block"][slot] = _WORKER["func"](_WORKER["simulator"], batch, *_WORKER["args"])
+
 
 class MonteCarlo:
-    def __init__(self, num_steps: int = 24, num_sims: int = 10000, seed: _tp.Optional[int] = None):
+    """
+    Monte Carlo simulator of price paths.
+
+    Variance reduction is opt-in: antithetic variates pair every path with its mirror image, the control
+    variate regresses estimates on the deviation of the terminal price from its known expectation, and the
+    "sobol" sampler draws scrambled Sobol normals (requires scipy) arranged with a Brownian bridge.
+    """
+
+    def __init__(
+        self,
+        num_steps: int = 24,
+        num_sims: int = 10000,
+        seed: _tp.Optional[int] = None,
+        dtype: _tp.Any = _np.float64,
+        as_frame: bool = True,
+        antithetic: bool = False,
+        control_variate: bool = False,
+        sampler: str = "pseudo",
+        qmc_replicates: int = 8,
+        target_std_error: _tp.Optional[float] = None,
+        time_budget: _tp.Optional[float] = None,
+        max_sims: _tp.Optional[int] = None,
+        chunk_size: _tp.Optional[int] = None,
+        workers: _tp.Optional[int] = None,
+        cache: _tp.Optional[_PathCache] = None,
+        bridge: bool = False,
+    ):
         """
         Initialize a MonteCarlo object.
 
@@ -18,15 +97,364 @@ class MonteCarlo:
         :type num_sims: int
         :param seed: Random seed for reproducibility. Default is None.
         :type seed: Optional[int]
+        :param dtype: dtype of the paths, np.float64 or np.float32. Default is np.float64.
+        :type dtype: Any
+        :param as_frame: Return the paths as a DataFrame, otherwise as an ndarray. Default is True.
+        :type as_frame: bool
+        :param antithetic: Simulate the second half of the paths from the negated shocks of the first half. Default
+            is False.
+        :type antithetic: bool
+        :param control_variate: Use the terminal price as a control variate in estimate. Default is False.
+        :type control_variate: bool
+        :param sampler: "pseudo" for pseudo-random or "sobol" for scrambled Sobol normals. Default is "pseudo".
+        :type sampler: str
+        :param qmc_replicates: Number of independently scrambled Sobol blocks the standard error is measured
+            across. Default is 8.
+        :type qmc_replicates: int
+        :param target_std_error: Adaptive mode: simulate batches of num_sims paths until the standard error of the
+            estimate is at most this. Default is None.
+        :type target_std_error: Optional[float]
+        :param time_budget: Adaptive mode: stop simulating new batches after this many seconds. Default is None.
+        :type time_budget: Optional[float]
+        :param max_sims: Adaptive mode: maximum number of paths. Default is None for 100 batches.
+        :type max_sims: Optional[int]
+        :param chunk_size: Streaming mode: simulate and value the paths in chunks of this many paths, keeping only
+            running aggregates. Default is None.
+        :type chunk_size: Optional[int]
+        :param workers: Number of processes the batches of the adaptive and streaming modes are spread across.
+            Results do not depend on the number of workers. Default is None for the current process.
+        :type workers: Optional[int]
+        :param cache: Cache of the paths of a seeded simulator, shared by every position simulated with the same
+            parameters. Default is None.
+        :type cache: Optional[PathCache]
+        :param bridge: Value path dependent quantities over the Brownian bridge between the steps instead of at the
+            steps only. Default is False.
+        :type bridge: bool
+        :raises ValueError: If the sampler is unknown, the paths cannot be split into chunks, pairs or replicates or
+            workers are set without batches to spread.
         """
+        if sampler not in SAMPLERS:
+            raise ValueError(f"sampler must be one of {SAMPLERS}")
+        if workers is not None and workers < 1:
+            raise ValueError("workers must be positive")
+        if (workers or 1) > 1 and chunk_size is None and target_std_error is None and time_budget is None:
+            raise ValueError("workers require chunk_size or an adaptive mode")
+        if chunk_size is not None and (chunk_size < 1 or num_sims % chunk_size):
+            raise ValueError(f"{num_sims} paths cannot be split into chunks of {chunk_size}")
+        batch_size = num_sims if chunk_size is None else chunk_size
+        base_sims = batch_size // 2 if antithetic else batch_size
+        if antithetic and batch_size % 2:
+            raise ValueError("num_sims and chunk_size must be even for antithetic variates")
+        if sampler == "sobol" and base_sims % qmc_replicates:
+            raise ValueError(f"{base_sims} base paths cannot be split into {qmc_replicates} Sobol replicates")
+
         self.num_steps = num_steps
         self.num_sims = num_sims
         self.seed = seed
+        self.dtype = dtype
+        self.as_frame = as_frame
+        self.antithetic = antithetic
+        self.control_variate = control_variate
+        self.sampler = sampler
+        self.qmc_replicates = qmc_replicates
+        self.target_std_error = target_std_error
+        self.time_budget = time_budget
+        self.max_sims = max_sims
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.cache = cache
+        self.bridge = bridge
+
+    @property
+    def adaptive(self) -> bool:
+        "Evaluate if batches are simulated until a target standard error or time budget is reached."
+        return self.target_std_error is not None or self.time_budget is not None
+
+    @property
+    def streaming(self) -> bool:
+        "Evaluate if paths are valued in chunks of which only running aggregates are kept."
+        return self.chunk_size is not None
+
+    @property
+    def batch_size(self) -> int:
+        "Number of paths simulated at once, chunk_size in streaming mode and num_sims otherwise."
+        return self.num_sims if self.chunk_size is None else self.chunk_size
+
+    @property
+    def max_batches(self) -> int:
+        "Maximum number of batches of batch_size paths, num_sims paths in total unless adaptive."
+        if not self.adaptive:
+            return self.num_sims // self.batch_size
+        max_sims = 100 * self.num_sims if self.max_sims is None else self.max_sims
+        return max(1, max_sims // self.batch_size)
+
+    def converged(self, stats: _RunningStats, started: float) -> bool:
+        """
+        Evaluate if an adaptive simulation can stop simulating batches.
+
+        :param stats: Running statistics of the estimate.
+        :type stats: RunningStats
+        :param started: time.monotonic() at the start of the simulation.
+        :type started: float
+        :return: True once the target standard error is reached or the time budget is spent.
+        :rtype: bool
+        """
+        if self.target_std_error is not None and stats.std_error <= self.target_std_error:
+            return True
+        return self.time_budget is not None and _time.monotonic() - started >= self.time_budget
+
+    def batch_simulator(self) -> "MonteCarlo":
+        """
+        Get a simulator of a single batch of batch_size paths.
+
+        Batch b of this simulator is batch b of the batch_size paths sharing the seed, antithetic pairs and Sobol
+        replicates of the simulator.
+
+        :return: The batch simulator.
+        :rtype: MonteCarlo
+        """
+        if not self.streaming:
+            return self
+        return MonteCarlo(
+            num_steps=self.num_steps,
+            num_sims=self.chunk_size,
+            seed=self.seed,
+            dtype=self.dtype,
+            as_frame=self.as_frame,
+            antithetic=self.antithetic,
+            control_variate=self.control_variate,
+            sampler=self.sampler,
+            qmc_replicates=self.qmc_replicates,
+            cache=self.cache,
+            bridge=self.bridge,
+        )
+
+    def rng(self, batch: int = 0, stream: int = 0) -> _np.random.Generator:
+        """
+        Get a random number generator for one simulation.
 
-    def sim(self, current_price: float, r: float, vol: float, T: float) -> _pd.DataFrame:
+        A seeded simulator gives the same paths on every call of the same batch and stream; the global NumPy random
+        state is never touched. Batch 0 draws from the seed and batch b from the b-th child of
+        SeedSequence(seed).spawn, so batches are independent streams wherever they are simulated. Every asset
+        simulated in a batch uses its own stream, stream s > 0 of batch b drawing from the child with spawn key
+        (b, s), so the assets are independent as well.
+
+        :param batch: Index of the batch of paths. Default is 0.
+        :type batch: int
+        :param stream: Index of the simulated asset within the batch. Default is 0.
+        :type stream: int
+        :return: The random number generator.
+        :rtype: numpy.random.Generator
+        """
+        if self.seed is None or (batch == 0 and stream == 0):
+            return _np.random.default_rng(self.seed)
+        spawn_key = (batch - 1,) if stream == 0 else (batch, stream)
+        return _np.random.default_rng(_np.random.SeedSequence(self.seed, spawn_key=spawn_key))
+
+    def map_batches(
+        self, func: _tp.Callable[..., _np.ndarray], batches: _tp.Iterable[int], width: int, *args: _tp.Any
+    ) -> _tp.Iterator[_np.ndarray]:
+        """
+        Run func(batch_simulator, batch, *args) for every batch, yielding the results in batch order.
+
+        With workers, the batches are run by a process pool in rounds of one batch per worker, the next round
+        running while the results of the current one are consumed. Each worker writes its (batch_size, width)
+        result into its slot of a shared memory block instead of pickling it back, and func and args are only
+        pickled once per worker. The paths of a batch depend on the seed and batch index only, so the
+        results are bit-identical for any number of workers. Close the iterator to stop early.
+
+        :param func: Module level function returning a float array of shape (batch_size, width).
+        :type func: Callable[..., numpy.ndarray]
+        :param batches: Indices of the batches.
+        :type batches: Iterable[int]
+        :param width: Number of values per path.
+        :type width: int
+        :param args: Further arguments of func.
+        :type args: Any
+        :return: The results of the batches.
+        :rtype: Iterator[numpy.ndarray]
+        """
+        simulator = _copy.copy(self.batch_simulator())
+        if not self.workers or self.workers == 1:
+            for batch in batches:
+                yield _np.asarray(func(simulator, batch, *args), dtype=_np.float64)
+            return
+
+        if simulator.seed is None:
+            # Workers have to share one seed for their batches to be independent streams. Only the local copy is
+            # seeded, the simulator of the caller stays unseeded.
+            simulator.seed = _np.random.SeedSequence().entropy
+        # Two rounds of slots, so workers simulate the next round while the current one is consumed.
+        shape = (2 * self.workers, simulator.num_sims, width)
+        buffer = _multiprocessing.RawArray("d", int(_np.prod(shape)))
+        block = _np.frombuffer(buffer, dtype=_np.float64).reshape(shape)
+        batches = iter(batches)
+        with _ProcessPoolExecutor(
+            self.workers, initializer=_init_worker, initargs=(func, simulator, args, buffer, shape)
+        ) as pool:
+
+            def submit(offset: int) -> _tp.List[_tp.Any]:
+                round_batches = _itertools.islice(batches, self.workers)
+                return [pool.submit(_run_batch, offset + slot, batch) for slot, batch in enumerate(round_batches)]
+
+            offset, futures = 0, submit(0)
+            while futures:
+                for future in futures:
+                    future.result()
+                next_offset = self.workers - offset
+                next_futures = submit(next_offset)
+                for slot in range(offset, offset + len(futures)):
+                    yield block[slot].copy()
+                offset, futures = next_offset, next_futures
+
+    def sim(
+        self,
+        current_price: float,
+        r: float,
+        vol: float,
+        T: float,
+        out: _tp.Optional[_np.ndarray] = None,
+        batch: int = 0,
+        stream: int = 0,
+    ) -> _tp.Union[_pd.DataFrame, _np.ndarray]:
         """
         Run a Monte Carlo simulation.
 
+        Every shock is drawn at once and the paths are built with a cumulative product along the steps. The paths
+        of a seeded simulator with a cache are simulated once and then returned read-only from the cache.
+
+        :param current_price: Current price of the asset.
+        :type current_price: float
+        :param r: Risk-free interest rate.
+        :type r: float
+        :param vol: Volatility of the asset.
+        :type vol: float
+        :param T: Time period of the simulation.
+        :type T: float
+        :param out: Buffer of shape (num_steps, num_sims) to write the paths into. Default is None.
+        :type out: Optional[numpy.ndarray]
+        :param batch: Index of the batch of paths, each batch is independent. Default is 0.
+        :type batch: int
+        :param stream: Index of the simulated asset within the batch, each stream is independent. Default is 0.
+        :type stream: int
+        :return: The simulated paths, one column per simulation.
+        :rtype: Union[pandas.DataFrame, numpy.ndarray]
+        :raises ValueError: If out does not have the shape (num_steps, num_sims) or a float dtype.
+        """
+        key = None
+        if out is None and self.cache is not None and self.seed is not None:
+            key = self.cache_key(current_price, r, vol, T, batch, stream)
+            out = self.cache.get(key)
+            if out is not None:
+                return _pd.DataFrame(out, copy=False) if self.as_frame else out
+
+        if out is None:
+            out = _np.empty((self.num_steps, self.num_sims), dtype=self.dtype)
+        elif out.shape != (self.num_steps, self.num_sims) or out.dtype not in (_np.float32, _np.float64):
+            raise ValueError(f"out must be a float32 or float64 array of shape {(self.num_steps, self.num_sims)}")
+
+        delta_t = T / self.num_steps
+        shocks = out[1:]
+        self.normals(shocks, batch, stream)
+        shocks *= vol * _np.sqrt(delta_t)
+        shocks += 1 + r * delta_t
+        out[0] = current_price
+        _np.multiply.accumulate(out, axis=0, out=out)
+        if key is not None:
+            out = self.cache.put(key, out)
+
+        return _pd.DataFrame(out, copy=False) if self.as_frame else out
+
+    def cache_key(self, current_price: float, r: float, vol: float, T: float, batch: int = 0, stream: int = 0) -> tuple:
+        """
+        Get the key of simulated paths in a PathCache.
+
+        The key holds every input the paths depend on, so positions simulated with the same parameters (e.g. on the
+        same pool and value date) share their paths.
+
+        :param current_price: Current price of the asset.
+        :type current_price: float
+        :param r: Risk-free interest rate.
+        :type r: float
+        :param vol: Volatility of the asset.
+        :type vol: float
+        :param T: Time period of the simulation.
+        :type T: float
+        :param batch: Index of the batch of paths. Default is 0.
+        :type batch: int
+        :param stream: Index of the simulated asset within the batch. Default is 0.
+        :type stream: int
+        :return: The key.
+        :rtype: tuple
+        """
+        sampler = (self.sampler, self.qmc_replicates) if self.sampler == "sobol" else (self.sampler,)
+        settings = (self.num_steps, self.num_sims, self.seed, _np.dtype(self.dtype).str, self.antithetic) + sampler
+        return settings + (batch, stream, float(current_price), float(r), float(vol), float(T))
+
+    def normals(self, out: _np.ndarray, batch: int = 0, stream: int = 0):
+        """
+        Fill an array of shape (num_steps - 1, num_sims) with the standard normal shocks of the paths.
+
+        :param out: The array to fill.
+        :type out: numpy.ndarray
+        :param batch: Index of the batch of paths. Default is 0.
+        :type batch: int
+        :param stream: Index of the simulated asset within the batch. Default is 0.
+        :type stream: int
+        """
+        rng = self.rng(batch, stream)
+        base = out[:, : out.shape[1] // 2] if self.antithetic else out
+
+        if self.sampler == "sobol":
+            base[...] = self._sobol_normals(rng, base.shape)
+        elif base.flags.c_contiguous:
+            rng.standard_normal(base.shape, dtype=out.dtype, out=base)
+        else:
+            base[...] = rng.standard_normal(base.shape, dtype=out.dtype)
+
+        if self.antithetic:
+            _np.negative(base, out=out[:, base.shape[1] :])
+
+    def _sobol_normals(self, rng: _np.random.Generator, shape: _tp.Tuple[int, int]) -> _np.ndarray:
+        "Scrambled Sobol normals, one independently scrambled block of paths per replicate, bridged over the steps."
+        try:
+            from scipy.stats import norm as _norm
+            from scipy.stats import qmc as _qmc
+        except ImportError as err:
+            raise ImportError("The sobol sampler requires scipy, install it with pip install scipy") from err
+
+        steps, paths = shape
+        if steps == 0:
+            return _np.empty(shape)
+        blocks = []
+        with _warnings.catch_warnings():
+            # Sobol points are best balanced in powers of 2, any block size is still valid.
+            _warnings.simplefilter("ignore", UserWarning)
+            for _ in range(self.qmc_replicates):
+                sobol = _qmc.Sobol(steps, scramble=True, seed=rng)
+                blocks.append(sobol.random(paths // self.qmc_replicates))
+        uniforms = _np.clip(_np.concatenate(blocks).T, 1e-12, 1 - 1e-12)
+        return brownian_bridge(_norm.ppf(uniforms))
+
+    def expected_terminal(self, current_price: float, r: float, T: float) -> float:
+        """
+        Get the expected terminal price of the simulated paths.
+
+        :param current_price: Current price of the asset.
+        :type current_price: float
+        :param r: Risk-free interest rate.
+        :type r: float
+        :param T: Time period of the simulation.
+        :type T: float
+        :return: The expected price at the last step.
+        :rtype: float
+        """
+        return current_price * (1 + r * T / self.num_steps) ** (self.num_steps - 1)
+
+    def lognormal_params(self, current_price: float, r: float, vol: float, T: float) -> _tp.Tuple[_np.ndarray, _np.ndarray]:
+        """
+        Get the lognormal distribution matching the mean and variance of the price at every step of the paths.
+
         :param current_price: Current price of the asset.
         :type current_price: float
         :param r: Risk-free interest rate.
@@ -35,18 +463,103 @@ class MonteCarlo:
         :type vol: float
         :param T: Time period of the simulation.
         :type T: float
-        :return: DataFrame containing the simulation results.
-        :rtype: pandas.DataFrame
+        :return: Mean and standard deviation of the log price at every step, shape (num_steps,).
+        :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+        """
+        delta_t = T / self.num_steps
+        growth = 1 + r * delta_t
+        steps = _np.arange(self.num_steps)
+        variance = steps * _np.log1p(vol**2 * delta_t / growth**2)
+        return _np.log(current_price) + steps * _np.log(growth) - variance / 2, _np.sqrt(variance)
+
+    def step_variance(self, r: float, vol: float, T: float) -> float:
         """
-        if self.seed is not None:
-            _np.random.seed(self.seed)
+        Get the variance of the log price change over one step.
 
+        :param r: Risk-free interest rate.
+        :type r: float
+        :param vol: Volatility of the asset.
+        :type vol: float
+        :param T: Time period of the simulation.
+        :type T: float
+        :return: The variance of the log price change.
+        :rtype: float
+        """
         delta_t = T / self.num_steps
-        simulations = _np.zeros((self.num_steps, self.num_sims))
-        simulations[0] = current_price
+        return float(_np.log1p(vol**2 * delta_t / (1 + r * delta_t) ** 2))
+
+    def bridge_marginal(
+        self, paths: _tp.Any, r: float, vol: float, T: float, fraction: float
+    ) -> _tp.Tuple[_np.ndarray, _np.ndarray]:
+        """
+        Get the distribution of the log price part way through every step, given the prices at the steps.
+
+        Between two steps the log price is taken to follow a Brownian bridge, so at a fraction u of the step it is
+        normal with the interpolated mean and variance u (1 - u) step_variance.
+
+        :param paths: Simulated paths of shape (num_steps, num_sims).
+        :type paths: ArrayLike
+        :param r: Risk-free interest rate.
+        :type r: float
+        :param vol: Volatility of the asset.
+        :type vol: float
+        :param T: Time period of the simulation.
+        :type T: float
+        :param fraction: Fraction u of the step between 0 and 1.
+        :type fraction: float
+        :return: Mean and standard deviation of the log price, shape (num_steps - 1, num_sims).
+        :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+        """
+        log_paths = _np.log(_np.asarray(paths, dtype=_np.float64))
+        mean = (1 - fraction) * log_paths[:-1] + fraction * log_paths[1:]
+        std = _np.sqrt(fraction * (1 - fraction) * self.step_variance(r, vol, T))
+        return mean, _np.full(mean.shape, std)
+
+    def samples(
+        self, values: _tp.Any, control: _tp.Optional[_tp.Any] = None
+    ) -> _tp.Tuple[_np.ndarray, _tp.Optional[_np.ndarray]]:
+        """
+        Reduce per path values to independent samples.
 
-        for i in range(0, self.num_steps - 1):
-            w = _np.random.standard_normal(self.num_sims)
-            simulations[i + 1] = simulations[i] * (1 + r * delta_t + vol * _np.sqrt(delta_t) * w)
+        Values are laid out in batches of num_sims paths. Within a batch antithetic pairs are averaged and Sobol
+        paths are averaged per scrambled replicate.
 
-        return _pd.DataFrame(simulations)
+        :param values: One value per simulated path, in path order.
+        :type values: ArrayLike
+        :param control: Per path deviation of the control from its known expectation. Default is None.
+        :type control: Optional[ArrayLike]
+        :return: The independent samples and their controls (None unless control_variate is set).
+        :rtype: Tuple[numpy.ndarray, Optional[numpy.ndarray]]
+        """
+        arrays = [_np.asarray(values, dtype=_np.float64)]
+        if control is not None and self.control_variate:
+            arrays.append(_np.asarray(control, dtype=_np.float64))
+
+        reduced = []
+        for array in arrays:
+            batches = array.reshape(-1, self.num_sims) if len(array) % self.num_sims == 0 else array.reshape(1, -1)
+            if self.antithetic:
+                half = batches.shape[1] // 2
+                batches = (batches[:, :half] + batches[:, half:]) / 2
+            if self.sampler == "sobol":
+                batches = batches.reshape(len(batches), self.qmc_replicates, -1).mean(axis=2)
+            reduced.append(batches.ravel())
+
+        return reduced[0], (reduced[1] if len(reduced) > 1 else None)
+
+    def estimate(self, values: _tp.Any, control: _tp.Optional[_tp.Any] = None) -> _tp.Tuple[float, float]:
+        """
+        Estimate the expectation of per path values and its standard error.
+
+        The control (per path deviation of the terminal price from expected_terminal) is regressed out when
+        control_variate is set; see samples for antithetic and Sobol paths.
+
+        :param values: One value per simulated path, in path order.
+        :type values: ArrayLike
+        :param control: Per path deviation of the control from its known expectation. Default is None.
+        :type control: Optional[ArrayLike]
+        :return: The estimate and its standard error.
+        :rtype: Tuple[float, float]
+        """
+        stats = _RunningStats().update(*self.samples(values, control))
+        return stats.mean, stats.std_error
@@ -0,0 +1,123 @@
+"""
+Module defining the cache of simulated price paths.
+"""
+import collections as _collections
+import hashlib as _hashlib
+import os as _os
+import threading as _threading
+import typing as _tp
+
+import numpy as _np
+
+
+class PathCache:
+    """
+    Cache of simulated path matrices, shared by every position simulated with the same parameters.
+
+    Paths are kept in memory and the least recently used are evicted beyond max_bytes. When a directory is given
+    every matrix is also written to a .npy file there, which is memory-mapped read-only on a miss, so evicted
+    paths are not simulated again and worker processes map the paths instead of receiving copies.
+
+    Cached matrices are read-only.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 2**20, directory: _tp.Optional[str] = None):
+        """
+        Initialize a PathCache object.
+
+        :param max_bytes: Maximum size of the paths held in memory. Default is 512 MiB.
+        :type max_bytes: int
+        :param directory: Directory of the memory-mapped path files. Default is None for an in-memory cache.
+        :type directory: Optional[str]
+        """
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries: _tp.OrderedDict[tuple, _np.ndarray] = _collections.OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = _threading.Lock()
+        if directory is not None:
+            _os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getstate__(self) -> dict:
+        # Worker processes only receive the settings and map the path files of the directory.
+        state = self.__dict__.copy()
+        state.update(entries=_collections.OrderedDict(), nbytes=0, _lock=None)
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state, _lock=_threading.Lock())
+
+    def path(self, key: tuple) -> str:
+        """
+        Get the file of the paths of a key.
+
+        :param key: The key of the paths.
+        :type key: tuple
+        :return: The path of the .npy file in the directory.
+        :rtype: str
+        """
+        return _os.path.join(self.directory, _hashlib.sha1(repr(key).encode()).hexdigest() + ".npy")
+
+    def get(self, key: tuple) -> _tp.Optional[_np.ndarray]:
+        """
+        Get cached paths.
+
+        :param key: The key of the paths.
+        :type key: tuple
+        :return: The read-only paths, None if they are not cached.
+        :rtype: Optional[numpy.ndarray]
+        """
+        with self._lock:
+            paths = self.entries.get(key)
+            if paths is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return paths
+
+        if self.directory is not None and _os.path.exists(self.path(key)):
+            paths = _np.load(self.path(key), mmap_mode="r")
+            with self._lock:
+                self.hits += 1
+            return paths
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: tuple, paths: _np.ndarray) -> _np.ndarray:
+        """
+        Cache paths.
+
+        :param key: The key of the paths.
+        :type key: tuple
+        :param paths: The paths, which must not be modified afterwards.
+        :type paths: numpy.ndarray
+        :return: The read-only paths.
+        :rtype: numpy.ndarray
+        """
+        paths.flags.writeable = False
+        if self.directory is not None and not _os.path.exists(self.path(key)):
+            temporary = f"{self.path(key)}.{_os.getpid()}.tmp"
+            with open(temporary, "wb") as path_file:
+                _np.save(path_file, paths)
+            _os.replace(temporary, self.path(key))
+
+        with self._lock:
+            if key not in self.entries and paths.nbytes <= self.max_bytes:
+                self.entries[key] = paths
+                self.nbytes += paths.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+        return paths
+
+    def clear(self):
+        "Remove every path held in memory, the files of the directory are kept."
+        with self._lock:
+            self.entries.clear()
+            self.nbytes = 0
@@ -0,0 +1,250 @@
+"""
+Module defining streaming statistics for Monte Carlo estimates.
+"""
+import math as _m
+import typing as _tp
+
+import numpy as _np
+import pandas as _pd
+
+
+class RunningStats:
+    """
+    Running mean and standard error of iid samples, optionally adjusted by a zero-mean control variate.
+
+    Batches are merged with the parallel (Chan et al.) update of the mean and co-moments, so estimates are exact
+    and numerically stable however the samples are split into batches.
+    """
+
+    def __init__(self):
+        "Initialize an empty RunningStats object."
+        self.count = 0
+        self.mean_x = 0.0
+        self.mean_c = 0.0
+        self.m2_x = 0.0
+        self.m2_c = 0.0
+        self.co_xc = 0.0
+
+    def update(self, values: _tp.Any, controls: _tp.Optional[_tp.Any] = None) -> "RunningStats":
+        """
+        Add a batch of samples.
+
+        :param values: The samples.
+        :type values: ArrayLike
+        :param controls: Per sample deviation of the control variate from its known expectation. Default is None.
+        :type controls: Optional[ArrayLike]
+        :return: The updated RunningStats object.
+        :rtype: RunningStats
+        """
+        values = _np.asarray(values, dtype=_np.float64).ravel()
+        controls = _np.zeros_like(values) if controls is None else _np.asarray(controls, dtype=_np.float64).ravel()
+        count = len(values)
+        if count == 0:
+            return self
+
+        mean_x, mean_c = values.mean(), controls.mean()
+        m2_x = ((values - mean_x) ** 2).sum()
+        m2_c = ((controls - mean_c) ** 2).sum()
+        co_xc = ((values - mean_x) * (controls - mean_c)).sum()
+
+        total = self.count + count
+        delta_x, delta_c = mean_x - self.mean_x, mean_c - self.mean_c
+        self.m2_x += m2_x + delta_x**2 * self.count * count / total
+        self.m2_c += m2_c + delta_c**2 * self.count * count / total
+        self.co_xc += co_xc + delta_x * delta_c * self.count * count / total
+        self.mean_x += delta_x * count / total
+        self.mean_c += delta_c * count / total
+        self.count = total
+        return self
+
+    @property
+    def beta(self) -> float:
+        "Regression coefficient of the samples on the control, 0 without a control."
+        return self.co_xc / self.m2_c if self.m2_c > 0 else 0.0
+
+    @property
+    def mean(self) -> float:
+        "Estimate of the expectation of the samples."
+        return self.mean_x - self.beta * self.mean_c
+
+    @property
+    def std_error(self) -> float:
+        "Standard error of the estimate, NaN for fewer than two samples."
+        if self.count < 2:
+            return float("nan")
+        residual = max(self.m2_x - self.beta * self.co_xc, 0.0)
+        return _m.sqrt(residual / (self.count - 1) / self.count)
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative accuracy (DDSketch).
+
+    Values are counted in logarithmically sized buckets, so memory grows with the logarithm of the value range
+    rather than the number of values and every quantile is within relative_accuracy of an exact one.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-9):
+        """
+        Initialize a QuantileSketch object.
+
+        :param relative_accuracy: Relative accuracy of the quantiles. Default is 0.01.
+        :type relative_accuracy: float
+        :param min_value: Values with a smaller magnitude are counted as zero. Default is 1e-9.
+        :type min_value: float
+        """
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = _m.log(self.gamma)
+        self.positive: _tp.Dict[int, int] = {}
+        self.negative: _tp.Dict[int, int] = {}
+        self.zeros = 0
+
+    @property
+    def count(self) -> int:
+        "Number of values added to the sketch."
+        return sum(self.positive.values()) + sum(self.negative.values()) + self.zeros
+
+    @staticmethod
+    def _add(store: _tp.Dict[int, int], keys: _np.ndarray):
+        "Add bucket counts to a store."
+        for key, count in zip(*_np.unique(keys, return_counts=True)):
+            store[int(key)] = store.get(int(key), 0) + int(count)
+
+    def update(self, values: _tp.Any) -> "QuantileSketch":
+        """
+        Add values to the sketch.
+
+        :param values: The values, NaN values are ignored.
+        :type values: ArrayLike
+        :return: The updated QuantileSketch object.
+        :rtype: QuantileSketch
+        """
+        values = _np.asarray(values, dtype=_np.float64).ravel()
+        values = values[~_np.isnan(values)]
+        magnitude = _np.abs(values)
+        significant = magnitude >= self.min_value
+        self.zeros += int((~significant).sum())
+        keys = _np.ceil(_np.log(magnitude[significant]) / self._log_gamma).astype(_np.int64)
+        self._add(self.positive, keys[values[significant] > 0])
+        self._add(self.negative, keys[values[significant] < 0])
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """
+        Add the values of a sketch with the same relative accuracy.
+
+        :param other: The sketch to merge.
+        :type other: QuantileSketch
+        :return: The updated QuantileSketch object.
+        :rtype: QuantileSketch
+        :raises ValueError: If the sketches have different relative accuracies.
+        """
+        if other.gamma != self.gamma:
+            raise ValueError("Only sketches with the same relative accuracy can be merged")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zeros += other.zeros
+        return self
+
+    def histogram(self) -> _tp.Tuple[_np.ndarray, _np.ndarray]:
+        """
+        Get the buckets of the sketch in ascending order.
+
+        :return: Representative value and count of each non-empty bucket.
+        :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+        """
+        negative_keys = sorted(self.negative, reverse=True)
+        positive_keys = sorted(self.positive)
+        scale = 2 / (1 + self.gamma)
+        values = (
+            [-scale * self.gamma**key for key in negative_keys]
+            + ([0.0] if self.zeros else [])
+            + [scale * self.gamma**key for key in positive_keys]
+        )
+        counts = (
+            [self.negative[key] for key in negative_keys]
+            + ([self.zeros] if self.zeros else [])
+            + [self.positive[key] for key in positive_keys]
+        )
+        return _np.array(values, dtype=_np.float64), _np.array(counts, dtype=_np.int64)
+
+    def quantile(self, q: _tp.Any) -> _np.ndarray:
+        """
+        Get quantiles of the values added to the sketch.
+
+        :param q: Quantiles between 0 and 1.
+        :type q: ArrayLike
+        :return: The estimated quantiles, NaN for an empty sketch.
+        :rtype: numpy.ndarray
+        """
+        values, counts = self.histogram()
+        q = _np.asarray(q, dtype=_np.float64)
+        if len(values) == 0:
+            return _np.full(q.shape, _np.nan)
+        ranks = q * (counts.sum() - 1)
+        return values[_np.searchsorted(_np.cumsum(counts), ranks, side="right")]
+
+
+class StreamingSummary:
+    """
+    Running mean, standard error and quantile sketch of several per path columns.
+
+    Only the aggregates are kept, so memory does not grow with the number of paths.
+    """
+
+    def __init__(self, columns: _tp.Iterable[str], relative_accuracy: float = 0.01):
+        """
+        Initialize a StreamingSummary object.
+
+        :param columns: Names of the summarized columns.
+        :type columns: Iterable[str]
+        :param relative_accuracy: Relative accuracy of the quantiles. Default is 0.01.
+        :type relative_accuracy: float
+        """
+        self.stats = {column: RunningStats() for column in columns}
+        self.sketches = {column: QuantileSketch(relative_accuracy) for column in columns}
+        self.paths = 0
+
+    def update(
+        self,
+        values: _tp.Mapping[str, _tp.Any],
+        samples: _tp.Mapping[str, _tp.Tuple[_np.ndarray, _tp.Optional[_np.ndarray]]],
+    ) -> "StreamingSummary":
+        """
+        Add a chunk of paths.
+
+        :param values: Per path values of every column, added to the quantile sketches.
+        :type values: Mapping[str, ArrayLike]
+        :param samples: Independent samples and controls of every column, added to the running statistics.
+        :type samples: Mapping[str, Tuple[numpy.ndarray, Optional[numpy.ndarray]]]
+        :return: The updated StreamingSummary object.
+        :rtype: StreamingSummary
+        """
+        for column, sketch in self.sketches.items():
+            sketch.update(values[column])
+            self.stats[column].update(*samples[column])
+        self.paths += len(values[next(iter(self.sketches))])
+        return self
+
+    def to_frame(self, quantiles: _tp.Sequence[float] = (0.01, 0.05, 0.5, 0.95, 0.99)) -> _pd.DataFrame:
+        """
+        Get the summary as a DataFrame.
+
+        :param quantiles: The reported quantiles. Default is (0.01, 0.05, 0.5, 0.95, 0.99).
+        :type quantiles: Sequence[float]
+        :return: One row per column with the mean, standard error and quantiles.
+        :rtype: pd.DataFrame
+        """
+        return _pd.DataFrame(
+            {
+                column: {
+                    "Mean": stats.mean,
+                    "Std Error": stats.std_error,
+                    **dict(zip((f"Q{q:g}" for q in quantiles), self.sketches[column].quantile(quantiles))),
+                }
+                for column, stats in self.stats.items()
+            }
+        ).T
@@ -4,6 +4,8 @@ Module defining the Uniswap V3 Deposit Amount Calculators.
 from dataclasses import dataclass as _dataclass
 from datetime import datetime as _dt
 
+import numpy as _np
+
 from daxis_amm.calculations.base import BaseCalculator as _BaseCalculator
 from daxis_amm.calculations.uniswap.v3 import utils as _utils
 from daxis_amm.graphs.uniswap.v3.graph import UniswapV3Graph as _UniswapV3Graph
@@ -21,7 +23,7 @@ class UniswapV3DepositAmountsCalculator(_BaseCalculator):
 
     date: int
 
-    def get_data(self) -> dict:
+    async def aget_data(self) -> dict:
         """Retrieves the necessary data for calculations.
 
         :return: Dictionary containing all necessary data for calculations
@@ -37,7 +39,7 @@ class UniswapV3DepositAmountsCalculator(_BaseCalculator):
             "pool_dynamic_data": _UniswapV3Graph.get_dynamic_pool_info(self.position.pool.id),
         }
 
-        return _UniswapV3Graph.run(funcs)
+        return await _UniswapV3Graph.gather(funcs)
 
     def stage_data(self, data: dict) -> dict:
         """Stages the data for calculation.
@@ -76,12 +78,16 @@ class UniswapV3DepositAmountsCalculator(_BaseCalculator):
 
         :param staged_data: Dictionary containing staged data for calculations
         :type staged_data: dict
-        :return: Tuple containing the calculated deposit amounts
+        :return: Tuple containing the calculated deposit amounts, arrays of the amounts of every range for a
+            position whose min and max percentages are arrays
         :rtype: tuple
         :raises ValueError: If either of the calculated amounts is below 0.0
         """
 
-        result = _utils.get_deposit_amounts(**staged_data)
-        if result[0] < 0.0 or result[1] < 0.0:
+        if _np.ndim(staged_data["price_low"]) == 0 and _np.ndim(staged_data["price_high"]) == 0:
+            result = _utils.get_deposit_amounts(**staged_data)
+        else:
+            result = _utils.get_deposit_amounts_array(**staged_data)
+        if _np.any(result[0] < 0.0) or _np.any(result[1] < 0.0):
             raise ValueError("Unable to calculate deposit amounts; either amount0 and amount1 is below 0.0")
         return result
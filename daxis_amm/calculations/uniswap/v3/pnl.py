@@ -1,12 +1,15 @@
 """
 Module defining the Uniswap V3 PnL Calculators.
 """
+import typing as _tp
 from dataclasses import dataclass as _dataclass
 
+import numpy as _np
 import pandas as _pd
 
 from daxis_amm.calculations.base import BaseCalculator as _BaseCalculator
 from daxis_amm.calculations.uniswap.v3 import utils as _utils
+from daxis_amm.calculations.uniswap.v3.ticks import TickLiquidityIndex as _TickLiquidityIndex
 from daxis_amm.calculations.uniswap.v3.deposit_amounts import (
     UniswapV3DepositAmountsCalculator as _UniswapV3DepositAmountsCalculator,
 )
@@ -28,9 +31,11 @@ class UniswapV3PnLCalculator(_BaseCalculator):
     start_date: int
     end_date: int
 
-    def get_data(self) -> dict:
+    async def aget_data(self) -> dict:
         """Retrieves the necessary data for calculations.
 
+        The deposit amounts are calculated once the pool data has been fetched, so they reuse it.
+
         :return: Dictionary containing all necessary data for calculations
         :rtype: dict
         """
@@ -43,7 +48,9 @@ class UniswapV3PnLCalculator(_BaseCalculator):
             "ticks_df": _UniswapV3Graph.get_pool_ticks_info(self.position.pool.id),
         }
 
-        return _UniswapV3Graph.run(funcs)
+        data = await _UniswapV3Graph.gather(funcs)
+        data["deposit_amounts"] = await _UniswapV3DepositAmountsCalculator(position=self.position, date=self.end_date).arun()
+        return data
 
     def stage_data(self, data: dict) -> dict:
         """Stages the data for calculation.
@@ -71,23 +78,16 @@ class UniswapV3PnLCalculator(_BaseCalculator):
         last_price = data["ohlc_hour_df"].loc[self.end_date]["Close"]
         usd_x = data["token0_hour_usd_price_df"].loc[self.end_date]["Close"]
 
-        amount0, amount1 = _UniswapV3DepositAmountsCalculator(position=self.position, date=self.end_date).run()
+        amount0, amount1 = data["deposit_amounts"]
 
         low = data["ohlc_hour_df"]["Low"].min()
         high = data["ohlc_hour_df"]["High"].max()
 
         tick_high = _utils.price_to_tick(high, self.position.pool.token_0.decimals, self.position.pool.token_1.decimals)
         tick_low = _utils.price_to_tick(low, self.position.pool.token_0.decimals, self.position.pool.token_1.decimals)
-        ticks = _utils.expand_ticks(
-            data["ticks_df"],
-            self.position.pool.token_0.decimals,
-            self.position.pool.token_1.decimals,
-            self.position.pool.fee_tier,
-        )
-        ticks = ticks[(ticks.index <= tick_low) & (ticks.index >= tick_high)]
-
-        average_liquidity = ticks.Liquidity.mean()
-        liquidity = _utils.calculate_liquidity(
+        tick_index = _TickLiquidityIndex.from_ticks(data["ticks_df"], self.position.pool.fee_tier)
+        average_liquidity = float(tick_index.range_mean(tick_high, tick_low))
+        liquidity = _utils.calculate_liquidity_array(
             amount0,
             amount1,
             self.position.pool.token_0.decimals,
@@ -115,14 +115,29 @@ class UniswapV3PnLCalculator(_BaseCalculator):
         :return: Series containing the calculated profit and loss data
         :rtype: pd.Series
         """
+        accrued_fees, sim_liq = self.range_values(staged_data)
+        accrued_fees, sim_liq = float(accrued_fees), float(sim_liq)
+        return _pd.Series(
+            {"Fees USD": accrued_fees, "Deposit Amounts USD": sim_liq, "PnL": (accrued_fees + sim_liq - self.position.amount)}
+        )
+
+    def range_values(self, staged_data: dict) -> _tp.Tuple[_np.ndarray, _np.ndarray]:
+        """Calculates the accrued fees and the deposit amounts of the ranges of the position.
+
+        :param staged_data: Dictionary containing staged data for calculations, whose liquidity and range prices may be
+            arrays of several ranges
+        :type staged_data: dict
+        :return: Fees USD and Deposit Amounts USD of every range
+        :rtype: Tuple[np.ndarray, np.ndarray]
+        """
         accrued_fees = staged_data["total_fees"] * (
             staged_data["liquidity"] / (staged_data["liquidity"] + staged_data["average_liquidity"])
         )
 
-        accrued_fees = 0.0 if _pd.isna(accrued_fees) else accrued_fees
+        accrued_fees = _np.where(_pd.isna(accrued_fees), 0.0, accrued_fees)
 
         # Calculate Imperminant Loss
-        x_delta, y_delta = _utils.amounts_delta(
+        x_delta, y_delta = _utils.amounts_delta_array(
             staged_data["liquidity"],
             staged_data["last_price"],
             staged_data["token_0_lowerprice"],
@@ -132,13 +147,162 @@ class UniswapV3PnLCalculator(_BaseCalculator):
         )
 
         # Convert to USD
-        if Stables.has_member_key(self.position.pool.token_0.symbol):
+        if _Stables.has_member_key(self.position.pool.token_0.symbol):
             sim_liq = x_delta + y_delta * staged_data["last_price"]
-        elif Stables.has_member_key(self.position.pool.token_1.symbol):
+        elif _Stables.has_member_key(self.position.pool.token_1.symbol):
             sim_liq = x_delta * 1 / staged_data["last_price"] + y_delta
         else:
             sim_liq = (x_delta + y_delta * staged_data["last_price"]) * staged_data["usd_x"]
 
-        return _pd.Series(
-            {"Fees USD": accrued_fees, "Deposit Amounts USD": sim_liq, "PnL": (accrued_fees + sim_liq - self.position.amount)}
+        return accrued_fees, sim_liq
+
+
+@_dataclass
+class UniswapV3PnLGridCalculator(UniswapV3PnLCalculator):
+    """UniswapV3PnLGridCalculator calculates the profit and loss of a grid of ranges of the LP.
+
+    The min and max percentages of the position are equally long arrays of the ranges of the grid. The pool data
+    is fetched once and the deposit amounts, liquidity and values of the ranges are broadcast over the grid.
+    """
+
+    def calculation(self, staged_data: dict) -> _pd.DataFrame:
+        """Calculates the profit and loss of every range based on the staged data.
+
+        :param staged_data: Dictionary containing staged data for calculations
+        :type staged_data: dict
+        :return: Dataframe containing the calculated profit and loss data of every range, indexed by its min and
+            max percentage
+        :rtype: pd.DataFrame
+        """
+        accrued_fees, sim_liq = self.range_values(staged_data)
+        index = _pd.MultiIndex.from_arrays(
+            [self.position.min_percentage, self.position.max_percentage], names=["Min Percentage", "Max Percentage"]
+        )
+        return _pd.DataFrame(
+            {"Fees USD": accrued_fees, "Deposit Amounts USD": sim_liq, "PnL": accrued_fees + sim_liq - self.position.amount},
+            index=index,
+        )
+
+
+@_dataclass
+class UniswapV3BacktestCalculator(UniswapV3PnLCalculator):
+    """UniswapV3BacktestCalculator calculates the profit and loss of the LP over many rolling windows.
+
+    The series of the whole backtest, from start_date to end_date, are fetched once and every window holding the
+    position from an entry date for the holding period is valued as UniswapV3PnLCalculator values it: the fees of a
+    window are read from the cumulative fees and its deposit amounts are calculated from the prices at its exit.
+    Windows missing the hour data of their entry or exit, or any day data, are left out.
+
+    :param entry_dates: Entry timestamps of the windows
+    :type entry_dates: Sequence[int]
+    :param holding_period: Seconds the position is held in every window
+    :type holding_period: int
+    """
+
+    entry_dates: _tp.Sequence[int]
+    holding_period: int
+
+    async def aget_data(self) -> dict:
+        """Retrieves the necessary data for calculations.
+
+        :return: Dictionary containing all necessary data for calculations
+        :rtype: dict
+        """
+        funcs = {
+            "token0_hour_usd_price_df": _UniswapV3Graph.get_token_hour_data_info(
+                self.position.pool.token_0.id, self.start_date, self.end_date
+            ),
+            "token1_hour_usd_price_df": _UniswapV3Graph.get_token_hour_data_info(
+                self.position.pool.token_1.id, self.start_date, self.end_date
+            ),
+            "ohlc_hour_df": _UniswapV3Graph.get_pool_hour_data_info(self.position.pool.id, self.start_date, self.end_date),
+            "ohlc_day_df": _UniswapV3Graph.get_pool_day_data_info(self.position.pool.id, self.start_date, self.end_date),
+            "ticks_df": _UniswapV3Graph.get_pool_ticks_info(self.position.pool.id),
+        }
+        return await _UniswapV3Graph.gather(funcs)
+
+    def stage_data(self, data: dict) -> dict:
+        """Stages the data of every window for calculation.
+
+        :param data: Dictionary containing all necessary data for calculations
+        :type data: dict
+        :return: Dictionary containing arrays of the staged data of the valued windows
+        :rtype: dict
+        """
+        decimals_x, decimals_y = self.position.pool.token_0.decimals, self.position.pool.token_1.decimals
+        entry_dates = _np.asarray(self.entry_dates, dtype=_np.int64)
+        exit_dates = entry_dates + self.holding_period
+
+        ohlc_hour_df = data["ohlc_hour_df"].sort_values("psUnix").drop_duplicates("psUnix").set_index("psUnix")
+        first_price = ohlc_hour_df["Close"].reindex(entry_dates).to_numpy(dtype=_np.float64)
+        last_price = ohlc_hour_df["Close"].reindex(exit_dates).to_numpy(dtype=_np.float64)
+        usd_x, usd_y = (
+            data[name].drop_duplicates("psUnix").set_index("psUnix")["Close"].reindex(exit_dates).to_numpy(dtype=_np.float64)
+            for name in ("token0_hour_usd_price_df", "token1_hour_usd_price_df")
+        )
+
+        # Lowest and highest price of every window.
+        hours = ohlc_hour_df.index.to_numpy()
+        first_hour = _np.searchsorted(hours, entry_dates, side="left")
+        last_hour = _np.searchsorted(hours, exit_dates, side="right")
+        lows, highs = ohlc_hour_df["Low"].to_numpy(dtype=_np.float64), ohlc_hour_df["High"].to_numpy(dtype=_np.float64)
+        low = _np.array([lows[i:j].min() if j > i else _np.nan for i, j in zip(first_hour, last_hour)])
+        high = _np.array([highs[i:j].max() if j > i else _np.nan for i, j in zip(first_hour, last_hour)])
+
+        # Fees of every window from the cumulative fees of the days.
+        ohlc_day_df = data["ohlc_day_df"].sort_values("Date")
+        days = ohlc_day_df["Date"].to_numpy()
+        cumulative_fees = _np.concatenate([[0.0], _np.cumsum(ohlc_day_df["FeesUSD"].to_numpy(dtype=_np.float64))])
+        total_fees = (
+            cumulative_fees[_np.searchsorted(days, exit_dates, side="right")]
+            - cumulative_fees[_np.searchsorted(days, entry_dates, side="left")]
+        )
+
+        last_day = days.max() if len(days) > 0 else -_np.inf
+        valid = _np.isfinite(first_price) & _np.isfinite(last_price) & _np.isfinite(usd_x) & _np.isfinite(usd_y)
+        valid &= last_day >= entry_dates
+        first_price, last_price, usd_x, usd_y = first_price[valid], last_price[valid], usd_x[valid], usd_y[valid]
+
+        # Deposit amounts at the exit of every window, as UniswapV3DepositAmountsCalculator calculates them.
+        amount0, amount1 = _utils.get_deposit_amounts_array(
+            1 / last_price,
+            1 / (last_price * (1 + self.position.max_percentage)),
+            1 / (last_price * (1 - self.position.min_percentage)),
+            usd_x,
+            usd_y,
+            self.position.amount,
+        )
+
+        token_0_lowerprice = first_price * (1 - self.position.min_percentage)
+        token_0_upperprice = first_price * (1 + self.position.max_percentage)
+        tick_high = _utils.price_to_tick_array(high[valid], decimals_x, decimals_y)
+        tick_low = _utils.price_to_tick_array(low[valid], decimals_x, decimals_y)
+        tick_index = _TickLiquidityIndex.from_ticks(data["ticks_df"], self.position.pool.fee_tier)
+        liquidity = _utils.calculate_liquidity_array(
+            amount0, amount1, decimals_x, decimals_y, first_price, token_0_lowerprice, token_0_upperprice
+        )
+        return {
+            "entry_dates": entry_dates[valid],
+            "liquidity": liquidity,
+            "average_liquidity": tick_index.range_mean(tick_high, tick_low),
+            "last_price": last_price,
+            "usd_x": usd_x,
+            "total_fees": total_fees[valid],
+            "token_0_lowerprice": token_0_lowerprice,
+            "token_0_upperprice": token_0_upperprice,
+        }
+
+    def calculation(self, staged_data: dict) -> _pd.DataFrame:
+        """Calculates the profit and loss of every window based on the staged data.
+
+        :param staged_data: Dictionary containing staged data for calculations
+        :type staged_data: dict
+        :return: Dataframe containing the calculated profit and loss data of every valued window, indexed by its
+            entry timestamp
+        :rtype: pd.DataFrame
+        """
+        accrued_fees, sim_liq = self.range_values(staged_data)
+        return _pd.DataFrame(
+            {"Fees USD": accrued_fees, "Deposit Amounts USD": sim_liq, "PnL": accrued_fees + sim_liq - self.position.amount},
+            index=_pd.Index(staged_data["entry_dates"], name="Entry Date"),
         )
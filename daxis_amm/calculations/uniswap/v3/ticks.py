@@ -0,0 +1,141 @@
+"""
+Module defining the Uniswap V3 tick liquidity index.
+"""
+import typing as _tp
+
+import numpy as _np
+import pandas as _pd
+
+from daxis_amm.calculations.uniswap.v3 import utils as _utils
+
+
+class TickLiquidityIndex:
+    """
+    Active liquidity per tick spacing, held as NumPy arrays of the initialized ticks only.
+
+    Liquidity is piecewise constant between initialized ticks, so the index stores the sorted tick boundaries and
+    the cumulative liquidityNet at each of them. It answers the same questions as the expand_ticks DataFrame,
+    whose rows are the tick spacings from the lowest (inclusive) to the highest (exclusive) initialized tick,
+    without materializing a row per tick spacing.
+    """
+
+    def __init__(self, ticks: _np.ndarray, liquidity_net: _np.ndarray, fee_tier: int):
+        """
+        Initialize a TickLiquidityIndex object.
+
+        :param ticks: The initialized ticks.
+        :type ticks: np.ndarray
+        :param liquidity_net: The liquidityNet of each initialized tick.
+        :type liquidity_net: np.ndarray
+        :param fee_tier: The fee tier of the pool.
+        :type fee_tier: int
+        """
+        order = _np.argsort(ticks, kind="stable")
+        self.spacing = _utils.tick_spacing(fee_tier)
+        self.boundaries = _np.asarray(ticks, dtype=_np.int64)[order]
+        self.liquidity = _np.cumsum(_np.asarray(liquidity_net, dtype=_np.float64)[order])
+
+        if len(self.boundaries) == 0:
+            self.min_tick = self.max_tick = 0
+            self.size = 0
+        else:
+            self.min_tick = int(self.boundaries[0])
+            self.max_tick = int(self.boundaries[-1])
+            self.size = -(-(self.max_tick - self.min_tick) // self.spacing)
+
+        # Tick spacing at which each boundary takes effect and the summed liquidity of the spacings before it.
+        self._starts = -(-(self.boundaries - self.min_tick) // self.spacing)
+        widths = _np.diff(_np.append(self._starts, self.size))
+        self._areas = _np.concatenate([[0.0], _np.cumsum(self.liquidity * widths)])
+
+    @classmethod
+    def from_ticks(cls, ticks_df: _pd.DataFrame, fee_tier: int) -> "TickLiquidityIndex":
+        """
+        Build a TickLiquidityIndex from the pool ticks of the Subgraph.
+
+        :param ticks_df: DataFrame with tickIdx and liquidityNet columns.
+        :type ticks_df: pd.DataFrame
+        :param fee_tier: The fee tier of the pool.
+        :type fee_tier: int
+        :return: The TickLiquidityIndex.
+        :rtype: TickLiquidityIndex
+        """
+        return cls(ticks_df["tickIdx"].to_numpy(), ticks_df["liquidityNet"].to_numpy(), fee_tier)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def liquidity_at(self, ticks: _tp.Any) -> _np.ndarray:
+        """
+        Get the liquidity of an array of tick spacings.
+
+        Ticks which are not a tick spacing of the index, or lie outside of it, have no liquidity.
+
+        :param ticks: Ticks of any shape.
+        :type ticks: ArrayLike
+        :return: The liquidity of each tick.
+        :rtype: np.ndarray
+        """
+        ticks = _np.asarray(ticks, dtype=_np.int64)
+        if self.size == 0:
+            return _np.zeros(ticks.shape)
+        position = _np.searchsorted(self.boundaries, ticks, side="right") - 1
+        valid = (ticks >= self.min_tick) & (ticks < self.max_tick) & ((ticks - self.min_tick) % self.spacing == 0)
+        return _np.where(valid, self.liquidity[_np.maximum(position, 0)], 0.0)
+
+    def liquidity_histogram(self, ticks: _tp.Any) -> _tp.Tuple[_np.ndarray, _np.ndarray]:
+        """
+        Count the tick spacings of every column of a 2-D array of ticks by their liquidity.
+
+        A sum over the ticks of a column of any function of their liquidity is the dot product of the function of
+        the levels with the counts of the column, so it can be evaluated for many functions with one product.
+
+        :param ticks: Ticks of shape (rows, columns).
+        :type ticks: ArrayLike
+        :return: The liquidity levels occurring in the ticks and their counts of shape (levels, columns).
+        :rtype: Tuple[np.ndarray, np.ndarray]
+        """
+        ticks = _np.asarray(ticks, dtype=_np.int64)
+        columns = ticks.shape[1]
+        levels = _np.append(self.liquidity, 0.0)
+        if self.size == 0:
+            codes = _np.full(ticks.shape, len(levels) - 1)
+        else:
+            position = _np.searchsorted(self.boundaries, ticks, side="right") - 1
+            valid = (ticks >= self.min_tick) & (ticks < self.max_tick) & ((ticks - self.min_tick) % self.spacing == 0)
+            codes = _np.where(valid, _np.maximum(position, 0), len(levels) - 1)
+
+        # Only keep the levels which occur, numbered in order.
+        occurring = _np.bincount(codes.ravel(), minlength=len(levels)) > 0
+        codes = (_np.cumsum(occurring) - 1)[codes]
+        counts = _np.bincount((codes * columns + _np.arange(columns)).ravel(), minlength=occurring.sum() * columns)
+        return levels[occurring], counts.reshape(-1, columns).astype(_np.float64)
+
+    def _cumulative(self, spacings: _np.ndarray) -> _np.ndarray:
+        "Summed liquidity of the first spacings tick spacings."
+        position = _np.maximum(_np.searchsorted(self._starts, spacings, side="right") - 1, 0)
+        return self._areas[position] + self.liquidity[position] * (spacings - self._starts[position])
+
+    def range_mean(self, tick_low: _tp.Any, tick_high: _tp.Any) -> _np.ndarray:
+        """
+        Get the average liquidity of the tick spacings between tick_low and tick_high (inclusive).
+
+        Equal to the mean of the expand_ticks Liquidity column over the same ticks, NaN for empty ranges.
+
+        :param tick_low: Lower ticks.
+        :type tick_low: ArrayLike
+        :param tick_high: Higher ticks.
+        :type tick_high: ArrayLike
+        :return: The average liquidity of each range.
+        :rtype: np.ndarray
+        """
+        tick_low = _np.asarray(tick_low, dtype=_np.int64)
+        tick_high = _np.asarray(tick_high, dtype=_np.int64)
+        if self.size == 0:
+            return _np.full(_np.broadcast(tick_low, tick_high).shape, _np.nan)
+        first = _np.clip(-(-(tick_low - self.min_tick) // self.spacing), 0, self.size)
+        last = _np.clip((tick_high - self.min_tick) // self.spacing + 1, 0, self.size)
+        count = last - first
+        with _np.errstate(divide="ignore", invalid="ignore"):
+            mean = (self._cumulative(last) - self._cumulative(first)) / count
+        return _np.where(count > 0, mean, _np.nan)
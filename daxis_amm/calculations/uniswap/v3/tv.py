@@ -1,19 +1,29 @@
 """
 Module defining the Uniswap V3 Theoretical Value Calculators.
 """
+import functools as _functools
+import math as _m
+import time as _time
+import typing as _tp
 from dataclasses import dataclass as _dataclass
 from typing import Any as _Any
 
+import numpy as _np
 import pandas as _pd
-from toolz import get_in as _get_in
 
 from daxis_amm.calculations.base import BaseCalculator as _BaseCalculator
+from daxis_amm.calculations.stats import RunningStats as _RunningStats
+from daxis_amm.calculations.stats import StreamingSummary as _StreamingSummary
 from daxis_amm.calculations.uniswap.v3 import utils as _utils
+from daxis_amm.calculations.uniswap.v3.ticks import TickLiquidityIndex as _TickLiquidityIndex
 from daxis_amm.calculations.uniswap.v3.deposit_amounts import (
     UniswapV3DepositAmountsCalculator as _UniswapV3DepositAmountsCalculator,
 )
 from daxis_amm.graphs.uniswap.v3.graph import UniswapV3Graph as _UniswapV3Graph
 
+COLUMNS = ("Fees USD", "Deposit Amounts USD", "TV")
+PATH_COLUMNS = COLUMNS + ("Terminal Price Deviation",)
+
 
 @_dataclass
 class UniswapV3TVCalculator(_BaseCalculator):
@@ -31,9 +41,11 @@ class UniswapV3TVCalculator(_BaseCalculator):
     value_date: int
     simulator: _Any
 
-    def get_data(self) -> dict:
+    async def aget_data(self) -> dict:
         """Retrieves the necessary data for calculations.
 
+        The deposit amounts are calculated once the pool data has been fetched, so they reuse it.
+
         :return: Dictionary containing all necessary data for calculations
         :rtype: dict
         """
@@ -46,7 +58,9 @@ class UniswapV3TVCalculator(_BaseCalculator):
                 self.position.pool.token_0.id, start_date, self.value_date
             ),
         }
-        return _UniswapV3Graph.run(funcs)
+        data = await _UniswapV3Graph.gather(funcs)
+        data["deposit_amounts"] = await _UniswapV3DepositAmountsCalculator(position=self.position, date=self.value_date).arun()
+        return data
 
     def stage_data(self, data: dict) -> dict:
         """Stages the data for calculation.
@@ -58,29 +72,25 @@ class UniswapV3TVCalculator(_BaseCalculator):
         """
         average_day_fees = data["ohlc_day_df"]["FeesUSD"].mean()
 
-        ticks = _utils.expand_ticks(
-            data["ticks_df"],
-            self.position.pool.token_0.decimals,
-            self.position.pool.token_1.decimals,
-            self.position.pool.fee_tier,
-        )
-        tick_index = ticks.to_dict("index")
+        tick_index = _TickLiquidityIndex.from_ticks(data["ticks_df"], self.position.pool.fee_tier)
 
         time_delta = int((self.value_date - self.start_date) / (60 * 60 * 24))
 
-        price_sim = self.simulator.sim(
-            data["ohlc_hour_df"]["Close"].iloc[-1], 0.0, data["ohlc_hour_df"]["Close"].std() / 100, time_delta
-        )
-        price_usd_sim = self.simulator.sim(
-            data["token_0_hour_df"]["Close"].iloc[-1], 0.0, data["token_0_hour_df"]["Close"].std() / 100, time_delta
+        current_price = data["ohlc_hour_df"]["Close"].iloc[-1]
+        price_sim_params = (current_price, 0.0, data["ohlc_hour_df"]["Close"].std() / 100, time_delta)
+        price_usd_sim_params = (
+            data["token_0_hour_df"]["Close"].iloc[-1],
+            0.0,
+            data["token_0_hour_df"]["Close"].std() / 100,
+            time_delta,
         )
 
         price = data["ohlc_hour_df"].set_index("psUnix").loc[self.value_date]["Close"]
         token_0_lowerprice = price * (1 - self.position.min_percentage)
         token_0_upperprice = price * (1 + self.position.max_percentage)
 
-        amount0, amount1 = _UniswapV3DepositAmountsCalculator(position=self.position, date=self.value_date).run()
-        liquidity = _utils.calculate_liquidity(
+        amount0, amount1 = data["deposit_amounts"]
+        liquidity = _utils.calculate_liquidity_array(
             amount0,
             amount1,
             self.position.pool.token_0.decimals,
@@ -91,56 +101,500 @@ class UniswapV3TVCalculator(_BaseCalculator):
         )
 
         return {
+            "decimals": (self.position.pool.token_0.decimals, self.position.pool.token_1.decimals),
             "average_day_fees": average_day_fees,
             "tick_index": tick_index,
-            "price_sim": price_sim,
-            "price_usd_sim": price_usd_sim,
+            "price_sim_params": price_sim_params,
+            "expected_terminal_price": self.simulator.expected_terminal(current_price, 0.0, time_delta),
+            "price_usd_sim_params": price_usd_sim_params,
             "liquidity": liquidity,
             "token_0_lowerprice": token_0_lowerprice,
             "token_0_upperprice": token_0_upperprice,
         }
 
-    def calculation(self, staged_data: dict) -> pd.DataFrame:
+    def calculation(self, staged_data: dict) -> _tp.Union[_pd.DataFrame, _StreamingSummary]:
         """Calculates the theoretical values based on the staged data.
 
+        In the adaptive mode of the simulator, batches of paths are simulated until the standard error of the TV
+        reaches the target, the time budget is spent or the maximum number of paths is reached. In the streaming
+        mode, paths are valued in chunks and only a running summary of every column is kept. Batches are spread
+        across the workers of the simulator.
+
+        :param staged_data: Dictionary containing staged data for calculations
+        :type staged_data: dict
+        :return: Dataframe containing the calculated theoretical values of every path, or their summary in
+            streaming mode
+        :rtype: Union[pd.DataFrame, StreamingSummary]
+        """
+        if not self.simulator.adaptive and not self.simulator.streaming:
+            return self.path_values(staged_data)
+
+        started = _time.monotonic()
+        simulator = self.simulator.batch_simulator()
+        stats = _RunningStats()
+        summary = _StreamingSummary(COLUMNS) if self.simulator.streaming else None
+        batches = []
+        results = self.simulator.map_batches(path_matrix, range(self.simulator.max_batches), len(PATH_COLUMNS), staged_data)
+        try:
+            for values in results:
+                frame = _pd.DataFrame(values, columns=PATH_COLUMNS)
+                control = frame["Terminal Price Deviation"]
+                samples = {column: simulator.samples(frame[column], control) for column in COLUMNS}
+                stats.update(*samples["TV"])
+                if summary is None:
+                    batches.append(frame)
+                else:
+                    summary.update(frame, samples)
+                if self.simulator.converged(stats, started):
+                    break
+        finally:
+            results.close()
+
+        return summary if summary is not None else _pd.concat(batches, ignore_index=True)
+
+    def path_values(self, staged_data: dict, batch: int = 0, simulator: _tp.Optional[_Any] = None) -> _pd.DataFrame:
+        """Simulates a batch of paths and calculates their theoretical values.
+
+        :param staged_data: Dictionary containing staged data for calculations
+        :type staged_data: dict
+        :param batch: Index of the batch of paths. Default is 0.
+        :type batch: int
+        :param simulator: Simulator of the batch. Default is None for the simulator of the calculator.
+        :type simulator: Optional[Any]
+        :return: Dataframe containing the calculated theoretical values of the batch
+        :rtype: pd.DataFrame
+        """
+        simulator = self.simulator if simulator is None else simulator
+        return _pd.DataFrame(path_matrix(simulator, batch, staged_data), columns=PATH_COLUMNS)
+
+
+def path_matrix(simulator: _Any, batch: int, staged_data: dict) -> _np.ndarray:
+    """Simulates a batch of paths and calculates their theoretical values.
+
+    Only depends on the staged data, so batches can be valued in worker processes.
+
+    :param simulator: Simulator of the batch
+    :type simulator: Any
+    :param batch: Index of the batch of paths
+    :type batch: int
+    :param staged_data: Dictionary containing staged data for calculations
+    :type staged_data: dict
+    :return: Array with one row per path and the PATH_COLUMNS values as columns
+    :rtype: np.ndarray
+    """
+    price_sim = _np.asarray(simulator.sim(*staged_data["price_sim_params"], batch=batch), dtype=_np.float64)
+    price_usd_sim = _np.asarray(simulator.sim(*staged_data["price_usd_sim_params"], batch=batch, stream=1))
+    fees, deposit_amounts_usd = range_values(staged_data, simulator, price_sim, price_usd_sim)
+    fees, deposit_amounts_usd = fees[0], deposit_amounts_usd[0]
+
+    # The terminal price deviation is the control variate of the simulator, whose expectation is known to be zero.
+    return _np.column_stack(
+        [fees, deposit_amounts_usd, fees + deposit_amounts_usd, price_sim[-1] - staged_data["expected_terminal_price"]]
+    )
+
+
+def portfolio_path_matrix(simulator: _Any, batch: int, groups: _tp.Sequence[dict]) -> _np.ndarray:
+    """Simulates a batch of paths per group of positions and calculates the theoretical values of every position.
+
+    The positions of a group share their pool and dates, so the staged data of a group holds arrays of the
+    liquidity and range of its positions, and its paths are simulated once for all of them.
+
+    :param simulator: Simulator of the batch
+    :type simulator: Any
+    :param batch: Index of the batch of paths
+    :type batch: int
+    :param groups: Staged data of every group
+    :type groups: Sequence[dict]
+    :return: Array with one row per path, the TV of every position of every group followed by the terminal
+        price deviation of every group as columns
+    :rtype: np.ndarray
+    """
+    values, deviations = [], []
+    for staged_data in groups:
+        price_sim = _np.asarray(simulator.sim(*staged_data["price_sim_params"], batch=batch), dtype=_np.float64)
+        price_usd_sim = _np.asarray(simulator.sim(*staged_data["price_usd_sim_params"], batch=batch, stream=1))
+        fees, deposit_amounts_usd = range_values(staged_data, simulator, price_sim, price_usd_sim)
+        values.extend(fees + deposit_amounts_usd)
+        deviations.append(price_sim[-1] - staged_data["expected_terminal_price"])
+    return _np.column_stack(values + deviations)
+
+
+def range_values(
+    staged_data: dict,
+    simulator: _Any,
+    price_sim: _np.ndarray,
+    price_usd_sim: _np.ndarray,
+    histogram: _tp.Optional[_tp.Tuple[_np.ndarray, _np.ndarray]] = None,
+) -> _tp.Tuple[_np.ndarray, _np.ndarray]:
+    """Calculates the accrued fees and the deposit amounts of one or more ranges on simulated paths.
+
+    :param staged_data: Dictionary containing staged data for calculations, whose liquidity and range prices may be
+        arrays of several ranges
+    :type staged_data: dict
+    :param simulator: Simulator of the paths
+    :type simulator: Any
+    :param price_sim: Simulated pool prices of shape (num_steps, num_sims)
+    :type price_sim: np.ndarray
+    :param price_usd_sim: Simulated token 0 USD prices of shape (num_steps, num_sims)
+    :type price_usd_sim: np.ndarray
+    :param histogram: The path_histogram of the paths, to value several chunks of ranges on the same paths.
+        Default is None.
+    :type histogram: Optional[Tuple[np.ndarray, np.ndarray]]
+    :return: Fees USD and Deposit Amounts USD of shape (number of ranges, num_sims)
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    """
+    decimals_x, decimals_y = staged_data["decimals"]
+    liquidity = _np.atleast_1d(_np.asarray(staged_data["liquidity"], dtype=_np.float64))
+
+    # Calculate the Accrued Fees, looking up the liquidity of the tick spacing of every node of every path or
+    # averaging it over the Brownian bridge between the nodes. For several ranges, or bridged paths, the time at every
+    # liquidity level is counted once for the paths, so the fee share of every range is one product with the counts.
+    if len(liquidity) == 1 and histogram is None and not simulator.bridge:
+        ticks = _utils.price_to_tick_array(price_sim, decimals_x, decimals_y)
+        node_liquidity = staged_data["tick_index"].liquidity_at(ticks - ticks % staged_data["tick_index"].spacing)
+        fee_share = (liquidity[0] / (node_liquidity + liquidity[0])).sum(axis=0)[None]
+    else:
+        fee_share = histogram_fee_share(
+            path_histogram(staged_data, simulator, price_sim) if histogram is None else histogram, liquidity
+        )
+    fees = fee_share * staged_data["average_day_fees"] / 24
+
+    # Calculate the Imperminant Loss.
+    last_price = price_sim[-1]
+    x_delta, y_delta = _utils.amounts_delta_array(
+        liquidity[:, None],
+        last_price,
+        _np.atleast_1d(staged_data["token_0_lowerprice"])[:, None],
+        _np.atleast_1d(staged_data["token_0_upperprice"])[:, None],
+        decimals_x,
+        decimals_y,
+    )
+
+    # Convert to USD
+    deposit_amounts_usd = (x_delta + y_delta * last_price) * price_usd_sim[-1]
+    return fees, deposit_amounts_usd
+
+
+def path_histogram(staged_data: dict, simulator: _Any, price_sim: _np.ndarray) -> _tp.Tuple[_np.ndarray, _np.ndarray]:
+    """Counts the time every simulated path spends at every tick liquidity level, over the Brownian bridge between
+    its nodes if the simulator bridges them.
+
+    :param staged_data: Dictionary containing staged data for calculations
+    :type staged_data: dict
+    :param simulator: Simulator of the paths
+    :type simulator: Any
+    :param price_sim: Simulated pool prices of shape (num_steps, num_sims)
+    :type price_sim: np.ndarray
+    :return: The liquidity levels and their counts of shape (levels, num_sims)
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    """
+    if simulator.bridge:
+        return bridge_histogram(staged_data, simulator, price_sim)
+    return node_histogram(staged_data, price_sim)
+
+
+def node_histogram(staged_data: dict, price_sim: _np.ndarray) -> _tp.Tuple[_np.ndarray, _np.ndarray]:
+    """Counts the nodes of every simulated path by the liquidity of their tick spacing.
+
+    :param staged_data: Dictionary containing staged data for calculations
+    :type staged_data: dict
+    :param price_sim: Simulated pool prices of shape (num_steps, num_sims)
+    :type price_sim: np.ndarray
+    :return: The liquidity levels of the nodes and their counts of shape (levels, num_sims)
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    """
+    ticks = _utils.price_to_tick_array(price_sim, *staged_data["decimals"])
+    return staged_data["tick_index"].liquidity_histogram(ticks - ticks % staged_data["tick_index"].spacing)
+
+
+@_dataclass
+class UniswapV3TVGridCalculator(UniswapV3TVCalculator):
+    """UniswapV3TVGridCalculator calculates the Theoretical Value of a grid of ranges of the LP.
+
+    The min and max percentages of the position are equally long arrays of the ranges of the grid. The pool data is
+    fetched and the paths are simulated once for every range, and the deposit amounts, liquidity and values of the ranges
+    are broadcast over the grid. Ranges are valued in chunks of ranges_per_chunk, so only the estimates of every
+    range are kept. Batches are valued in this process rather than across the workers of the simulator.
+
+    :param ranges_per_chunk: Number of ranges valued together on the paths of a batch
+    :type ranges_per_chunk: int
+    """
+
+    ranges_per_chunk: int = 16
+
+    def calculation(self, staged_data: dict) -> _pd.DataFrame:
+        """Calculates the theoretical value of every range based on the staged data.
+
+        In the adaptive mode of the simulator, batches of paths are simulated until the standard error of the TV of
+        every range reaches the target, the time budget is spent or the maximum number of paths is reached.
+
         :param staged_data: Dictionary containing staged data for calculations
         :type staged_data: dict
-        :return: Dataframe containing the calculated theoretical values
+        :return: Dataframe containing the TV and TV Std Error of every range, indexed by its min and max percentage
         :rtype: pd.DataFrame
         """
-        fees = []
-        deposit_amounts_usd = []
-
-        for col in staged_data["price_sim"]:
-            # Calculate the Accrued Fees.
-            col_fees = []
-            for node in staged_data["price_sim"][col]:
-                tick = _utils.price_to_tick(node, self.position.pool.token_0.decimals, self.position.pool.token_1.decimals)
-                closest_tick_spacing = tick - tick % _utils.tick_spacing(self.position.pool.fee_tier)
-                tick_liquidity = _get_in([closest_tick_spacing, "Liquidity"], staged_data["tick_index"], 0.0)
-                average_fee_revenue = (
-                    (staged_data["liquidity"] / (tick_liquidity + staged_data["liquidity"]))
-                    * staged_data["average_day_fees"]
-                    / 24
+        liquidity = staged_data["liquidity"]
+        lower, upper = staged_data["token_0_lowerprice"], staged_data["token_0_upperprice"]
+
+        started = _time.monotonic()
+        simulator = self.simulator.batch_simulator()
+        stats = [_RunningStats() for _ in liquidity]
+        for batch in range(self.simulator.max_batches):
+            price_sim = _np.asarray(simulator.sim(*staged_data["price_sim_params"], batch=batch), dtype=_np.float64)
+            price_usd_sim = _np.asarray(simulator.sim(*staged_data["price_usd_sim_params"], batch=batch, stream=1))
+            control = price_sim[-1] - staged_data["expected_terminal_price"]
+            histogram = path_histogram(staged_data, simulator, price_sim)
+            for start in range(0, len(liquidity), self.ranges_per_chunk):
+                chunk = slice(start, start + self.ranges_per_chunk)
+                chunk_data = dict(
+                    staged_data, liquidity=liquidity[chunk], token_0_lowerprice=lower[chunk], token_0_upperprice=upper[chunk]
                 )
-                col_fees.append(average_fee_revenue)
-            fees.append(sum(col_fees))
-
-            # Calculate the Imperminant Loss.
-            last_price = staged_data["price_sim"][col].iloc[-1]
-            x_delta, y_delta = _utils.amounts_delta(
-                staged_data["liquidity"],
-                last_price,
-                staged_data["token_0_lowerprice"],
-                staged_data["token_0_upperprice"],
-                self.position.pool.token_0.decimals,
-                self.position.pool.token_1.decimals,
-            )
-
-            # Convert to USD
-            sim_liq = (x_delta + y_delta * last_price) * staged_data["price_usd_sim"][col].iloc[-1]
-            deposit_amounts_usd.append(sim_liq)
-
-        tvs = [fee + imp for imp, fee in zip(deposit_amounts_usd, fees)]
-
-        return _pd.DataFrame({"Fees USD": fees, "Deposit Amounts USD": deposit_amounts_usd, "TV": tvs})
+                fees, deposit_amounts_usd = range_values(chunk_data, simulator, price_sim, price_usd_sim, histogram)
+                for range_stats, values in zip(stats[chunk], fees + deposit_amounts_usd):
+                    range_stats.update(*simulator.samples(values, control))
+            if self.simulator.adaptive and all(self.simulator.converged(range_stats, started) for range_stats in stats):
+                break
+
+        index = _pd.MultiIndex.from_arrays(
+            [self.position.min_percentage, self.position.max_percentage], names=["Min Percentage", "Max Percentage"]
+        )
+        return _pd.DataFrame(
+            {"TV": [s.mean for s in stats], "TV Std Error": [s.std_error for s in stats]},
+            index=index,
+        )
+
+
+@_dataclass
+class UniswapV3AnalyticTVCalculator(UniswapV3TVCalculator):
+    """UniswapV3AnalyticTVCalculator calculates the expected Theoretical Value of the LP without simulating paths.
+
+    The price at every step of the simulator is taken to be lognormal with the mean and variance of the simulated
+    paths. The expected fee share of every step is then a sum over the liquidity of the initialized tick ranges
+    weighted by the probability of the price being in each of them, and the expected deposit value an integral of
+    the piecewise position value over the terminal price density. The token 0 USD price is taken to be independent
+    of the pool price. Requires scipy.
+
+    :param quadrature_nodes: Number of Gauss-Legendre nodes per smooth piece of the position value
+    :type quadrature_nodes: int
+    """
+
+    quadrature_nodes: int = 64
+
+    def calculation(self, staged_data: dict) -> _pd.Series:
+        """Calculates the expected theoretical value based on the staged data.
+
+        :param staged_data: Dictionary containing staged data for calculations
+        :type staged_data: dict
+        :return: Series containing the expected Fees USD, Deposit Amounts USD, TV and the average Fee Share
+        :rtype: pd.Series
+        """
+        mu, sigma = self.simulator.lognormal_params(*staged_data["price_sim_params"])
+        fee_share = expected_fee_share(staged_data, mu, sigma)
+        fees = fee_share.sum() * staged_data["average_day_fees"] / 24
+
+        usd_price, usd_r, _, usd_T = staged_data["price_usd_sim_params"]
+        deposit_amounts_usd = expected_deposit_value(staged_data, mu[-1], sigma[-1], self.quadrature_nodes)
+        deposit_amounts_usd *= self.simulator.expected_terminal(usd_price, usd_r, usd_T)
+
+        return _pd.Series(
+            {
+                "Fees USD": fees,
+                "Deposit Amounts USD": deposit_amounts_usd,
+                "TV": fees + deposit_amounts_usd,
+                "Fee Share": fee_share.mean(),
+            }
+        )
+
+
+def _ndtr() -> _tp.Callable[[_Any], _np.ndarray]:
+    "The standard normal cumulative distribution function of scipy."
+    try:
+        from scipy.special import ndtr  # pylint: disable=import-outside-toplevel
+    except ImportError as err:
+        raise ImportError("The analytic engine requires scipy, install it with pip install scipy") from err
+    return ndtr
+
+
+def expected_fee_share(staged_data: dict, mu: _np.ndarray, sigma: _np.ndarray) -> _np.ndarray:
+    """Calculates the expected share of the pool fees of the position at every step.
+
+    :param staged_data: Dictionary containing staged data for calculations
+    :type staged_data: dict
+    :param mu: Mean of the log price at every step
+    :type mu: np.ndarray
+    :param sigma: Standard deviation of the log price at every step
+    :type sigma: np.ndarray
+    :return: Expected liquidity / (tick liquidity + liquidity) at every step
+    :rtype: np.ndarray
+    """
+    decimals_x, decimals_y = staged_data["decimals"]
+    liquidity = staged_data["liquidity"]
+    tick_index = staged_data["tick_index"]
+    share = liquidity / (tick_index.liquidity + liquidity)
+
+    # The tick of a price is at least b when its log price is at most this bound, the bounds are decreasing.
+    bounds = (decimals_y - decimals_x) * _m.log(10) - tick_index.boundaries * _m.log(1.0001)
+    random = sigma > 0
+    expected = _np.empty(len(mu))
+    if random.any():
+        # Tick ranges more than 10 standard deviations away from every step have no probability.
+        lowest, highest = (mu[random] - 10 * sigma[random]).min(), (mu[random] + 10 * sigma[random]).max()
+        first = max(_np.searchsorted(-bounds, -highest) - 1, 0)
+        last = min(_np.searchsorted(-bounds, -lowest, side="right") + 1, len(bounds))
+        at_least = _ndtr()((bounds[None, first:last] - mu[random, None]) / sigma[random, None])
+        in_range = at_least[:, :-1] - at_least[:, 1:]
+        # Prices outside of the initialized ticks meet no other liquidity and earn the whole fees.
+        expected[random] = 1.0 - in_range @ (1.0 - share[first : last - 1])
+
+    fixed = _utils.price_to_tick_array(_np.exp(mu[~random]), decimals_x, decimals_y)
+    fixed_liquidity = tick_index.liquidity_at(fixed - fixed % tick_index.spacing)
+    expected[~random] = liquidity / (fixed_liquidity + liquidity)
+    return expected
+
+
+@_functools.lru_cache(maxsize=None)
+def _gauss_legendre(nodes: int) -> _tp.Tuple[_np.ndarray, _np.ndarray]:
+    "Gauss-Legendre nodes and weights on [-1, 1]."
+    return _np.polynomial.legendre.leggauss(nodes)
+
+
+def bridge_histogram(staged_data: dict, simulator: _Any, price_sim: _np.ndarray, nodes: int = 4) -> _tp.Tuple[_np.ndarray, list]:
+    """Tabulates the time every simulated path spends at every tick liquidity level over the Brownian bridge between
+    its nodes.
+
+    The price crosses tick ranges between the nodes without being seen at them, so rather than counting the nodes
+    by liquidity like node_histogram, the expected time at every level over each step is weighed, integrating over
+    the step with Gauss-Legendre nodes. At each of them the log price is normal with the same standard deviation on
+    every path, so the probability of every level is one smooth function of the mean, which is tabulated on a grid
+    and interpolated. The tables do not depend on the ranges, so they are built once for the paths and applied to
+    any number of ranges by histogram_fee_share.
+
+    :param staged_data: Dictionary containing staged data for calculations
+    :type staged_data: dict
+    :param simulator: Simulator of the paths
+    :type simulator: Any
+    :param price_sim: Simulated pool prices of shape (num_steps, num_sims)
+    :type price_sim: np.ndarray
+    :param nodes: Number of quadrature nodes per step. Default is 4.
+    :type nodes: int
+    :return: The liquidity levels and, for every quadrature node, its weight, the probabilities of the levels of
+        shape (grid, levels) and the grid index and interpolation fraction of every step of every path
+    :rtype: Tuple[np.ndarray, list]
+    """
+    decimals_x, decimals_y = staged_data["decimals"]
+    tick_index = staged_data["tick_index"]
+    steps = len(price_sim)
+    if tick_index.size == 0 or steps < 2:
+        return _np.zeros(1), [(float(steps), _np.ones((1, 1)), _np.zeros((1, price_sim.shape[1]), dtype=_np.int64), None)]
+
+    # Liquidity of each interval between tick boundaries in ascending log price, none outside the initialized ticks.
+    interval_liquidity = _np.concatenate([[0.0], tick_index.liquidity[:-1], [0.0]])[::-1]
+    levels, codes = _np.unique(interval_liquidity, return_inverse=True)
+    bounds = ((decimals_y - decimals_x) * _m.log(10) - tick_index.boundaries * _m.log(1.0001))[::-1]
+
+    _, r, vol, T = staged_data["price_sim_params"]
+    points, weights = _gauss_legendre(nodes)
+    # Time averages over the steps, scaled to the number of nodes of a path like node_histogram.
+    scale = steps / (steps - 1)
+    terms = []
+    for point, weight in zip((points + 1) / 2, weights / 2):
+        mean, std = simulator.bridge_marginal(price_sim, r, vol, T, point)
+        std = float(std.flat[0])
+        if std == 0:
+            terms.append((weight * scale, _np.eye(len(levels)), codes[_np.searchsorted(bounds, mean)], None))
+            continue
+        grid = _np.linspace(mean.min(), mean.max(), int(8 * (mean.max() - mean.min()) / std) + 2)
+        # The grid is evenly spaced, so the cell of a mean is found arithmetically.
+        position = (mean - grid[0]) / (grid[1] - grid[0])
+        index = _np.clip(position.astype(_np.int64), 0, len(grid) - 2)
+        fraction = _np.clip(position - index, 0.0, 1.0)
+        terms.append((weight * scale, _level_probabilities(codes, len(levels), bounds, grid, std), index, fraction))
+    return levels, terms
+
+
+def histogram_fee_share(histogram: _tp.Tuple[_np.ndarray, _tp.Any], liquidity: _np.ndarray) -> _np.ndarray:
+    """Calculates the summed fee share of the nodes of every path for many ranges from a node_histogram or a
+    bridge_histogram of the paths.
+
+    :param histogram: The node_histogram or bridge_histogram of the paths
+    :type histogram: Tuple[np.ndarray, Any]
+    :param liquidity: The liquidity of every range
+    :type liquidity: np.ndarray
+    :return: The summed fee share of shape (number of ranges, num_sims)
+    :rtype: np.ndarray
+    """
+    levels, counts = histogram
+    shares = liquidity[:, None] / (levels + liquidity[:, None])
+    if isinstance(counts, _np.ndarray):
+        return shares @ counts
+
+    fee_share = 0.0
+    for weight, probabilities, index, fraction in counts:
+        # The share of every range on the grid, interpolated at the mean of every step of every path.
+        table = shares @ probabilities.T
+        if fraction is None:
+            fee_share = fee_share + weight * table[:, index].sum(axis=1)
+        else:
+            fee_share = fee_share + weight * (table[:, index] + (table[:, index + 1] - table[:, index]) * fraction).sum(axis=1)
+    return fee_share
+
+
+def _level_probabilities(codes: _np.ndarray, size: int, bounds: _np.ndarray, mean: _np.ndarray, std: float) -> _np.ndarray:
+    """Probabilities of the liquidity levels of the intervals between bounds for normal variables, for an array of
+    means.
+
+    Only bounds within 6 standard deviations of a mean are evaluated, the variable is taken to be on the near side
+    of the others.
+
+    :return: The probabilities of shape (means, levels)
+    """
+    first = _np.searchsorted(bounds, mean - 6 * std)
+    last = _np.searchsorted(bounds, mean + 6 * std)
+    window = _np.arange(int((last - first).max()) + 1)
+    index = first[:, None] + window
+    above = _np.where(
+        index < last[:, None], 1.0 - _ndtr()((bounds[_np.minimum(index, len(bounds) - 1)] - mean[:, None]) / std), 0.0
+    )
+    # Interval first + i lies between bounds first + i - 1 and first + i.
+    probabilities = _np.concatenate([_np.ones((len(mean), 1)), above[:, :-1]], axis=1) - above
+    interval = codes[_np.minimum(index, len(codes) - 1)]
+    rows = _np.broadcast_to(_np.arange(len(mean))[:, None], interval.shape)
+    return _np.bincount((rows * size + interval).ravel(), weights=probabilities.ravel(), minlength=len(mean) * size).reshape(
+        -1, size
+    )
+
+
+def expected_deposit_value(staged_data: dict, mu: float, sigma: float, nodes: int = 64) -> float:
+    """Calculates the expected value of the deposit amounts at a lognormal terminal price, in token 0 USD units.
+
+    The position value is smooth between the range bounds, so each piece is integrated with Gauss-Legendre
+    quadrature over the standard normal driving the terminal price.
+
+    :param staged_data: Dictionary containing staged data for calculations
+    :type staged_data: dict
+    :param mu: Mean of the terminal log price
+    :type mu: float
+    :param sigma: Standard deviation of the terminal log price
+    :type sigma: float
+    :param nodes: Number of quadrature nodes per piece. Default is 64.
+    :type nodes: int
+    :return: The expected value of the deposit amounts
+    :rtype: float
+    """
+    decimals_x, decimals_y = staged_data["decimals"]
+    lower, upper = staged_data["token_0_lowerprice"], staged_data["token_0_upperprice"]
+
+    def value(price: _np.ndarray) -> _np.ndarray:
+        x_delta, y_delta = _utils.amounts_delta_array(staged_data["liquidity"], price, lower, upper, decimals_x, decimals_y)
+        return x_delta + y_delta * price
+
+    if sigma == 0:
+        return float(value(_np.exp(mu)))
+
+    kinks = (_np.log([lower, upper]) - mu) / sigma
+    edges = _np.unique(_np.clip(_np.concatenate([[-10.0, 10.0], kinks]), -10.0, 10.0))
+    points, weights = _gauss_legendre(nodes)
+    left, right = edges[:-1, None], edges[1:, None]
+    normals = (left + right) / 2 + (right - left) / 2 * points
+    density = _np.exp(-(normals**2) / 2) / _m.sqrt(2 * _m.pi)
+    return float(((right - left) / 2 * weights * density * value(_np.exp(mu + sigma * normals))).sum())
@@ -32,25 +32,54 @@ def get_deposit_amounts(
     :return: Tuple containing the calculated deposit amounts
     :rtype: Tuple[float, float]
     """
+    delta_x, delta_y = get_deposit_amounts_array(price_current, price_low, price_high, price_usd_x, price_usd_y, target_amounts)
+    return float(delta_x), float(delta_y)
+
+
+def get_deposit_amounts_array(
+    price_current: _tp.Any,
+    price_low: _tp.Any,
+    price_high: _tp.Any,
+    price_usd_x: _tp.Any,
+    price_usd_y: _tp.Any,
+    target_amounts: _tp.Any,
+) -> _tp.Tuple[_np.ndarray, _np.ndarray]:
+    """Get the deposit amounts for arrays of LP positions.
+
+    The arguments broadcast against each other; see get_deposit_amounts.
+
+    :param price_current: Current prices
+    :type price_current: ArrayLike
+    :param price_low: Lower price limits
+    :type price_low: ArrayLike
+    :param price_high: Higher price limits
+    :type price_high: ArrayLike
+    :param price_usd_x: USD prices of X token
+    :type price_usd_x: ArrayLike
+    :param price_usd_y: USD prices of Y token
+    :type price_usd_y: ArrayLike
+    :param target_amounts: Total USD values of the two deposits.
+    :type target_amounts: ArrayLike
+    :return: Tuple containing the arrays of deposit amounts
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    """
+    price_usd_x = _np.asarray(price_usd_x, dtype=_np.float64)
+    price_usd_y = _np.asarray(price_usd_y, dtype=_np.float64)
+    target_amounts = _np.asarray(target_amounts, dtype=_np.float64)
 
-    sqrt_upper = _m.sqrt(price_high)
-    sqrt_lower = _m.sqrt(price_low)
-    sqrt_price = _m.sqrt(price_current)
+    sqrt_upper = _np.sqrt(_np.asarray(price_high, dtype=_np.float64))
+    sqrt_lower = _np.sqrt(_np.asarray(price_low, dtype=_np.float64))
+    sqrt_price = _np.sqrt(_np.asarray(price_current, dtype=_np.float64))
 
     delta_l = target_amounts / ((sqrt_price - sqrt_lower) * price_usd_y + (1 / sqrt_price - 1 / sqrt_upper) * price_usd_x)
 
     delta_y = delta_l * (sqrt_price - sqrt_lower)
-    if delta_y * price_usd_y < 0:
-        delta_y = 0
-
-    if delta_y * price_usd_y > target_amounts:
-        delta_y = target_amounts / price_usd_y
+    delta_y = _np.where(delta_y * price_usd_y < 0, 0.0, delta_y)
+    delta_y = _np.where(delta_y * price_usd_y > target_amounts, target_amounts / price_usd_y, delta_y)
 
     delta_x = delta_l * (1 / sqrt_price - 1 / sqrt_upper)
-    if delta_x * price_usd_x < 0:
-        delta_x = 0
-    if delta_x * price_usd_x > target_amounts:
-        delta_x = target_amounts / price_usd_x
+    delta_x = _np.where(delta_x * price_usd_x < 0, 0.0, delta_x)
+    delta_x = _np.where(delta_x * price_usd_x > target_amounts, target_amounts / price_usd_x, delta_x)
 
     return delta_x, delta_y
 
@@ -76,26 +105,56 @@ def amounts_delta(
     :rtype: Tuple[float, float]
     :raises Exception: If there is an error in sqrt price comparison
     """
-    lower = get_sqrt_price_x96(price_high, decimals_x, decimals_y)
-    upper = get_sqrt_price_x96(price_low, decimals_x, decimals_y)
-    cprice = get_sqrt_price_x96(price_current, decimals_x, decimals_y)
+    x_delta, y_delta = amounts_delta_array(liquidity, price_current, price_low, price_high, decimals_x, decimals_y)
+    return float(x_delta), float(y_delta)
 
-    if lower >= cprice:
-        x_delta = liquidity * (upper - lower) / (upper * lower / 2 ** (96))
-        y_delta = 0
 
-    elif lower < cprice <= upper:
-        x_delta = liquidity * (upper - cprice) / (cprice * upper / 2 ** (96))
-        y_delta = liquidity / 2 ** (96) * (cprice - lower)
+def amounts_delta_array(
+    liquidity: _tp.Any, price_current: _tp.Any, price_low: _tp.Any, price_high: _tp.Any, decimals_x: int, decimals_y: int
+) -> _tp.Tuple[_np.ndarray, _np.ndarray]:
+    """Calculate the value of Uniswap v3 liquidity positions for arrays of prices.
 
-    elif upper < cprice:
-        x_delta = 0.0
-        y_delta = liquidity / 2 ** (96) * (upper - lower)
+    The arguments broadcast against each other; see amounts_delta.
 
-    else:
+    :param liquidity: The liquidity of the positions
+    :type liquidity: ArrayLike
+    :param price_current: Current prices
+    :type price_current: ArrayLike
+    :param price_low: Lower price limits
+    :type price_low: ArrayLike
+    :param price_high: Higher price limits
+    :type price_high: ArrayLike
+    :param decimals_x: Decimal places for X token
+    :type decimals_x: int
+    :param decimals_y: Decimal places for Y token
+    :type decimals_y: int
+    :return: Tuple containing the arrays of delta values for x and y
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    :raises ValueError: If a price is NaN
+    """
+    liquidity = _np.asarray(liquidity, dtype=_np.float64)
+    lower = get_sqrt_price_x96_array(price_high, decimals_x, decimals_y)
+    upper = get_sqrt_price_x96_array(price_low, decimals_x, decimals_y)
+    cprice = get_sqrt_price_x96_array(price_current, decimals_x, decimals_y)
+
+    if _np.isnan(cprice).any() or _np.isnan(lower).any() or _np.isnan(upper).any():
         raise ValueError("Error in sqrt price comparison.")
 
-    return x_delta / 10 ** (decimals_x), y_delta / 10 ** (decimals_y)
+    below = lower >= cprice
+    above = upper < cprice
+    with _np.errstate(divide="ignore", invalid="ignore"):
+        x_delta = _np.where(
+            below,
+            liquidity * (upper - lower) / (upper * lower / 2.0**96),
+            _np.where(above, 0.0, liquidity * (upper - cprice) / (cprice * upper / 2.0**96)),
+        )
+        y_delta = _np.where(
+            below,
+            0.0,
+            _np.where(above, liquidity / 2.0**96 * (upper - lower), liquidity / 2.0**96 * (cprice - lower)),
+        )
+
+    return x_delta / float(10**decimals_x), y_delta / float(10**decimals_y)
 
 
 def price_to_tick(price: float, decimals_x: int, decimals_y: int) -> int:
@@ -110,7 +169,23 @@ def price_to_tick(price: float, decimals_x: int, decimals_y: int) -> int:
     :return: The tick corresponding to the given price
     :rtype: int
     """
-    return _m.floor(_m.log(1 / price * (10**decimals_y) / (10**decimals_x)) / _m.log(1.0001))
+    return int(price_to_tick_array(price, decimals_x, decimals_y))
+
+
+def price_to_tick_array(price: _tp.Any, decimals_x: int, decimals_y: int) -> _np.ndarray:
+    """Convert an array of prices to ticks.
+
+    :param price: Prices
+    :type price: ArrayLike
+    :param decimals_x: Decimal places for X token
+    :type decimals_x: int
+    :param decimals_y: Decimal places for Y token
+    :type decimals_y: int
+    :return: The ticks corresponding to the given prices
+    :rtype: np.ndarray
+    """
+    price = _np.asarray(price, dtype=_np.float64)
+    return _np.floor(_np.log(1 / price * float(10**decimals_y) / float(10**decimals_x)) / _m.log(1.0001)).astype(_np.int64)
 
 
 def tick_to_price(tick: int, decimals_x: int, decimals_y: int) -> float:
@@ -125,7 +200,22 @@ def tick_to_price(tick: int, decimals_x: int, decimals_y: int) -> float:
     :return: The price corresponding to the given tick
     :rtype: float
     """
-    return 1.0001 ** (tick) * (10**decimals_x) / (10**decimals_y)
+    return float(tick_to_price_array(tick, decimals_x, decimals_y))
+
+
+def tick_to_price_array(tick: _tp.Any, decimals_x: int, decimals_y: int) -> _np.ndarray:
+    """Convert an array of ticks to prices.
+
+    :param tick: Ticks
+    :type tick: ArrayLike
+    :param decimals_x: Decimal places for X token
+    :type decimals_x: int
+    :param decimals_y: Decimal places for Y token
+    :type decimals_y: int
+    :return: The prices corresponding to the given ticks
+    :rtype: np.ndarray
+    """
+    return 1.0001 ** _np.asarray(tick, dtype=_np.float64) * float(10**decimals_x) / float(10**decimals_y)
 
 
 def tick_spacing(fee_tier: int) -> int:
@@ -160,7 +250,7 @@ def expand_ticks(ticks_df: _pd.DataFrame, decimals_x: int, decimals_y: int, fee_
 
     tick_range = list(range(min_tick, max_tick, tick_spacing(fee_tier)))
     output_df = _pd.DataFrame(tick_range, columns=["tickIdx"])
-    output_df["Price1"] = output_df.tickIdx.apply(lambda x: tick_to_price(x, decimals_x, decimals_y))
+    output_df["Price1"] = tick_to_price_array(output_df.tickIdx.to_numpy(), decimals_x, decimals_y)
     output_df["Price0"] = output_df.Price1 ** (-1)
     output_df["Liquidity"] = output_df.tickIdx.map(ticks_df["Liquidity"]).ffill()
     output_df.set_index("tickIdx", inplace=True)
@@ -178,7 +268,7 @@ def expand_decimals(number: float, exp: int) -> float:
     :return: The number with expanded decimals
     :rtype: float
     """
-    return number * 10 ** (exp)
+    return number * float(10 ** (exp))
 
 
 def get_sqrt_price_x96(price: float, decimals_x: int, decimals_y: int) -> float:
@@ -193,9 +283,25 @@ def get_sqrt_price_x96(price: float, decimals_x: int, decimals_y: int) -> float:
     :return: sqrt(price) * 2**96
     :rtype: float
     """
+    return float(get_sqrt_price_x96_array(price, decimals_x, decimals_y))
+
+
+def get_sqrt_price_x96_array(price: _tp.Any, decimals_x: int, decimals_y: int) -> _np.ndarray:
+    """Get sqrt(price) * 2**96 for an array of prices.
+
+    :param price: Prices
+    :type price: ArrayLike
+    :param decimals_x: Decimal places for X token
+    :type decimals_x: int
+    :param decimals_y: Decimal places for Y token
+    :type decimals_y: int
+    :return: sqrt(price) * 2**96
+    :rtype: np.ndarray
+    """
+    price = _np.asarray(price, dtype=_np.float64)
     token0 = expand_decimals(1 / price, decimals_y)
     token1 = expand_decimals(1, decimals_x)
-    return _m.sqrt(token0 / token1) * 2 ** (96)
+    return _np.sqrt(token0 / token1) * 2.0**96
 
 
 def calculate_liquidity(
@@ -217,25 +323,61 @@ def calculate_liquidity(
     :return: DataFrame with the calculated liquidity
     :rtype: pd.DataFrame
     """
-    lower = get_sqrt_price_x96(price_high, decimals_x, decimals_y)
-    upper = get_sqrt_price_x96(price_low, decimals_x, decimals_y)
-    cprice = get_sqrt_price_x96(price_current, decimals_x, decimals_y)
-
-    amount_x = expand_decimals(amount_x, decimals_x)
-    amount_y = expand_decimals(amount_y, decimals_y)
+    return float(calculate_liquidity_array(amount_x, amount_y, decimals_x, decimals_y, price_current, price_low, price_high))
+
+
+def calculate_liquidity_array(
+    amount_x: _tp.Any,
+    amount_y: _tp.Any,
+    decimals_x: int,
+    decimals_y: int,
+    price_current: _tp.Any,
+    price_low: _tp.Any,
+    price_high: _tp.Any,
+) -> _np.ndarray:
+    """
+    Calculate liquidity for arrays of amounts and prices.
 
-    if cprice <= lower:
-        return amount_x * (upper * lower / 2 ** (96)) / (upper - lower)
+    The arguments broadcast against each other; see calculate_liquidity.
 
-    if lower < cprice <= upper:
-        liquidity0 = amount_x * (upper * cprice / 2 ** (96)) / (upper - cprice)
-        liquidity1 = amount_y * 2 ** (96) / (cprice - lower)
-        return min(liquidity0, liquidity1)
+    :param amount_x: Amounts of X token
+    :type amount_x: ArrayLike
+    :param amount_y: Amounts of Y token
+    :type amount_y: ArrayLike
+    :param decimals_x: Decimal places for X token
+    :type decimals_x: int
+    :param decimals_y: Decimal places for Y token
+    :type decimals_y: int
+    :param price_current: The current prices of X/Y
+    :type price_current: ArrayLike
+    :param price_low: Lower price limits
+    :type price_low: ArrayLike
+    :param price_high: Higher price limits
+    :type price_high: ArrayLike
+    :return: The liquidity
+    :rtype: np.ndarray
+    :raises ValueError: If a price is NaN
+    """
+    lower = get_sqrt_price_x96_array(price_high, decimals_x, decimals_y)
+    upper = get_sqrt_price_x96_array(price_low, decimals_x, decimals_y)
+    cprice = get_sqrt_price_x96_array(price_current, decimals_x, decimals_y)
 
-    if upper < cprice:
-        return amount_y * 2 ** (96) / (upper - lower)
+    if _np.isnan(cprice).any() or _np.isnan(lower).any() or _np.isnan(upper).any():
+        raise ValueError("Error in sqrt price comparison.")
 
-    raise ValueError("Error in sqrt price comparison.")
+    amount_x = expand_decimals(_np.asarray(amount_x, dtype=_np.float64), decimals_x)
+    amount_y = expand_decimals(_np.asarray(amount_y, dtype=_np.float64), decimals_y)
+
+    below = cprice <= lower
+    above = upper < cprice
+    with _np.errstate(divide="ignore", invalid="ignore"):
+        liquidity0 = amount_x * (upper * cprice / 2.0**96) / (upper - cprice)
+        liquidity1 = amount_y * 2.0**96 / (cprice - lower)
+        return _np.where(
+            below,
+            amount_x * (upper * lower / 2.0**96) / (upper - lower),
+            _np.where(above, amount_y * 2.0**96 / (upper - lower), _np.minimum(liquidity0, liquidity1)),
+        )
 
 
 def liquidity_graph(df: _pd.DataFrame, token_0_price: float, tick: int, fee_tier: int) -> None:
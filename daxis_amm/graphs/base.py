@@ -3,10 +3,105 @@ Abstract Classes for Graphs.
 """
 import logging as _log
 import asyncio as _as
+import contextlib as _contextlib
+import contextvars as _contextvars
+import functools as _functools
+import threading as _threading
+import time as _time
 import typing as _tp
+import weakref as _weakref
 
+import aiohttp as _aiohttp
+import pandas as _pd
 from gql import Client, gql
+from gql.client import AsyncClientSession
 from gql.transport.aiohttp import AIOHTTPTransport
+from gql.transport.async_transport import AsyncTransport
+from gql.transport.exceptions import TransportQueryError
+from graphql import GraphQLSchema
+from graphql import parse as _parse
+from graphql import print_ast as _print_ast
+from graphql.language import (
+    DocumentNode as _DocumentNode,
+    NameNode as _NameNode,
+    OperationDefinitionNode as _OperationDefinitionNode,
+    OperationType as _OperationType,
+    SelectionSetNode as _SelectionSetNode,
+)
+
+from daxis_amm.graphs import replay as _replay
+from daxis_amm.graphs.cache import GraphCache
+from daxis_amm.graphs.limits import RequestLimiter, RetryPolicy
+
+# Persistent event loop of each thread used by the synchronous API.
+_thread_loops = _threading.local()
+# Results fetched inside a BaseGraph.memoize context.
+_memo: "_contextvars.ContextVar[_tp.Optional[dict]]" = _contextvars.ContextVar("daxis_amm_graph_memo", default=None)
+
+
+def coalesce(method: _tp.Callable) -> _tp.Callable:
+    """
+    Decorator making identical calls of an async Graph classmethod share a single fetch.
+
+    Place it below @classmethod. The call arguments must be hashable.
+    """
+
+    @_functools.wraps(method)
+    async def wrapper(cls, *args, **kwargs):
+        key = (cls, method.__name__) + args + tuple(sorted(kwargs.items()))
+        return await cls.single_flight(key, lambda: method(cls, *args, **kwargs))
+
+    return wrapper
+
+
+def run_sync(coroutine: _tp.Coroutine) -> _tp.Any:
+    """
+    Run a coroutine to completion on the persistent event loop of the current thread.
+
+    The loop is kept between calls so pooled sessions are reused by the synchronous API. The loop and its sessions
+    are closed when the thread is garbage collected or the process exits.
+
+    :param coroutine: The coroutine to run.
+    :type coroutine: Coroutine
+    :return: The result of the coroutine.
+    :rtype: Any
+    :raises RuntimeError: If called from inside a running event loop.
+    """
+    try:
+        _as.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        coroutine.close()
+        raise RuntimeError("Cannot block inside a running event loop; await the async API (e.g. lp.atv()) instead.")
+
+    loop = getattr(_thread_loops, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = _thread_loops.loop = _as.new_event_loop()
+        # Closed once the thread is garbage collected, or at exit for threads still alive then (e.g. the main one).
+        _weakref.finalize(_threading.current_thread(), _close_loop, loop)
+    return loop.run_until_complete(coroutine)
+
+
+def _close_loop(loop: _as.AbstractEventLoop):
+    """
+    Close the client sessions opened on a persistent event loop of the synchronous API, then the loop itself.
+
+    :param loop: The event loop.
+    :type loop: asyncio.AbstractEventLoop
+    """
+    if loop.is_closed() or loop.is_running():
+        return
+
+    async def close_sessions():
+        for graph in list(BaseGraph._sessions.get(loop, {})):
+            await graph.close()
+
+    try:
+        loop.run_until_complete(close_sessions())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    finally:
+        loop.close()
 
 
 class BaseGraph:
@@ -15,70 +110,597 @@ class BaseGraph:
     """
 
     url: str
+    page_size: int = 1000
+    max_connections: int = 10
+    keepalive_timeout: float = 60.0
+    # Builds the transport of a Graph class, e.g. to record or replay responses. Default is HTTP.
+    transport_factory: _tp.Optional[_tp.Callable[[type], AsyncTransport]] = None
+    # Validate queries against the Subgraph schema before sending them.
+    validate_schema: bool = True
+    # Optional path of the Subgraph schema (SDL) on disk. Otherwise the schema is introspected once and reused.
+    schema_path: _tp.Optional[str] = None
+    # Shared by every Graph, so the limits apply to the process as a whole.
+    limiter: RequestLimiter = RequestLimiter()
+    retry_policy: RetryPolicy = RetryPolicy()
+    max_batch_queries: int = 50
+    max_document_size: int = 100_000
+    # Event loop iterations to wait for more queries before a batch is sent.
+    batch_wait_ticks: int = 5
+    _schemas: _tp.Dict[str, GraphQLSchema] = {}
+    # Pending queries and client sessions per event loop and Graph class.
+    _pending: "_weakref.WeakKeyDictionary[_as.AbstractEventLoop, _tp.Dict[type, _tp.List]]" = _weakref.WeakKeyDictionary()
+    _in_flight: "_weakref.WeakKeyDictionary[_as.AbstractEventLoop, _tp.Dict[_tp.Hashable, _as.Task]]" = (
+        _weakref.WeakKeyDictionary()
+    )
+    _sessions: "_weakref.WeakKeyDictionary[_as.AbstractEventLoop, _tp.Dict[type, _as.Task]]" = _weakref.WeakKeyDictionary()
+    # Batches being executed, referenced until they finish since the event loop only keeps weak references to tasks.
+    _batches: _tp.Set[_as.Task] = set()
+    cache: _tp.Optional[GraphCache] = None
+    # Seconds after the end of a period before its row is treated as final and cached.
+    settle_seconds: int = 60 * 60
 
-    @staticmethod
-    async def __query_gpl(session: Client, query: str) -> dict:
+    @classmethod
+    def enable_cache(cls, path: str = ":memory:") -> GraphCache:
+        """
+        Enable the read-through cache for time series and snapshots.
+
+        :param path: Path of the SQLite database file.
+        :type path: str
+        :return: The cache.
+        :rtype: GraphCache
+        """
+        cls.cache = GraphCache(path)
+        return cls.cache
+
+    @classmethod
+    async def cached_series(
+        cls,
+        series: str,
+        key: str,
+        index: str,
+        start: int,
+        end: int,
+        period: int,
+        fetch: _tp.Callable[[int, int], _tp.Awaitable[_pd.DataFrame]],
+    ) -> _pd.DataFrame:
+        """
+        Get a time series, only fetching the ranges which are not in the cache.
+
+        Rows are only cached once their period has ended and settled, so the most recent rows are always fetched.
+
+        :param series: The name of the series.
+        :type series: str
+        :param key: The pool or token id.
+        :type key: str
+        :param index: The column holding the period start of each row.
+        :type index: str
+        :param start: Inclusive start of the range.
+        :type start: int
+        :param end: Inclusive end of the range.
+        :type end: int
+        :param period: Length of a period in seconds.
+        :type period: int
+        :param fetch: Coroutine function fetching the rows of a range from the Subgraph.
+        :type fetch: Callable[[int, int], Awaitable[pd.DataFrame]]
+        :return: The rows between start and end sorted by index.
+        :rtype: pd.DataFrame
+        """
+        memo = _memo.get()
+        memo_key = (cls, series, key)
+        if memo is not None:
+            for (memo_start, memo_end), df in memo.get(memo_key, []):
+                if memo_start <= start and end <= memo_end:
+                    return df[(df[index] >= start) & (df[index] <= end)]
+
+        df = await cls.single_flight(
+            memo_key + (start, end), lambda: cls.__read_through(series, key, index, start, end, period, fetch)
+        )
+        if memo is not None:
+            memo.setdefault(memo_key, []).append(((start, end), df))
+        return df
+
+    @classmethod
+    async def __read_through(
+        cls,
+        series: str,
+        key: str,
+        index: str,
+        start: int,
+        end: int,
+        period: int,
+        fetch: _tp.Callable[[int, int], _tp.Awaitable[_pd.DataFrame]],
+    ) -> _pd.DataFrame:
+        "Get a time series from the cache, fetching the missing ranges from the Subgraph."
+        if cls.cache is None:
+            return await fetch(start, end)
+
+        final = int(_time.time()) - period - cls.settle_seconds
+        gaps = cls.cache.missing(series, key, start, end)
+        _log.info(f"Fetching {len(gaps)} uncached ranges of {series} {key}")
+        fetched = await _as.gather(*[fetch(gap_start, gap_end) for gap_start, gap_end in gaps])
+
+        live = []
+        for (gap_start, gap_end), df in zip(gaps, fetched):
+            if gap_start <= final:
+                cls.cache.store(series, key, index, gap_start, min(gap_end, final), df)
+            live.append(df[df[index] > final])
+
+        frames = [df for df in [cls.cache.load(series, key, index, start, min(end, final))] + live if df is not None]
+        if not frames:
+            return await fetch(start, end)
+        non_empty = [df for df in frames if not df.empty]
+        if not non_empty:
+            return frames[0]
+        return _pd.concat(non_empty, ignore_index=True).sort_values(index)
+
+    @classmethod
+    async def cached_snapshot(
+        cls, series: str, key: str, max_age: int, fetch: _tp.Callable[[], _tp.Awaitable[_pd.DataFrame]]
+    ) -> _pd.DataFrame:
+        """
+        Get a snapshot from the cache if it is younger than max_age seconds, otherwise fetch and cache it.
+
+        :param series: The name of the series.
+        :type series: str
+        :param key: The pool or token id.
+        :type key: str
+        :param max_age: Maximum age of a cached snapshot in seconds.
+        :type max_age: int
+        :param fetch: Coroutine function fetching the snapshot from the Subgraph.
+        :type fetch: Callable[[], Awaitable[pd.DataFrame]]
+        :return: The snapshot.
+        :rtype: pd.DataFrame
+        """
+        if cls.cache is None:
+            return await cls.single_flight((cls, series, key), fetch)
+
+        df = cls.cache.load_snapshot(series, key, max_age)
+        if df is None:
+            df = await cls.single_flight((cls, series, key), fetch)
+            cls.cache.store_snapshot(series, key, df)
+        return df
+
+    @classmethod
+    @_contextlib.contextmanager
+    def memoize(cls):
+        """
+        Share fetched data between every fetch made inside the context, e.g. a valuation and its nested
+        calculators. Time series requests for a range inside an already fetched range are sliced from it.
+
+        Nested contexts reuse the outermost memo.
+        """
+        if _memo.get() is not None:
+            yield
+            return
+        token = _memo.set({})
+        try:
+            yield
+        finally:
+            _memo.reset(token)
+
+    @classmethod
+    async def single_flight(cls, key: _tp.Hashable, fetch: _tp.Callable[[], _tp.Awaitable[_tp.Any]]) -> _tp.Any:
+        """
+        Resolve identical concurrent fetches to a single request, and repeated fetches inside a memoize
+        context to a single result.
+
+        :param key: Key identifying the fetch, e.g. (Graph class, method name, *args).
+        :type key: Hashable
+        :param fetch: Coroutine function performing the fetch.
+        :type fetch: Callable[[], Awaitable[Any]]
+        :return: The result of the fetch.
+        :rtype: Any
+        """
+        memo = _memo.get()
+        if memo is not None and key in memo:
+            return memo[key]
+
+        in_flight = cls._in_flight.setdefault(_as.get_running_loop(), {})
+        task = in_flight.get(key)
+        if task is None:
+            task = in_flight[key] = _as.ensure_future(fetch())
+            task.add_done_callback(lambda _: in_flight.pop(key, None))
+        result = await _as.shield(task)
+
+        if memo is not None:
+            memo[key] = result
+        return result
+
+    @classmethod
+    async def __query_gpl(cls, session: AsyncClientSession, query: str) -> dict:
         """
         Query the gql graph.
 
+        Requests are bounded by the limiter and transient failures are retried with jittered exponential backoff
+        according to the retry policy.
+
         :param session: The gql client session.
-        :type session: gql.Client
+        :type session: gql.client.AsyncClientSession
         :param query: The gql query string.
         :type query: str
         :return: The query result.
         :rtype: dict
         """
-        counter = 1
+        attempt = 1
         while True:
             try:
                 _log.info(f"Retrieving {query} for Subgraph")
-                query_result = await session.execute(gql(query))
+                async with cls.limiter.limit():
+                    return await session.execute(gql(query))
             except Exception as err:
-                _log.warning(f"Retrying (total={counter}). Trying again... Error: {err}")
-                counter += 1
-                if counter > 5:
-                    _log.error(f"Query {query} failed 5 times... Stopping", exc_info=True)
+                if not cls.retry_policy.is_transient(err) or attempt >= cls.retry_policy.max_attempts:
+                    _log.error(f"Query {query} failed {attempt} times... Stopping", exc_info=True)
                     raise Exception("Query GQL error") from err
-                continue
-            break
-        return query_result
+                delay = cls.retry_policy.delay(attempt)
+                _log.warning(f"Retrying (total={attempt}) in {delay:.2f}s. Trying again... Error: {err}")
+                attempt += 1
+                await _as.sleep(delay)
 
     @classmethod
     async def query_gql(cls, queries: _tp.List[str]) -> _tp.Tuple[_tp.Dict]:
         """
         Perform multiple queries simultaneously.
 
+        Queries submitted by any caller within the same few event loop iterations are merged into aliased
+        documents of at most max_batch_queries queries and max_document_size characters, so concurrent fetches
+        share HTTP requests.
+
         :param queries: The list of gql query strings.
         :type queries: List[str]
         :return: The list of query results.
         :rtype: Tuple[Dict]
         """
-        async with Client(transport=AIOHTTPTransport(url=cls.url), fetch_schema_from_transport=True) as session:
-            tasks = [cls.__query_gpl(session, query) for query in queries]
-            responses = await _as.gather(*tasks)
-        return responses
+        loop = _as.get_running_loop()
+        pending = cls._pending.setdefault(loop, {})
+        if cls not in pending:
+            pending[cls] = []
+            loop.call_soon(cls.__flush, loop, 0, 0)
+
+        futures = []
+        for query in queries:
+            future = loop.create_future()
+            pending[cls].append((query, future))
+            futures.append(future)
+        return await _as.gather(*futures)
+
+    @classmethod
+    def __flush(cls, loop: _as.AbstractEventLoop, seen: int, ticks: int):
+        """
+        Send the pending queries once no new queries arrived during the last event loop iteration.
+
+        :param loop: The event loop the queries were submitted on.
+        :type loop: asyncio.AbstractEventLoop
+        :param seen: Number of pending queries at the previous iteration.
+        :type seen: int
+        :param ticks: Number of iterations waited so far.
+        :type ticks: int
+        """
+        queued = cls._pending[loop][cls]
+        if len(queued) != seen and ticks < cls.batch_wait_ticks:
+            loop.call_soon(cls.__flush, loop, len(queued), ticks + 1)
+            return
+
+        del cls._pending[loop][cls]
+        batch: _tp.List[_tp.Tuple[str, _as.Future]] = []
+        size = 0
+        for query, future in queued:
+            if batch and (len(batch) >= cls.max_batch_queries or size + len(query) > cls.max_document_size):
+                cls.__start_batch(batch)
+                batch, size = [], 0
+            batch.append((query, future))
+            size += len(query)
+        cls.__start_batch(batch)
+
+    @classmethod
+    def __start_batch(cls, batch: _tp.List[_tp.Tuple[str, _as.Future]]):
+        """
+        Start executing a batch of queries, keeping a reference to its task until it finishes.
+
+        :param batch: The queries and the futures awaiting their results.
+        :type batch: List[Tuple[str, asyncio.Future]]
+        """
+        task = _as.ensure_future(cls.__execute_batch(batch))
+        BaseGraph._batches.add(task)
+        task.add_done_callback(BaseGraph._batches.discard)
+
+    @classmethod
+    async def __execute_batch(cls, batch: _tp.List[_tp.Tuple[str, _as.Future]]):
+        """
+        Execute a batch of queries as a single document and resolve the future of each query.
+
+        When the Subgraph answers a merged document with errors on some of its fields, only the queries of those
+        fields fail and the other queries get their data.
+
+        :param batch: The queries and the futures awaiting their results.
+        :type batch: List[Tuple[str, asyncio.Future]]
+        """
+        queries = [query for query, _ in batch]
+        try:
+            session = await cls.session()
+            if len(queries) == 1:
+                results = [await cls.__query_gpl(session, queries[0])]
+            else:
+                document, aliases = cls.merge_queries(queries)
+                try:
+                    result, errors = await cls.__query_gpl(session, document), {}
+                except Exception as err:
+                    if not isinstance(err.__cause__, TransportQueryError) or not err.__cause__.data:
+                        raise
+                    result, errors = err.__cause__.data, cls.field_errors(err.__cause__)
+                results = [cls.__split_result(result, errors, fields) for fields in aliases]
+        except Exception as err:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
 
     @staticmethod
-    async def __wrapped_funcs(funcs: _tp.List[_tp.Coroutine]):
+    def field_errors(err: TransportQueryError) -> _tp.Dict[str, _tp.List[dict]]:
+        """
+        Group the errors of a query by the top level field they were reported on.
+
+        :param err: The error raised for a query answered with errors.
+        :type err: gql.transport.exceptions.TransportQueryError
+        :return: The errors of every field with errors, errors without a path under None.
+        :rtype: Dict[str, List[dict]]
+        """
+        errors: _tp.Dict[str, _tp.List[dict]] = {}
+        for error in err.errors or []:
+            path = error.get("path") if isinstance(error, dict) else None
+            errors.setdefault(path[0] if path else None, []).append(error)
+        return errors
+
+    @staticmethod
+    def __split_result(
+        result: dict, errors: _tp.Dict[str, _tp.List[dict]], fields: _tp.List[_tp.Tuple[str, str]]
+    ) -> _tp.Union[dict, Exception]:
+        """
+        Get the result of one query of a merged document.
+
+        :param result: The data of the merged document.
+        :type result: dict
+        :param errors: The errors of the merged document by top level field.
+        :type errors: Dict[str, List[dict]]
+        :param fields: The pairs of alias and original response key of the query.
+        :type fields: List[Tuple[str, str]]
+        :return: The result of the query, or the error of the query if any of its fields failed.
+        :rtype: Union[dict, Exception]
+        """
+        failed = [error for alias, _ in fields for error in errors.get(alias, [])] + errors.get(None, [])
+        if failed or any(alias not in result for alias, _ in fields):
+            error = Exception("Query GQL error")
+            error.__cause__ = TransportQueryError(str(failed[0] if failed else "Missing field"), errors=failed)
+            return error
+        return {name: result[alias] for alias, name in fields}
+
+    @staticmethod
+    def merge_queries(queries: _tp.List[str]) -> _tp.Tuple[str, _tp.List[_tp.List[_tp.Tuple[str, str]]]]:
+        """
+        Merge queries into a single document by aliasing their top level fields.
+
+        :param queries: The list of gql query strings.
+        :type queries: List[str]
+        :return: The merged document and, for each query, the pairs of alias and original response key.
+        :rtype: Tuple[str, List[List[Tuple[str, str]]]]
+        """
+        selections = []
+        aliases = []
+        for i, query in enumerate(queries):
+            fields = []
+            for definition in _parse(query).definitions:
+                for field in definition.selection_set.selections:
+                    name = field.alias.value if field.alias else field.name.value
+                    alias = f"q{i}_{name}"
+                    field.alias = _NameNode(value=alias)
+                    selections.append(field)
+                    fields.append((alias, name))
+            aliases.append(fields)
+
+        operation = _OperationDefinitionNode(
+            operation=_OperationType.QUERY, selection_set=_SelectionSetNode(selections=tuple(selections))
+        )
+        return _print_ast(_DocumentNode(definitions=(operation,))), aliases
+
+    @classmethod
+    def schema(cls) -> _tp.Optional[_tp.Union[str, GraphQLSchema]]:
+        """
+        Get the schema of the Subgraph if it is bundled on disk or has already been introspected.
+
+        :return: The schema or None if it still has to be fetched.
+        :rtype: Optional[Union[str, GraphQLSchema]]
+        """
+        if cls.url not in cls._schemas and cls.schema_path is not None:
+            with open(cls.schema_path, encoding="utf-8") as schema_file:
+                return schema_file.read()
+        return cls._schemas.get(cls.url)
+
+    @classmethod
+    async def __connect(cls) -> AsyncClientSession:
+        """
+        Open a client session with a keep-alive connection pool.
+
+        :return: The connected client session.
+        :rtype: gql.client.AsyncClientSession
+        """
+        _log.info(f"Opening Subgraph session to {cls.url}")
+        schema = cls.schema() if cls.validate_schema else None
+        transport = cls.transport_factory(cls) if cls.transport_factory is not None else cls.http_transport()
+        client = Client(transport=transport, schema=schema, fetch_schema_from_transport=cls.validate_schema and schema is None)
+        session = await client.connect_async()
+        if client.schema is not None:
+            cls._schemas[cls.url] = client.schema
+        return session
+
+    @classmethod
+    def http_transport(cls, transport_class: _tp.Type[AIOHTTPTransport] = AIOHTTPTransport, **kwargs) -> AIOHTTPTransport:
+        """
+        Build the HTTP transport to the Subgraph with a keep-alive connection pool.
+
+        :param transport_class: The AIOHTTP transport class. Default is AIOHTTPTransport.
+        :type transport_class: Type[AIOHTTPTransport]
+        :param kwargs: Extra arguments of the transport class.
+        :return: The transport.
+        :rtype: AIOHTTPTransport
+        """
+        connector = _aiohttp.TCPConnector(limit=cls.max_connections, keepalive_timeout=cls.keepalive_timeout)
+        return transport_class(url=cls.url, client_session_args={"connector": connector}, **kwargs)
+
+    @classmethod
+    def record(cls, directory: str):
+        """
+        Record every Subgraph response to a directory. Must be called before the first query.
+
+        :param directory: Directory to save the recordings to.
+        :type directory: str
+        """
+        recordings = _replay.Recordings(directory)
+        cls.transport_factory = lambda graph: graph.http_transport(_replay.RecordingTransport, recordings=recordings)
+
+    @classmethod
+    def replay(cls, directory: str, latency: float = 0.0):
+        """
+        Answer every query from a directory of recordings, without network access. Must be called before the
+        first query.
+
+        :param directory: Directory holding the recordings.
+        :type directory: str
+        :param latency: Seconds to wait before answering each query. Default is 0.0.
+        :type latency: float
+        """
+        recordings = _replay.Recordings(directory)
+        cls.transport_factory = lambda graph: _replay.ReplayTransport(recordings, latency)
+
+    @classmethod
+    async def session(cls) -> AsyncClientSession:
+        """
+        Get the shared client session of the Graph class on the running event loop, creating it on first use.
+
+        :return: The connected client session.
+        :rtype: gql.client.AsyncClientSession
+        """
+        sessions = cls._sessions.setdefault(_as.get_running_loop(), {})
+        if cls not in sessions:
+            sessions[cls] = _as.ensure_future(cls.__connect())
+        try:
+            return await _as.shield(sessions[cls])
+        except Exception:
+            sessions.pop(cls, None)
+            raise
+
+    @classmethod
+    async def close(cls):
+        "Close the shared client session of the running event loop."
+        task = cls._sessions.get(_as.get_running_loop(), {}).pop(cls, None)
+        if task is None:
+            return
+        try:
+            session = await task
+        except Exception:
+            return
+        await session.client.close_async()
+
+    @classmethod
+    async def paginate(
+        cls,
+        build_query: _tp.Callable[[_tp.Any], str],
+        extract: _tp.Callable[[dict], _tp.List[dict]],
+        cursor: str,
+        start: _tp.Any,
+    ) -> _tp.List[dict]:
+        """
+        Page through a query ordered by a cursor field until a page comes back short.
+
+        :param build_query: Function building the query for the first page_size rows after a cursor value.
+        :type build_query: Callable[[Any], str]
+        :param extract: Function extracting the rows from a query result.
+        :type extract: Callable[[dict], List[dict]]
+        :param cursor: The field the rows are ordered and paged by.
+        :type cursor: str
+        :param start: The cursor value before the first row.
+        :type start: Any
+        :return: The query result of every page.
+        :rtype: List[dict]
+        """
+        results = []
+        while True:
+            result = (await cls.query_gql([build_query(start)]))[0]
+            results.append(result)
+            rows = extract(result)
+            if len(rows) < cls.page_size:
+                return results
+            start = rows[-1][cursor]
+
+    @classmethod
+    async def paginate_range(
+        cls,
+        build_query: _tp.Callable[[int, int], str],
+        extract: _tp.Callable[[dict], _tp.List[dict]],
+        cursor: str,
+        start: int,
+        end: int,
+        period: int,
+    ) -> _tp.List[dict]:
+        """
+        Page through a time series query between start and end.
+
+        The range is split into windows holding fewer than page_size periods which are paged concurrently, so a
+        window comes back short and costs a single query.
+
+        :param build_query: Function building the query for the first page_size rows after a cursor value and
+            up to an inclusive end.
+        :type build_query: Callable[[int, int], str]
+        :param extract: Function extracting the rows from a query result.
+        :type extract: Callable[[dict], List[dict]]
+        :param cursor: The field the rows are ordered and paged by.
+        :type cursor: str
+        :param start: Inclusive start of the range.
+        :type start: int
+        :param end: Inclusive end of the range.
+        :type end: int
+        :param period: Length of a period in seconds.
+        :type period: int
+        :return: The query result of every page, in cursor order.
+        :rtype: List[dict]
+        """
+        window = (cls.page_size - 1) * period
+        windows = [(after, min(after + window, end)) for after in range(start - 1, end, window)]
+        pages = await _as.gather(
+            *[
+                cls.paginate(lambda after, until=until: build_query(after, until), extract, cursor, after)
+                for after, until in windows
+            ]
+        )
+        return [result for page in pages for result in page]
+
+    @classmethod
+    async def gather(cls, funcs: _tp.Dict[str, _tp.Coroutine]) -> _tp.Dict[str, _tp.Any]:
         """
         Perform multiple asyncio Graph functions simultaneously.
 
-        :param funcs: The list of coroutines representing the graph functions.
-        :type funcs: List[Coroutine]
-        :return: The list of responses.
+        :param funcs: The dictionary of function names and coroutines.
+        :type funcs: Dict[str, Coroutine]
+        :return: The dictionary of function names and their results.
+        :rtype: Dict[str, Any]
         """
-        responses = await _as.gather(*funcs, return_exceptions=True)
-        return responses
+        responses = await _as.gather(*funcs.values(), return_exceptions=True)
+        return dict(zip(funcs.keys(), responses))
 
     @classmethod
     def run(cls, funcs: _tp.Dict[str, _tp.Coroutine]) -> _tp.Dict[str, _tp.Any]:
         """
-        Perform multiple queries simultaneously.
+        Perform multiple queries simultaneously, blocking until they are done.
 
         :param funcs: The dictionary of function names and coroutines.
         :type funcs: Dict[str, Coroutine]
         :return: The dictionary of function names and their results.
         :rtype: Dict[str, Any]
         """
-        wrapped_funcs = cls.__wrapped_funcs(list(funcs.values()))
-        return dict(zip(funcs.keys(), _as.get_event_loop().run_until_complete(wrapped_funcs)))
+        return run_sync(cls.gather(funcs))
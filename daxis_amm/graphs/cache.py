@@ -0,0 +1,209 @@
+"""
+Module defining the on-disk cache for Graph data.
+"""
+import sqlite3 as _sqlite3
+import threading as _threading
+import time as _time
+import typing as _tp
+
+import pandas as _pd
+
+
+class GraphCache:
+    """
+    Read-through SQLite store for Subgraph time series and snapshots.
+
+    Time series rows are stored per ``(series, key)`` together with the index ranges which have been fully
+    fetched, so only the gaps have to be requested from the Subgraph. Snapshots (e.g. pool ticks) are stored
+    whole with the time they were fetched and expire after ``max_age`` seconds.
+
+    The connection is shared by the event loops of every thread, so its statements are serialized by a lock and
+    multi-statement writes are never interleaved.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        Initialize a GraphCache object.
+
+        :param path: Path of the SQLite database file. Default is an in-memory database.
+        :type path: str
+        """
+        self.path = path
+        self._conn = _sqlite3.connect(path, check_same_thread=False)
+        self._lock = _threading.RLock()
+        self._conn.execute('CREATE TABLE IF NOT EXISTS "coverage" (series TEXT, key TEXT, start INTEGER, end INTEGER)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS "snapshots" (series TEXT, key TEXT, fetched INTEGER, PRIMARY KEY (series, key))'
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _table(series: str) -> str:
+        "Name of the table holding the rows of a series."
+        return f"series_{series}"
+
+    def _has_table(self, series: str) -> bool:
+        "Evaluate if rows have ever been stored for the series."
+        with self._lock:
+            cursor = self._conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (self._table(series),))
+            return cursor.fetchone() is not None
+
+    def coverage(self, series: str, key: str) -> _tp.List[_tp.Tuple[int, int]]:
+        """
+        Get the fully fetched index ranges of a series.
+
+        :param series: The name of the series.
+        :type series: str
+        :param key: The pool or token id.
+        :type key: str
+        :return: Sorted, non-overlapping inclusive ranges.
+        :rtype: List[Tuple[int, int]]
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                'SELECT start, end FROM "coverage" WHERE series = ? AND key = ? ORDER BY start', (series, key)
+            )
+            return [(int(start), int(end)) for start, end in cursor.fetchall()]
+
+    def missing(self, series: str, key: str, start: int, end: int) -> _tp.List[_tp.Tuple[int, int]]:
+        """
+        Get the index ranges between start and end which have not been fetched yet.
+
+        :param series: The name of the series.
+        :type series: str
+        :param key: The pool or token id.
+        :type key: str
+        :param start: Inclusive start of the requested range.
+        :type start: int
+        :param end: Inclusive end of the requested range.
+        :type end: int
+        :return: Inclusive ranges which have to be fetched from the Subgraph.
+        :rtype: List[Tuple[int, int]]
+        """
+        gaps = []
+        cursor = start
+        for covered_start, covered_end in self.coverage(series, key):
+            if covered_end < cursor:
+                continue
+            if covered_start > end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start - 1))
+            cursor = covered_end + 1
+            if cursor > end:
+                break
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def _add_coverage(self, series: str, key: str, start: int, end: int):
+        "Add a range to the coverage of a series, merging overlapping and adjacent ranges."
+        with self._lock:
+            merged: _tp.List[_tp.List[int]] = []
+            for covered_start, covered_end in sorted(self.coverage(series, key) + [(start, end)]):
+                if merged and covered_start <= merged[-1][1] + 1:
+                    merged[-1][1] = max(merged[-1][1], covered_end)
+                else:
+                    merged.append([covered_start, covered_end])
+            self._conn.execute('DELETE FROM "coverage" WHERE series = ? AND key = ?', (series, key))
+            self._conn.executemany(
+                'INSERT INTO "coverage" VALUES (?, ?, ?, ?)', [(series, key, low, high) for low, high in merged]
+            )
+
+    def store(self, series: str, key: str, index: str, start: int, end: int, df: _pd.DataFrame):
+        """
+        Store the rows of a fully fetched range of a series.
+
+        :param series: The name of the series.
+        :type series: str
+        :param key: The pool or token id.
+        :type key: str
+        :param index: The column holding the period start of each row.
+        :type index: str
+        :param start: Inclusive start of the fetched range.
+        :type start: int
+        :param end: Inclusive end of the fetched range.
+        :type end: int
+        :param df: The rows fetched for the range.
+        :type df: pd.DataFrame
+        """
+        table = self._table(series)
+        rows = df[(df[index] >= start) & (df[index] <= end)].assign(_key=key)
+        with self._lock:
+            if self._has_table(series):
+                self._conn.execute(f'DELETE FROM "{table}" WHERE _key = ? AND "{index}" BETWEEN ? AND ?', (key, start, end))
+            rows.to_sql(table, self._conn, if_exists="append", index=False)
+            self._add_coverage(series, key, start, end)
+            self._conn.commit()
+
+    def load(self, series: str, key: str, index: str, start: int, end: int) -> _tp.Optional[_pd.DataFrame]:
+        """
+        Load the stored rows of a series between start and end.
+
+        :param series: The name of the series.
+        :type series: str
+        :param key: The pool or token id.
+        :type key: str
+        :param index: The column holding the period start of each row.
+        :type index: str
+        :param start: Inclusive start of the range.
+        :type start: int
+        :param end: Inclusive end of the range.
+        :type end: int
+        :return: The stored rows or None if nothing has been stored for the series.
+        :rtype: Optional[pd.DataFrame]
+        """
+        with self._lock:
+            if not self._has_table(series):
+                return None
+            df = _pd.read_sql(
+                f'SELECT * FROM "{self._table(series)}" WHERE _key = ? AND "{index}" BETWEEN ? AND ?',
+                self._conn,
+                params=(key, start, end),
+            )
+        return df.drop(columns="_key")
+
+    def store_snapshot(self, series: str, key: str, df: _pd.DataFrame):
+        """
+        Store a snapshot, replacing any previous snapshot of the series.
+
+        :param series: The name of the series.
+        :type series: str
+        :param key: The pool or token id.
+        :type key: str
+        :param df: The snapshot.
+        :type df: pd.DataFrame
+        """
+        table = self._table(series)
+        with self._lock:
+            if self._has_table(series):
+                self._conn.execute(f'DELETE FROM "{table}" WHERE _key = ?', (key,))
+            df.assign(_key=key).to_sql(table, self._conn, if_exists="append", index=False)
+            self._conn.execute('INSERT OR REPLACE INTO "snapshots" VALUES (?, ?, ?)', (series, key, int(_time.time())))
+            self._conn.commit()
+
+    def load_snapshot(self, series: str, key: str, max_age: int) -> _tp.Optional[_pd.DataFrame]:
+        """
+        Load a snapshot if it was fetched less than max_age seconds ago.
+
+        :param series: The name of the series.
+        :type series: str
+        :param key: The pool or token id.
+        :type key: str
+        :param max_age: Maximum age of the snapshot in seconds.
+        :type max_age: int
+        :return: The snapshot or None if there is no fresh snapshot.
+        :rtype: Optional[pd.DataFrame]
+        """
+        with self._lock:
+            cursor = self._conn.execute('SELECT fetched FROM "snapshots" WHERE series = ? AND key = ?', (series, key))
+            row = cursor.fetchone()
+            if row is None or _time.time() - row[0] > max_age:
+                return None
+            df = _pd.read_sql(f'SELECT * FROM "{self._table(series)}" WHERE _key = ?', self._conn, params=(key,))
+        return df.drop(columns="_key")
+
+    def close(self):
+        "Close the underlying SQLite connection."
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,63 @@
+"""
+Module defining the columnar decoding of Subgraph responses.
+"""
+import itertools as _itertools
+import operator as _operator
+import typing as _tp
+
+import numpy as _np
+import pandas as _pd
+
+# Column name -> (path of the field in a record, "float" or "int").
+Columns = _tp.Dict[str, _tp.Tuple[_tp.Union[str, _tp.Tuple[str, ...]], str]]
+
+
+def _values(rows: _tp.Iterable[dict], path: _tp.Union[str, _tp.Tuple[str, ...]]) -> _tp.Iterator[_tp.Any]:
+    """
+    Iterate over a (possibly nested) field of records, looking every level up with operator.itemgetter.
+
+    :param rows: The records.
+    :type rows: Iterable[dict]
+    :param path: Field name or tuple of nested field names.
+    :type path: Union[str, Tuple[str, ...]]
+    :return: The field of every record.
+    :rtype: Iterator[Any]
+    """
+    values = iter(rows)
+    for name in (path,) if isinstance(path, str) else path:
+        values = map(_operator.itemgetter(name), values)
+    return values
+
+
+def decode_pages(
+    pages: _tp.List[dict],
+    records: _tp.Callable[[dict], _tp.List[dict]],
+    columns: Columns,
+    float_dtype: _tp.Any = _np.float64,
+) -> _pd.DataFrame:
+    """
+    Decode pages of Subgraph records into a DataFrame of typed columns.
+
+    Each column is parsed across all pages straight into an array of its final size by numpy.fromiter, so no
+    per-row Python lists or functions are built. Subgraph numbers are returned as strings (BigDecimal/BigInt) or
+    JSON numbers (Int), both are parsed by NumPy.
+
+    :param pages: The query result of every page.
+    :type pages: List[dict]
+    :param records: Function extracting the records from a page.
+    :type records: Callable[[dict], List[dict]]
+    :param columns: Mapping of column name to field path and kind ("float" or "int").
+    :type columns: Columns
+    :param float_dtype: dtype of the float columns, e.g. np.float32 to halve memory. Default is np.float64.
+    :type float_dtype: Any
+    :return: DataFrame with one column per entry of columns.
+    :rtype: pd.DataFrame
+    """
+    page_records = [records(page) for page in pages]
+    size = sum(len(rows) for rows in page_records)
+    arrays = {}
+    for name, (path, kind) in columns.items():
+        values = _itertools.chain.from_iterable(_values(rows, path) for rows in page_records)
+        arrays[name] = _np.fromiter(values, dtype=float_dtype if kind == "float" else _np.int64, count=size)
+
+    return _pd.DataFrame(arrays, copy=False)
@@ -0,0 +1,136 @@
+"""
+Module defining request limits and retry policies for Graphs.
+"""
+import asyncio as _as
+import contextlib as _contextlib
+import random as _random
+import threading as _threading
+import time as _time
+import typing as _tp
+import weakref as _weakref
+
+import aiohttp as _aiohttp
+from gql.transport.exceptions import TransportClosed, TransportProtocolError, TransportServerError
+
+
+class TokenBucket:
+    """
+    Token bucket limiting the rate of requests across every event loop and thread of the process.
+    """
+
+    def __init__(self, rate: float, capacity: _tp.Optional[float] = None):
+        """
+        Initialize a TokenBucket object.
+
+        :param rate: Tokens added per second.
+        :type rate: float
+        :param capacity: Maximum number of tokens, i.e. the largest burst. Default is rate.
+        :type capacity: Optional[float]
+        """
+        self.rate = rate
+        self.capacity = max(1.0, rate) if capacity is None else capacity
+        self._tokens = self.capacity
+        self._updated = _time.monotonic()
+        self._lock = _threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token, borrowing it from the future if the bucket is empty.
+
+        :return: Seconds to wait before the token may be used.
+        :rtype: float
+        """
+        with self._lock:
+            now = _time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self):
+        "Wait until a token is available."
+        wait = self.reserve()
+        if wait > 0:
+            await _as.sleep(wait)
+
+
+class RequestLimiter:
+    """
+    Limit the number of requests in flight and the rate at which they are sent.
+
+    The rate is shared process-wide. The concurrency limit applies per event loop, as asyncio semaphores
+    cannot be shared between loops.
+    """
+
+    def __init__(self, max_concurrency: int = 8, requests_per_second: _tp.Optional[float] = None):
+        """
+        Initialize a RequestLimiter object.
+
+        :param max_concurrency: Maximum number of requests in flight. Default is 8.
+        :type max_concurrency: int
+        :param requests_per_second: Maximum request rate. Default is None for no rate limit.
+        :type requests_per_second: Optional[float]
+        """
+        self.max_concurrency = max_concurrency
+        self.bucket = None if requests_per_second is None else TokenBucket(requests_per_second)
+        self._semaphores: "_weakref.WeakKeyDictionary[_as.AbstractEventLoop, _as.Semaphore]" = _weakref.WeakKeyDictionary()
+
+    @_contextlib.asynccontextmanager
+    async def limit(self):
+        "Hold a concurrency slot and a rate token for the duration of a request."
+        loop = _as.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = _as.Semaphore(self.max_concurrency)
+        async with self._semaphores[loop]:
+            if self.bucket is not None:
+                await self.bucket.acquire()
+            yield
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter which only retries transient errors.
+
+    Connection errors, timeouts, HTTP 429 and HTTP 5xx responses are retried. GraphQL errors and any other
+    HTTP error fail immediately.
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30.0):
+        """
+        Initialize a RetryPolicy object.
+
+        :param max_attempts: Maximum number of attempts per request. Default is 5.
+        :type max_attempts: int
+        :param base_delay: Delay cap in seconds after the first failure. Default is 0.5.
+        :type base_delay: float
+        :param max_delay: Maximum delay cap in seconds. Default is 30.0.
+        :type max_delay: float
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @staticmethod
+    def is_transient(err: Exception) -> bool:
+        """
+        Evaluate if a request failed with an error worth retrying.
+
+        :param err: The error raised by the request.
+        :type err: Exception
+        :return: True if the request should be retried.
+        :rtype: bool
+        """
+        if isinstance(err, TransportServerError):
+            return err.code is None or err.code == 429 or err.code >= 500
+        return isinstance(err, (_aiohttp.ClientError, _as.TimeoutError, ConnectionError, TransportClosed, TransportProtocolError))
+
+    def delay(self, attempt: int) -> float:
+        """
+        Get the delay before the next attempt.
+
+        :param attempt: Number of attempts made so far.
+        :type attempt: int
+        :return: Seconds to wait.
+        :rtype: float
+        """
+        return _random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
@@ -0,0 +1,249 @@
+"""
+Module defining recording and replaying of Subgraph responses for offline tests and benchmarks.
+"""
+import argparse as _argparse
+import asyncio as _as
+import hashlib as _hashlib
+import json as _json
+import logging as _log
+import os as _os
+import typing as _tp
+
+from aiohttp import web as _web
+from gql.transport.aiohttp import AIOHTTPTransport
+from gql.transport.async_transport import AsyncTransport
+from gql.transport.exceptions import TransportQueryError
+from graphql import DocumentNode, ExecutionResult
+from graphql import parse as _parse
+from graphql import print_ast as _print_ast
+
+
+class Recordings:
+    """
+    Directory of recorded Subgraph responses, one JSON file per query.
+
+    Queries are keyed on their normalized document and variables, so formatting differences do not matter.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize a Recordings object.
+
+        :param directory: Directory holding the recordings.
+        :type directory: str
+        """
+        self.directory = directory
+
+    @staticmethod
+    def key(document: _tp.Union[str, DocumentNode], variables: _tp.Optional[dict] = None) -> str:
+        """
+        Get the key of a query.
+
+        :param document: The query document or string.
+        :type document: Union[str, DocumentNode]
+        :param variables: The query variables.
+        :type variables: Optional[dict]
+        :return: The key of the query.
+        :rtype: str
+        """
+        if isinstance(document, str):
+            document = _parse(document)
+        payload = _print_ast(document) + _json.dumps(variables or {}, sort_keys=True)
+        return _hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> str:
+        "Path of the recording of a key."
+        return _os.path.join(self.directory, f"{key}.json")
+
+    def save(self, document: DocumentNode, variables: _tp.Optional[dict], data: dict):
+        """
+        Save the response data of a query.
+
+        :param document: The query document.
+        :type document: DocumentNode
+        :param variables: The query variables.
+        :type variables: Optional[dict]
+        :param data: The response data.
+        :type data: dict
+        """
+        _os.makedirs(self.directory, exist_ok=True)
+        with open(self.path(self.key(document, variables)), "w", encoding="utf-8") as recording:
+            _json.dump({"query": _print_ast(document), "variables": variables, "data": data}, recording)
+
+    def load(self, document: _tp.Union[str, DocumentNode], variables: _tp.Optional[dict] = None) -> _tp.Optional[dict]:
+        """
+        Load the response data of a query.
+
+        :param document: The query document or string.
+        :type document: Union[str, DocumentNode]
+        :param variables: The query variables.
+        :type variables: Optional[dict]
+        :return: The response data or None if the query has not been recorded.
+        :rtype: Optional[dict]
+        """
+        path = self.path(self.key(document, variables))
+        if not _os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as recording:
+            return _json.load(recording)["data"]
+
+
+class RecordingTransport(AIOHTTPTransport):
+    """
+    AIOHTTP transport saving every successful response to a Recordings directory.
+    """
+
+    def __init__(self, recordings: Recordings, **kwargs):
+        """
+        Initialize a RecordingTransport object.
+
+        :param recordings: The recordings to save responses to.
+        :type recordings: Recordings
+        :param kwargs: Arguments of gql.transport.aiohttp.AIOHTTPTransport.
+        """
+        super().__init__(**kwargs)
+        self.recordings = recordings
+
+    async def execute(self, document: DocumentNode, variable_values: _tp.Optional[dict] = None, *args, **kwargs):
+        "Execute the query against the Subgraph and record the response."
+        result = await super().execute(document, variable_values, *args, **kwargs)
+        if result.errors is None:
+            self.recordings.save(document, variable_values, result.data)
+        return result
+
+
+class ReplayTransport(AsyncTransport):
+    """
+    Transport answering queries from a Recordings directory without any network access.
+    """
+
+    def __init__(self, recordings: Recordings, latency: float = 0.0):
+        """
+        Initialize a ReplayTransport object.
+
+        :param recordings: The recordings to answer queries from.
+        :type recordings: Recordings
+        :param latency: Seconds to wait before answering each query. Default is 0.0.
+        :type latency: float
+        """
+        self.recordings = recordings
+        self.latency = latency
+
+    async def connect(self):
+        "Nothing to connect to."
+
+    async def close(self):
+        "Nothing to close."
+
+    async def execute(self, document: DocumentNode, variable_values: _tp.Optional[dict] = None, *args, **kwargs):
+        """
+        Answer a query from the recordings.
+
+        :raises TransportQueryError: If the query has not been recorded.
+        """
+        if self.latency:
+            await _as.sleep(self.latency)
+        data = self.recordings.load(document, variable_values)
+        if data is None:
+            raise TransportQueryError(f"No recording for query {_print_ast(document)}")
+        return ExecutionResult(data=data)
+
+    def subscribe(self, document: DocumentNode, *args, **kwargs):
+        """
+        Subscriptions are not recorded, so they cannot be replayed.
+
+        :raises NotImplementedError: Always.
+        """
+        raise NotImplementedError(f"Subscriptions cannot be replayed, only queries are recorded: {_print_ast(document)}")
+
+
+class ReplayServer:
+    """
+    Local HTTP GraphQL endpoint serving recorded responses with a configurable latency.
+
+    Pointing a Graph's url at the server exercises the full HTTP stack (connection pooling, batching, rate
+    limits) without touching the real Subgraph.
+    """
+
+    def __init__(self, directory: str, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        """
+        Initialize a ReplayServer object.
+
+        :param directory: Directory holding the recordings.
+        :type directory: str
+        :param host: Host to listen on. Default is 127.0.0.1.
+        :type host: str
+        :param port: Port to listen on. Default is 0 for any free port.
+        :type port: int
+        :param latency: Seconds to wait before answering each request. Default is 0.0.
+        :type latency: float
+        """
+        self.recordings = Recordings(directory)
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.requests = 0
+        self._runner: _tp.Optional[_web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        "URL of the GraphQL endpoint."
+        return f"http://{self.host}:{self.port}/"
+
+    async def handle(self, request: _web.Request) -> _web.Response:
+        """
+        Answer a GraphQL POST request from the recordings.
+
+        :param request: The HTTP request.
+        :type request: aiohttp.web.Request
+        :return: The GraphQL response.
+        :rtype: aiohttp.web.Response
+        """
+        self.requests += 1
+        payload = await request.json()
+        if self.latency:
+            await _as.sleep(self.latency)
+        data = self.recordings.load(payload["query"], payload.get("variables"))
+        if data is None:
+            _log.warning(f"No recording for query {payload['query']}")
+            return _web.json_response({"errors": [{"message": "No recording for query"}]})
+        return _web.json_response({"data": data})
+
+    async def start(self):
+        "Start serving."
+        app = _web.Application()
+        app.router.add_post("/", self.handle)
+        self._runner = _web.AppRunner(app)
+        await self._runner.setup()
+        site = _web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        _log.info(f"Serving recordings from {self.recordings.directory} on {self.url}")
+
+    async def stop(self):
+        "Stop serving."
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def main():
+    "Serve a directory of recordings, e.g. python -m daxis_amm.graphs.replay recordings/ --latency 0.05."
+    parser = _argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("directory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    _log.basicConfig(level=_log.INFO)
+
+    async def serve():
+        server = ReplayServer(args.directory, args.host, args.port, args.latency)
+        await server.start()
+        await _as.Event().wait()
+
+    _as.run(serve())
+
+
+if __name__ == "__main__":
+    main()
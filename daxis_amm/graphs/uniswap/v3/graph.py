@@ -2,11 +2,57 @@
 Module defining the Uniswap V3 Graphs.
 """
 import logging as _log
+import typing as _tp
 
-import pandas as _pd
+import numpy as _np
 
 from daxis_amm.instruments.uniswap_v3 import Pool, Token
-from daxis_amm.graphs.base import BaseGraph
+from daxis_amm.graphs.base import BaseGraph, coalesce, run_sync
+from daxis_amm.graphs.decode import Columns, decode_pages as _decode_pages
+
+# Lowest tick a Uniswap V3 position can be initialized at.
+MIN_TICK = -887272
+
+TOKEN_DAY_COLUMNS: Columns = {
+    "Close": ("close", "float"),
+    "High": ("high", "float"),
+    "Low": ("low", "float"),
+    "Open": ("open", "float"),
+    "Date": ("date", "int"),
+}
+TOKEN_HOUR_COLUMNS: Columns = {
+    "Close": ("close", "float"),
+    "High": ("high", "float"),
+    "Low": ("low", "float"),
+    "Open": ("open", "float"),
+    "psUnix": ("periodStartUnix", "int"),
+}
+POOL_HOUR_COLUMNS: Columns = {
+    "Close": ("close", "float"),
+    "High": ("high", "float"),
+    "Low": ("low", "float"),
+    "Open": ("open", "float"),
+    "feesUSD": ("feesUSD", "float"),
+    "psUnix": ("periodStartUnix", "int"),
+}
+POOL_DAY_COLUMNS: Columns = {
+    "Date": ("date", "float"),
+    "FeesUSD": ("feesUSD", "float"),
+    "volumeToken0": ("volumeToken0", "float"),
+    "volumeToken1": ("volumeToken1", "float"),
+    "volumeUSD": ("volumeUSD", "float"),
+}
+# Tick liquidity can exceed the float32 range, so ticks are always decoded as float64.
+TICK_COLUMNS: Columns = {
+    "liquidityGross": ("liquidityGross", "float"),
+    "liquidityNet": ("liquidityNet", "float"),
+    "tickIdx": ("tickIdx", "int"),
+}
+TICK_DAY_COLUMNS: Columns = {
+    "liquidityGross": ("liquidityGross", "float"),
+    "liquidityNet": ("liquidityNet", "float"),
+    "tickIdx": (("tick", "tickIdx"), "int"),
+}
 
 
 class UniswapV3Graph(BaseGraph):
@@ -15,8 +61,12 @@ class UniswapV3Graph(BaseGraph):
     """
 
     url: str = "https://api.thegraph.com/subgraphs/name/uniswap/uniswap-v3"
+    ticks_max_age: int = 60 * 60
+    # dtype of decoded price, fee and volume columns; np.float32 halves their memory.
+    float_dtype = _np.float64
 
     @classmethod
+    @coalesce
     async def get_static_pool_info(cls, pool_id: str):
         """
         Get static pool information from the Subgraph.
@@ -38,6 +88,57 @@ class UniswapV3Graph(BaseGraph):
         return results[0]
 
     @classmethod
+    async def get_static_pools_info(cls, pool_ids: _tp.List[str]) -> _tp.List[dict]:
+        """
+        Get static pool information of many pools from the Subgraph, page_size pools per query.
+
+        :param pool_ids: The IDs of the pools.
+        :type pool_ids: List[str]
+        :return: The static pool information of every pool found.
+        :rtype: List[dict]
+        """
+        _log.info(f"Retrieving {len(pool_ids)} Pools Static Info for Subgraph")
+        queries = [
+            (
+                "{pools(first: "
+                + str(cls.page_size)
+                + " where: {id_in: ["
+                + ", ".join(f'"{pool_id}"' for pool_id in pool_ids[i : i + cls.page_size])
+                + "]}){id feeTier token0{id symbol name decimals totalSupply}token1{id symbol name decimals totalSupply}}}"
+            )
+            for i in range(0, len(pool_ids), cls.page_size)
+        ]
+        results = await cls.query_gql(queries)
+        return [pool for result in results for pool in result["pools"]]
+
+    @classmethod
+    async def get_top_pools_info(cls, count: int) -> _tp.List[dict]:
+        """
+        Get static pool information of the pools with the largest total value locked from the Subgraph.
+
+        :param count: The number of pools.
+        :type count: int
+        :return: The static pool information and totalValueLockedUSD of every pool, by descending TVL.
+        :rtype: List[dict]
+        """
+        _log.info(f"Retrieving the top {count} Pools by TVL for Subgraph")
+        queries = [
+            (
+                "{pools(first: "
+                + str(min(cls.page_size, count - skip))
+                + " skip: "
+                + str(skip)
+                + " orderBy: totalValueLockedUSD orderDirection: desc)"
+                + "{id feeTier totalValueLockedUSD token0{id symbol name decimals totalSupply}"
+                + "token1{id symbol name decimals totalSupply}}}"
+            )
+            for skip in range(0, count, cls.page_size)
+        ]
+        results = await cls.query_gql(queries)
+        return [pool for result in results for pool in result["pools"]]
+
+    @classmethod
+    @coalesce
     async def get_dynamic_pool_info(cls, pool_id: str):
         """
         Get dynamic pool information from the Subgraph.
@@ -127,6 +228,7 @@ class UniswapV3Graph(BaseGraph):
         }
 
     @classmethod
+    @coalesce
     async def get_token_day_data_info(cls, token_id: str):
         """
         Get token day data from the Subgraph.
@@ -138,34 +240,27 @@ class UniswapV3Graph(BaseGraph):
         """
         _log.info(f"Retrieving Token Day Data {token_id} for Subgraph")
 
-        querys = [
-            (
+        results = await cls.paginate(
+            lambda after: (
                 '{token(id: "'
                 + token_id
-                + '"){tokenDayData(first: 1000, skip: '
-                + str(skip)
-                + " orderBy: date orderDirection: desc){date close high low open}}}"
-            )
-            for skip in range(0, 6000, 1000)
-        ]
-        results = await cls.query_gql(querys)
-
-        ohlc_hour_list = []
-        for poolInfo in results:
-            for i in range(len(poolInfo["token"]["tokenDayData"])):
-                close = float(poolInfo["token"]["tokenDayData"][i]["close"])
-                high = float(poolInfo["token"]["tokenDayData"][i]["high"])
-                low = float(poolInfo["token"]["tokenDayData"][i]["low"])
-                open = float(poolInfo["token"]["tokenDayData"][i]["open"])
-                date = poolInfo["token"]["tokenDayData"][i]["date"]
-                tempList = [close, high, low, open, date]
-                ohlc_hour_list.append(tempList)
-        return _pd.DataFrame(ohlc_hour_list, columns=["Close", "High", "Low", "Open", "Date"])
+                + '"){tokenDayData(first: '
+                + str(cls.page_size)
+                + " orderBy: date orderDirection: asc where: {date_gt: "
+                + str(after)
+                + "}){date close high low open}}}"
+            ),
+            lambda result: result["token"]["tokenDayData"],
+            "date",
+            0,
+        )
+
+        return _decode_pages(results, lambda result: result["token"]["tokenDayData"], TOKEN_DAY_COLUMNS, cls.float_dtype)
 
     @classmethod
     async def get_token_hour_data_info(cls, token_id: str, start_date, end_date):
         """
-        Get token hour data from the Subgraph.
+        Get token hour data from the cache or the Subgraph.
 
         :param token_id: The ID of the token.
         :type token_id: str
@@ -174,40 +269,48 @@ class UniswapV3Graph(BaseGraph):
         :return: The token hour data.
         :rtype: pd.DataFrame
         """
+        return await cls.cached_series(
+            "token_hour",
+            token_id,
+            "psUnix",
+            int(start_date),
+            int(end_date),
+            60 * 60,
+            lambda start, end: cls._query_token_hour_data_info(token_id, start, end),
+        )
+
+    @classmethod
+    async def _query_token_hour_data_info(cls, token_id: str, start_date, end_date):
+        "Query token hour data from the Subgraph."
         _log.info(f"Retrieving Token Hour Data {token_id} for Subgraph")
 
-        querys = [
-            (
-                "{tokenHourDatas(first: 1000 skip:"
-                + str(skip)
-                + ' orderBy:periodStartUnix orderDirection:desc where: {token:"'
+        results = await cls.paginate_range(
+            lambda after, until: (
+                "{tokenHourDatas(first: "
+                + str(cls.page_size)
+                + ' orderBy:periodStartUnix orderDirection:asc where: {token:"'
                 + str(token_id)
-                + '" periodStartUnix_gte: '
-                + str(start_date)
+                + '" periodStartUnix_gt: '
+                + str(after)
                 + " periodStartUnix_lte: "
-                + str(end_date)
+                + str(until)
                 + "}){periodStartUnix close open high low}}"
-            )
-            for skip in range(0, 6000, 1000)
-        ]
-        results = await cls.query_gql(querys)
-
-        ohlc_hour_list = []
-        for poolInfo in results:
-            for i in range(len(poolInfo["tokenHourDatas"])):
-                close = float(poolInfo["tokenHourDatas"][i]["close"])
-                high = float(poolInfo["tokenHourDatas"][i]["high"])
-                low = float(poolInfo["tokenHourDatas"][i]["low"])
-                open = float(poolInfo["tokenHourDatas"][i]["open"])
-                periodStartUnix = poolInfo["tokenHourDatas"][i]["periodStartUnix"]
-                tempList = [close, high, low, open, periodStartUnix]
-                ohlc_hour_list.append(tempList)
-        return _pd.DataFrame(ohlc_hour_list, columns=["Close", "High", "Low", "Open", "psUnix"]).sort_values("psUnix")
+            ),
+            lambda result: result["tokenHourDatas"],
+            "periodStartUnix",
+            int(start_date),
+            int(end_date),
+            60 * 60,
+        )
+
+        return _decode_pages(results, lambda result: result["tokenHourDatas"], TOKEN_HOUR_COLUMNS, cls.float_dtype).sort_values(
+            "psUnix"
+        )
 
     @classmethod
     async def get_pool_hour_data_info(cls, pool_id: str, start_date, end_date):
         """
-        Get pool hour data from the Subgraph.
+        Get pool hour data from the cache or the Subgraph.
 
         :param pool_id: The ID of the pool.
         :type pool_id: str
@@ -216,42 +319,48 @@ class UniswapV3Graph(BaseGraph):
         :return: The pool hour data.
         :rtype: pd.DataFrame
         """
+        return await cls.cached_series(
+            "pool_hour",
+            pool_id,
+            "psUnix",
+            int(start_date),
+            int(end_date),
+            60 * 60,
+            lambda start, end: cls._query_pool_hour_data_info(pool_id, start, end),
+        )
+
+    @classmethod
+    async def _query_pool_hour_data_info(cls, pool_id: str, start_date, end_date):
+        "Query pool hour data from the Subgraph."
         _log.info(f"Retrieving Pool Hour Data {pool_id} for Subgraph")
 
-        querys = [
-            (
+        results = await cls.paginate_range(
+            lambda after, until: (
                 '{pool(id: "'
                 + pool_id
-                + '"){poolHourData(first: 1000, skip: '
-                + str(skip)
-                + " orderBy: periodStartUnix orderDirection: desc where: {periodStartUnix_gte: "
-                + str(start_date)
+                + '"){poolHourData(first: '
+                + str(cls.page_size)
+                + " orderBy: periodStartUnix orderDirection: asc where: {periodStartUnix_gt: "
+                + str(after)
                 + " periodStartUnix_lte: "
-                + str(end_date)
+                + str(until)
                 + "}){periodStartUnix close high low open feesUSD}}}"
-            )
-            for skip in range(0, 6000, 1000)
-        ]
-
-        results = await cls.query_gql(querys)
-
-        ohlc_hour_list = []
-        for poolInfo in results:
-            for i in range(len(poolInfo["pool"]["poolHourData"])):
-                close = float(poolInfo["pool"]["poolHourData"][i]["close"])
-                high = float(poolInfo["pool"]["poolHourData"][i]["high"])
-                low = float(poolInfo["pool"]["poolHourData"][i]["low"])
-                open = float(poolInfo["pool"]["poolHourData"][i]["open"])
-                fees_usd = float(poolInfo["pool"]["poolHourData"][i]["feesUSD"])
-                periodStartUnix = poolInfo["pool"]["poolHourData"][i]["periodStartUnix"]
-                tempList = [close, high, low, open, fees_usd, periodStartUnix]
-                ohlc_hour_list.append(tempList)
-        return _pd.DataFrame(ohlc_hour_list, columns=["Close", "High", "Low", "Open", "feesUSD", "psUnix"]).sort_values("psUnix")
+            ),
+            lambda result: result["pool"]["poolHourData"],
+            "periodStartUnix",
+            int(start_date),
+            int(end_date),
+            60 * 60,
+        )
+
+        return _decode_pages(
+            results, lambda result: result["pool"]["poolHourData"], POOL_HOUR_COLUMNS, cls.float_dtype
+        ).sort_values("psUnix")
 
     @classmethod
     async def get_pool_day_data_info(cls, pool_id: str, start_date, end_date):
         """
-        Get pool day data from the Subgraph.
+        Get pool day data from the cache or the Subgraph.
 
         :param pool_id: The ID of the pool.
         :type pool_id: str
@@ -260,64 +369,80 @@ class UniswapV3Graph(BaseGraph):
         :return: The pool day data.
         :rtype: pd.DataFrame
         """
+        return await cls.cached_series(
+            "pool_day",
+            pool_id,
+            "Date",
+            int(start_date),
+            int(end_date),
+            24 * 60 * 60,
+            lambda start, end: cls._query_pool_day_data_info(pool_id, start, end),
+        )
+
+    @classmethod
+    async def _query_pool_day_data_info(cls, pool_id: str, start_date, end_date):
+        "Query pool day data from the Subgraph."
         _log.info(f"Retrieving Pool Hour Day {pool_id} for Subgraph")
 
-        querys = [
-            (
+        results = await cls.paginate_range(
+            lambda after, until: (
                 '{pool(id: "'
                 + pool_id
-                + '"){poolDayData(first: 1000, skip: '
-                + str(skip)
-                + " orderBy: date orderDirection: desc where: {date_gte: "
-                + str(start_date)
+                + '"){poolDayData(first: '
+                + str(cls.page_size)
+                + " orderBy: date orderDirection: asc where: {date_gt: "
+                + str(after)
                 + " date_lte: "
-                + str(end_date)
+                + str(until)
                 + "}){date feesUSD volumeToken0 volumeToken1 volumeUSD}}}"
-            )
-            for skip in range(0, 6000, 1000)
-        ]
-        results = await cls.query_gql(querys)
-
-        ohlc_day_list = []
-        for poolInfo in results:
-            for i in range(len(poolInfo["pool"]["poolDayData"])):
-                fees_usd = float(poolInfo["pool"]["poolDayData"][i]["feesUSD"])
-                volume_token0 = float(poolInfo["pool"]["poolDayData"][i]["volumeToken0"])
-                volume_token1 = float(poolInfo["pool"]["poolDayData"][i]["volumeToken1"])
-                volume_usd = float(poolInfo["pool"]["poolDayData"][i]["volumeUSD"])
-                date = float(poolInfo["pool"]["poolDayData"][i]["date"])
-                tempList = [date, fees_usd, volume_token0, volume_token1, volume_usd]
-                ohlc_day_list.append(tempList)
-        return _pd.DataFrame(ohlc_day_list, columns=["Date", "FeesUSD", "volumeToken0", "volumeToken1", "volumeUSD"])
+            ),
+            lambda result: result["pool"]["poolDayData"],
+            "date",
+            int(start_date),
+            int(end_date),
+            24 * 60 * 60,
+        )
+
+        return _decode_pages(results, lambda result: result["pool"]["poolDayData"], POOL_DAY_COLUMNS, cls.float_dtype)
 
     @classmethod
     async def get_pool_ticks_info(cls, pool_id: str):
         """
-        Get pool ticks information from the Subgraph.
+        Get pool ticks information from the cache or the Subgraph.
+
+        Ticks are the current state of the pool, so a cached snapshot is only used for ticks_max_age seconds.
 
         :param pool_id: The ID of the pool.
         :type pool_id: str
         :return: The pool ticks information.
         :rtype: pd.DataFrame
         """
-        _log.info(f"Retrieving Pool Tick {pool_id} for Subgraph")
+        return await cls.cached_snapshot("pool_ticks", pool_id, cls.ticks_max_age, lambda: cls._query_pool_ticks_info(pool_id))
 
-        querys = [
-            ('{pool(id: "' + pool_id + '"){ticks(first: 1000, skip: ' + str(skip) + "){tickIdx liquidityNet liquidityGross}}}")
-            for skip in range(0, 6000, 1000)
-        ]
-        results = await cls.query_gql(querys)
+    @classmethod
+    async def _query_pool_ticks_info(cls, pool_id: str):
+        "Query pool ticks information from the Subgraph."
+        _log.info(f"Retrieving Pool Tick {pool_id} for Subgraph")
 
-        ticks_list = []
-        for poolInfo in results:
-            for i in range(len(poolInfo["pool"]["ticks"])):
-                liqG = float(poolInfo["pool"]["ticks"][i]["liquidityGross"])
-                liqN = float(poolInfo["pool"]["ticks"][i]["liquidityNet"])
-                tickIdx = int(poolInfo["pool"]["ticks"][i]["tickIdx"])
-                ticks_list.append([liqG, liqN, tickIdx])
-        return _pd.DataFrame(ticks_list, columns=["liquidityGross", "liquidityNet", "tickIdx"]).sort_values("tickIdx")
+        results = await cls.paginate(
+            lambda after: (
+                '{pool(id: "'
+                + pool_id
+                + '"){ticks(first: '
+                + str(cls.page_size)
+                + ' orderBy: tickIdx orderDirection: asc where: {tickIdx_gt: "'
+                + str(after)
+                + '"}){tickIdx liquidityNet liquidityGross}}}'
+            ),
+            lambda result: result["pool"]["ticks"],
+            "tickIdx",
+            MIN_TICK - 1,
+        )
+
+        return _decode_pages(results, lambda result: result["pool"]["ticks"], TICK_COLUMNS).sort_values("tickIdx")
 
     @classmethod
+    @coalesce
     async def get_pool_ticks_day_data_info(cls, pool_id: str, date):
         """
         Get pool tick day data from the Subgraph.
@@ -330,57 +455,69 @@ class UniswapV3Graph(BaseGraph):
         """
         _log.info(f"Retrieving Pool Tick Day Data {pool_id} for Subgraph")
 
-        querys = [
-            "{tickDayDatas(first: 1000, skip: "
-            + str(skip)
-            + 'where: {pool: "'
-            + pool_id
-            + '" date: '
-            + str(date)
-            + "}){tick {tickIdx} liquidityNet liquidityGross}}"
-            for skip in range(0, 6000, 1000)
-        ]
-
-        results = await cls.query_gql(querys)
+        results = await cls.paginate(
+            lambda after: (
+                "{tickDayDatas(first: "
+                + str(cls.page_size)
+                + ' orderBy: id orderDirection: asc where: {pool: "'
+                + pool_id
+                + '" date: '
+                + str(date)
+                + ' id_gt: "'
+                + str(after)
+                + '"}){id tick {tickIdx} liquidityNet liquidityGross}}'
+            ),
+            lambda result: result["tickDayDatas"],
+            "id",
+            "",
+        )
 
-        ticks_list = []
-        for poolInfo in results:
-            for i in range(len(poolInfo["tickDayDatas"])):
-                liqG = float(poolInfo["tickDayDatas"][i]["liquidityGross"])
-                liqN = float(poolInfo["tickDayDatas"][i]["liquidityNet"])
-                tickIdx = int(poolInfo["tickDayDatas"][i]["tick"]["tickIdx"])
-                ticks_list.append([liqG, liqN, tickIdx])
-        return _pd.DataFrame(ticks_list, columns=["liquidityGross", "liquidityNet", "tickIdx"]).sort_values("tickIdx")
+        return _decode_pages(results, lambda result: result["tickDayDatas"], TICK_DAY_COLUMNS).sort_values("tickIdx")
 
 
 def get_pool(pool_id: str) -> Pool:
     """
     Build a Pool class from a pool_id.
 
+    :param pool_id: The ID of the pool.
+    :type pool_id: str
+    :return: The Pool class.
+    :rtype: Pool
+    """
+    return run_sync(aget_pool(pool_id))
+
+
+async def aget_pool(pool_id: str) -> Pool:
+    """
+    Build a Pool class from a pool_id without blocking the event loop.
+
     :param pool_id: The ID of the pool.
     :type pool_id: str
     :return: The Pool class.
     :rtype: Pool
     """
     _log.info(f"Building Pool class {pool_id} from Subgraph")
-    info = UniswapV3Graph.run({"pool_info": UniswapV3Graph.get_static_pool_info(pool_id)})
-
-    fee_tier = int(info["pool_info"]["pool"]["feeTier"])
-    pool_id = str(info["pool_info"]["pool"]["id"])
-
-    token_0 = Token(
-        id=str(info["pool_info"]["pool"]["token0"]["id"]),
-        decimals=int(info["pool_info"]["pool"]["token0"]["decimals"]),
-        symbol=str(info["pool_info"]["pool"]["token0"]["symbol"]),
-        total_supply=int(info["pool_info"]["pool"]["token0"]["totalSupply"]),
-        name=str(info["pool_info"]["pool"]["token0"]["name"]),
-    )
-
-    token_1 = Token(
-        id=str(info["pool_info"]["pool"]["token1"]["id"]),
-        decimals=int(info["pool_info"]["pool"]["token1"]["decimals"]),
-        symbol=str(info["pool_info"]["pool"]["token1"]["symbol"]),
-        total_supply=int(info["pool_info"]["pool"]["token1"]["totalSupply"]),
-        name=str(info["pool_info"]["pool"]["token1"]["name"]),
-    )
-    return Pool(id=pool_id, fee_tier=fee_tier, token_0=token_0, token_1=token_1)
+    info = await UniswapV3Graph.get_static_pool_info(pool_id)
+    return pool_from_info(info["pool"])
+
+
+def pool_from_info(info: dict) -> Pool:
+    """
+    Build a Pool class from its static Subgraph information.
+
+    :param info: The static pool information, i.e. id, feeTier, token0 and token1.
+    :type info: dict
+    :return: The Pool class.
+    :rtype: Pool
+    """
+    tokens = [
+        Token(
+            id=str(token["id"]),
+            decimals=int(token["decimals"]),
+            symbol=str(token["symbol"]),
+            total_supply=int(token["totalSupply"]),
+            name=str(token["name"]),
+        )
+        for token in (info["token0"], info["token1"])
+    ]
+    return Pool(id=str(info["id"]), fee_tier=int(info["feeTier"]), token_0=tokens[0], token_1=tokens[1])
@@ -0,0 +1,158 @@
+"""
+Module defining the registry of static Uniswap V3 Pool and Token information.
+"""
+import dataclasses as _dc
+import json as _json
+import logging as _log
+import os as _os
+import threading as _threading
+import typing as _tp
+
+from daxis_amm.graphs.base import run_sync
+from daxis_amm.graphs.uniswap.v3.graph import UniswapV3Graph, pool_from_info
+from daxis_amm.instruments.uniswap_v3 import Pool, Token
+
+
+class PoolRegistry:
+    """
+    Registry of Pools and their Tokens, whose static information never changes once a pool is created.
+
+    Pools are looked up in memory first and only the missing ones are requested from the Subgraph, many per
+    query. When a path is given the registry is persisted as JSON, so later sessions need no network access.
+    """
+
+    def __init__(self, path: _tp.Optional[str] = None, graph: _tp.Type[UniswapV3Graph] = UniswapV3Graph):
+        """
+        Initialize a PoolRegistry object.
+
+        :param path: Path of the JSON file persisting the registry. Default is None for an in-memory registry.
+        :type path: Optional[str]
+        :param graph: Graph class used to fetch missing pools. Default is UniswapV3Graph.
+        :type graph: Type[UniswapV3Graph]
+        """
+        self.path = path
+        self.graph = graph
+        self.pools: _tp.Dict[str, Pool] = {}
+        self.tokens: _tp.Dict[str, Token] = {}
+        self._lock = _threading.Lock()
+        if path is not None and _os.path.exists(path):
+            self._read()
+
+    def __contains__(self, pool_id: str) -> bool:
+        return pool_id.lower() in self.pools
+
+    def __len__(self) -> int:
+        return len(self.pools)
+
+    def _read(self):
+        "Read the registry from its JSON file."
+        with open(self.path, encoding="utf-8") as registry:
+            content = _json.load(registry)
+        self.tokens = {token_id: Token(**token) for token_id, token in content["tokens"].items()}
+        self.pools = {
+            pool_id: Pool(
+                id=pool["id"],
+                fee_tier=pool["fee_tier"],
+                token_0=self.tokens[pool["token_0"]],
+                token_1=self.tokens[pool["token_1"]],
+            )
+            for pool_id, pool in content["pools"].items()
+        }
+
+    def save(self):
+        "Write the registry to its JSON file, replacing it atomically."
+        if self.path is None:
+            return
+        content = {
+            "tokens": {token_id: _dc.asdict(token) for token_id, token in self.tokens.items()},
+            "pools": {
+                pool_id: {"id": pool.id, "fee_tier": pool.fee_tier, "token_0": pool.token_0.id, "token_1": pool.token_1.id}
+                for pool_id, pool in self.pools.items()
+            },
+        }
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as registry:
+            _json.dump(content, registry)
+        _os.replace(temporary, self.path)
+
+    def add(self, pool: Pool):
+        """
+        Add a Pool and its Tokens to the registry.
+
+        Tokens are shared between the pools holding them.
+
+        :param pool: The Pool to add.
+        :type pool: Pool
+        """
+        with self._lock:
+            token_0 = self.tokens.setdefault(pool.token_0.id.lower(), pool.token_0)
+            token_1 = self.tokens.setdefault(pool.token_1.id.lower(), pool.token_1)
+            self.pools[pool.id.lower()] = Pool(id=pool.id, fee_tier=pool.fee_tier, token_0=token_0, token_1=token_1)
+
+    def token(self, token_id: str) -> Token:
+        """
+        Get a registered Token.
+
+        :param token_id: The ID of the token.
+        :type token_id: str
+        :return: The Token.
+        :rtype: Token
+        :raises KeyError: If no registered pool holds the token.
+        """
+        return self.tokens[token_id.lower()]
+
+    async def aload(self, pool_ids: _tp.Iterable[str]) -> _tp.Dict[str, Pool]:
+        """
+        Get many Pools, fetching the ones missing from the registry in bulk.
+
+        :param pool_ids: The IDs of the pools.
+        :type pool_ids: Iterable[str]
+        :return: Mapping of pool ID to Pool.
+        :rtype: Dict[str, Pool]
+        :raises KeyError: If a pool does not exist on the Subgraph.
+        """
+        pool_ids = [pool_id.lower() for pool_id in pool_ids]
+        missing = list(dict.fromkeys(pool_id for pool_id in pool_ids if pool_id not in self.pools))
+        if missing:
+            _log.info(f"Loading {len(missing)} Pools into the registry from Subgraph")
+            for info in await self.graph.get_static_pools_info(missing):
+                self.add(pool_from_info(info))
+            self.save()
+        not_found = [pool_id for pool_id in missing if pool_id not in self.pools]
+        if not_found:
+            raise KeyError(f"Pools not found on the Subgraph: {not_found}")
+        return {pool_id: self.pools[pool_id] for pool_id in pool_ids}
+
+    def load(self, pool_ids: _tp.Iterable[str]) -> _tp.Dict[str, Pool]:
+        """
+        Get many Pools, fetching the ones missing from the registry in bulk.
+
+        :param pool_ids: The IDs of the pools.
+        :type pool_ids: Iterable[str]
+        :return: Mapping of pool ID to Pool.
+        :rtype: Dict[str, Pool]
+        """
+        return run_sync(self.aload(pool_ids))
+
+    async def aget(self, pool_id: str) -> Pool:
+        """
+        Get a Pool, fetching it if it is missing from the registry.
+
+        :param pool_id: The ID of the pool.
+        :type pool_id: str
+        :return: The Pool.
+        :rtype: Pool
+        """
+        return (await self.aload([pool_id]))[pool_id.lower()]
+
+    def get(self, pool_id: str) -> Pool:
+        """
+        Get a Pool, fetching it if it is missing from the registry.
+
+        :param pool_id: The ID of the pool.
+        :type pool_id: str
+        :return: The Pool.
+        :rtype: Pool
+        """
+        pool = self.pools.get(pool_id.lower())
+        return pool if pool is not None else run_sync(self.aget(pool_id))
@@ -0,0 +1,64 @@
+"""
+Module defining the Backtester of Uniswap V3 Liquidity Positions.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List
+
+import pandas as pd
+
+from daxis_amm.calculations.uniswap.v3.pnl import UniswapV3BacktestCalculator
+from daxis_amm.graphs.base import run_sync
+from daxis_amm.graphs.uniswap.v3.graph import UniswapV3Graph
+from daxis_amm.positions.uniswap_v3 import UniswapV3LP
+
+
+@dataclass
+class Backtester:
+    """
+    Class defining a Backtester of a Uniswap V3 Liquidity Position entered on many dates.
+
+    Every window holds the pool, amount and range of the position from an entry date for the holding period of
+    the position (its end date less its start date), and is valued as UniswapV3LP.pnl values the position held
+    over the window. The data of all windows is fetched once.
+    """
+
+    position: UniswapV3LP
+    entry_dates: List[datetime]
+
+    def run(self) -> pd.DataFrame:
+        """
+        Calculate the profit or loss of every window.
+
+        :return: Exit Date, Fees USD, Deposit Amounts USD and PnL of every window indexed by its entry date, NaN
+            for windows without data.
+        :rtype: pd.DataFrame
+        """
+        return run_sync(self.arun())
+
+    async def arun(self) -> pd.DataFrame:
+        """
+        Calculate the profit or loss of every window without blocking the event loop.
+
+        :return: Exit Date, Fees USD, Deposit Amounts USD and PnL of every window indexed by its entry date, NaN
+            for windows without data.
+        :rtype: pd.DataFrame
+        """
+        holding_period = self.position.end_date - self.position.start_date
+        entry_dates = [int(entry_date.timestamp()) for entry_date in self.entry_dates]
+        calculator = UniswapV3BacktestCalculator(
+            position=self.position,
+            start_date=min(entry_dates),
+            end_date=max(entry_dates) + int(holding_period.total_seconds()),
+            entry_dates=entry_dates,
+            holding_period=int(holding_period.total_seconds()),
+        )
+
+        await self.position.registry.aget(self.position.pool_id)
+        with UniswapV3Graph.memoize():
+            result = await calculator.arun()
+
+        result = result[~result.index.duplicated()].reindex(entry_dates)
+        result.index = pd.Index(self.entry_dates, name="Entry Date")
+        result.insert(0, "Exit Date", [entry_date + holding_period for entry_date in self.entry_dates])
+        return result
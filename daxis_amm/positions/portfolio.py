@@ -0,0 +1,154 @@
+"""
+Module defining the Portfolio of Uniswap V3 Liquidity Positions.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from daxis_amm.calculations import montecarlo
+from daxis_amm.calculations.stats import RunningStats
+from daxis_amm.calculations.uniswap.v3.tv import portfolio_path_matrix
+from daxis_amm.graphs.base import run_sync
+from daxis_amm.graphs.uniswap.v3.graph import UniswapV3Graph
+from daxis_amm.positions.uniswap_v3 import UniswapV3LP
+
+
+@dataclass
+class Portfolio:
+    """
+    Class defining a Portfolio of Uniswap V3 Liquidity Positions.
+
+    Positions on the same pool with the same dates share their data and price paths: the data of every pool is
+    fetched once, the paths of every group are simulated once and all ranges of a group are valued against them
+    together.
+    """
+
+    positions: List[UniswapV3LP]
+
+    def groups(self) -> Dict[Tuple[str, datetime, datetime], List[int]]:
+        """
+        Group the positions sharing a pool and dates.
+
+        :return: The indices of the positions of every (pool id, start date, end date).
+        :rtype: Dict[Tuple[str, datetime, datetime], List[int]]
+        """
+        groups: Dict[Tuple[str, datetime, datetime], List[int]] = {}
+        for index, position in enumerate(self.positions):
+            groups.setdefault((position.pool_id.lower(), position.start_date, position.end_date), []).append(index)
+        return groups
+
+    def tv(self, value_date, simulator=montecarlo.MonteCarlo()):
+        """
+        Calculate the Theoretical Value of every position and of the portfolio.
+
+        :param value_date: The date at which to calculate the theoretical values.
+        :type value_date: datetime
+        :param simulator: The Monte Carlo simulator object. Default is montecarlo.MonteCarlo().
+        :type simulator: montecarlo.MonteCarlo
+        :return: TV and TV Std Error of every position, indexed as the positions, and of the portfolio ("Total").
+        :rtype: pd.DataFrame
+        """
+        return run_sync(self.atv(value_date, simulator))
+
+    async def atv(self, value_date, simulator=montecarlo.MonteCarlo()):
+        """
+        Calculate the Theoretical Value of every position and of the portfolio without blocking the event loop.
+
+        In the adaptive mode of the simulator the target standard error applies to the portfolio TV.
+
+        :param value_date: The date at which to calculate the theoretical values.
+        :type value_date: datetime
+        :param simulator: The Monte Carlo simulator object. Default is montecarlo.MonteCarlo().
+        :type simulator: montecarlo.MonteCarlo
+        :return: TV and TV Std Error of every position, indexed as the positions, and of the portfolio ("Total").
+        :rtype: pd.DataFrame
+        """
+        groups = self.groups()
+        staged = await self.astage(value_date, simulator)
+        group_data = [
+            dict(
+                staged[indices[0]],
+                liquidity=np.array([staged[index]["liquidity"] for index in indices]),
+                token_0_lowerprice=np.array([staged[index]["token_0_lowerprice"] for index in indices]),
+                token_0_upperprice=np.array([staged[index]["token_0_upperprice"] for index in indices]),
+            )
+            for indices in groups.values()
+        ]
+
+        # Columns of the batches: the TV of the positions, group by group, then the deviation of every group.
+        columns = [(index, group) for group, indices in enumerate(groups.values()) for index in indices]
+        batch_simulator = simulator.batch_simulator()
+        stats = [RunningStats() for _ in self.positions]
+        total = RunningStats()
+
+        started = time.monotonic()
+        width = len(columns) + len(groups)
+        results = simulator.map_batches(portfolio_path_matrix, range(simulator.max_batches), width, group_data)
+        try:
+            for values in results:
+                tvs, deviations = values[:, : len(columns)], values[:, len(columns) :]
+                for column, (index, group) in enumerate(columns):
+                    stats[index].update(*batch_simulator.samples(tvs[:, column], deviations[:, group]))
+                total.update(*batch_simulator.samples(tvs.sum(axis=1), deviations.sum(axis=1)))
+                if simulator.adaptive and simulator.converged(total, started):
+                    break
+        finally:
+            results.close()
+
+        frame = pd.DataFrame({"TV": [s.mean for s in stats], "TV Std Error": [s.std_error for s in stats]})
+        frame.loc["Total"] = [total.mean, total.std_error]
+        return frame
+
+    async def astage(self, value_date, simulator=montecarlo.MonteCarlo()) -> List[dict]:
+        """
+        Fetch and stage the TV data of every position, fetching the data of every pool once.
+
+        :param value_date: The date at which to calculate the theoretical values.
+        :type value_date: datetime
+        :param simulator: The Monte Carlo simulator object. Default is montecarlo.MonteCarlo().
+        :type simulator: montecarlo.MonteCarlo
+        :return: The staged data of every position.
+        :rtype: List[dict]
+        """
+        await UniswapV3LP.registry.aload([position.pool_id for position in self.positions])
+        calculators = [position.tv_calculator(value_date, simulator) for position in self.positions]
+        with UniswapV3Graph.memoize():
+            data = await asyncio.gather(*[calculator.aget_data() for calculator in calculators])
+        return [calculator.stage_data(calculator_data) for calculator, calculator_data in zip(calculators, data)]
+
+    def pnl(self, value_date):
+        """
+        Calculate the profit or loss of every position and of the portfolio.
+
+        :param value_date: The date at which to calculate the profit or loss.
+        :type value_date: datetime
+        :return: Fees USD, Deposit Amounts USD and PnL of every position and their sum ("Total").
+        :rtype: pd.DataFrame
+        """
+        return run_sync(self.apnl(value_date))
+
+    async def apnl(self, value_date):
+        """
+        Calculate the profit or loss of every position and of the portfolio without blocking the event loop.
+
+        :param value_date: The date at which to calculate the profit or loss.
+        :type value_date: datetime
+        :return: Fees USD, Deposit Amounts USD and PnL of every position and their sum ("Total").
+        :rtype: pd.DataFrame
+        """
+        await UniswapV3LP.registry.aload([position.pool_id for position in self.positions])
+        with UniswapV3Graph.memoize():
+            results = await asyncio.gather(*[position.apnl(value_date) for position in self.positions])
+
+        # Positions starting after the value date have no profit or loss.
+        frame = pd.DataFrame(
+            [result if isinstance(result, pd.Series) else pd.Series({"PnL": result}) for result in results],
+            columns=["Fees USD", "Deposit Amounts USD", "PnL"],
+        ).fillna(0.0)
+        frame.loc["Total"] = frame.sum()
+        return frame
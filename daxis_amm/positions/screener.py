@@ -0,0 +1,215 @@
+"""
+Module defining the Screener of Uniswap V3 Pools.
+"""
+import asyncio
+import logging as _log
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from daxis_amm.calculations import montecarlo
+from daxis_amm.calculations.stats import StreamingSummary
+from daxis_amm.calculations.uniswap.v3 import utils
+from daxis_amm.calculations.uniswap.v3.tv import COLUMNS
+from daxis_amm.graphs.base import run_sync
+from daxis_amm.graphs.uniswap.v3.graph import UniswapV3Graph, pool_from_info
+from daxis_amm.positions.uniswap_v3 import UniswapV3LP
+
+SCREEN_COLUMNS = ["TV", "Fees USD", "IL USD", "Volatility", "Return", "Risk Adjusted Return"]
+
+
+@dataclass
+class Screener:
+    """
+    Class defining a Screener ranking Uniswap V3 Pools by the risk adjusted return of a liquidity position.
+
+    Every pool is valued with the same position, amount in USD and range, held for the horizon up to the value
+    date. Pools are fetched and valued concurrently, at most max_concurrency at a time, and ranked as their
+    valuations finish. Without pool_ids, the top pools by TVL are discovered from the Subgraph.
+
+    The IL USD is the expected value of the deposit at the end of the simulation less the expected value of
+    holding the tokens deposited instead, the Volatility the standard deviation of the log pool price over the
+    horizon and the Risk Adjusted Return the Return (TV over amount, less one) per unit of Volatility. The
+    valuations run in worker threads, so the event loop keeps fetching the other pools meanwhile. The engine is
+    "montecarlo" by default, "analytic" is much faster for large screens (requires scipy).
+    """
+
+    pool_ids: Optional[List[str]] = None
+    top: int = 100
+    amount: float = 10000.0
+    min_percentage: float = 0.1
+    max_percentage: float = 0.1
+    horizon: timedelta = timedelta(days=1)
+    simulator: montecarlo.MonteCarlo = field(default_factory=montecarlo.MonteCarlo)
+    engine: str = "montecarlo"
+    max_concurrency: int = 20
+
+    async def adiscover(self) -> List[str]:
+        """
+        Get the IDs of the screened pools, registering the top pools by TVL when no pool IDs are given.
+
+        :return: The pool IDs.
+        :rtype: List[str]
+        """
+        if self.pool_ids is not None:
+            await UniswapV3LP.registry.aload(self.pool_ids)
+            return [pool_id.lower() for pool_id in self.pool_ids]
+
+        infos = await UniswapV3LP.registry.graph.get_top_pools_info(self.top)
+        for info in infos:
+            if info["id"] not in UniswapV3LP.registry:
+                UniswapV3LP.registry.add(pool_from_info(info))
+        UniswapV3LP.registry.save()
+        return [info["id"] for info in infos]
+
+    def screen(self, value_date: datetime) -> pd.DataFrame:
+        """
+        Screen the pools.
+
+        :param value_date: The date at which to value the positions.
+        :type value_date: datetime
+        :return: The SCREEN_COLUMNS of every pool, by descending Risk Adjusted Return.
+        :rtype: pd.DataFrame
+        """
+        return run_sync(self.ascreen(value_date))
+
+    async def ascreen(self, value_date: datetime) -> pd.DataFrame:
+        """
+        Screen the pools without blocking the event loop.
+
+        :param value_date: The date at which to value the positions.
+        :type value_date: datetime
+        :return: The SCREEN_COLUMNS of every pool, by descending Risk Adjusted Return.
+        :rtype: pd.DataFrame
+        """
+        ranking = rank([])
+        async for ranking in self.astream(value_date):
+            pass
+        return ranking
+
+    async def astream(self, value_date: datetime) -> AsyncIterator[pd.DataFrame]:
+        """
+        Screen the pools, yielding the ranking of the pools valued so far every time a valuation finishes.
+
+        Pools whose valuation fails are logged and left out of the ranking.
+
+        :param value_date: The date at which to value the positions.
+        :type value_date: datetime
+        :return: The SCREEN_COLUMNS of the pools valued so far, by descending Risk Adjusted Return.
+        :rtype: AsyncIterator[pd.DataFrame]
+        """
+        pool_ids = await self.adiscover()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(pool_id: str) -> Optional[pd.Series]:
+            async with semaphore:
+                try:
+                    return await self.avalue(pool_id, value_date)
+                except Exception:
+                    _log.warning(f"Unable to screen Pool {pool_id}", exc_info=True)
+                    return None
+
+        results = []
+        tasks = [asyncio.ensure_future(bounded(pool_id)) for pool_id in pool_ids]
+        try:
+            for task in asyncio.as_completed(tasks):
+                result = await task
+                if result is not None:
+                    results.append(result)
+                    yield rank(results)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def avalue(self, pool_id: str, value_date: datetime) -> pd.Series:
+        """
+        Value the position of the screener on a pool.
+
+        :param pool_id: The ID of the pool.
+        :type pool_id: str
+        :param value_date: The date at which to value the position.
+        :type value_date: datetime
+        :return: The SCREEN_COLUMNS of the pool, named by the pool ID.
+        :rtype: pd.Series
+        """
+        position = UniswapV3LP(
+            pool_id, self.amount, value_date - self.horizon, value_date, self.min_percentage, self.max_percentage
+        )
+        calculator = position.tv_calculator(value_date, self.simulator, self.engine)
+        with UniswapV3Graph.memoize():
+            data = await calculator.aget_data()
+        staged_data = await asyncio.to_thread(calculator.stage_data, data)
+        tv = await asyncio.to_thread(calculator.calculation, staged_data)
+        return self.metrics(staged_data, tv).rename(pool_id)
+
+    def metrics(self, staged_data: dict, tv) -> pd.Series:
+        """
+        Calculate the screened metrics of a position from its staged data and TV calculation.
+
+        :param staged_data: Staged data of the TV calculator.
+        :type staged_data: dict
+        :param tv: Result of the TV calculator.
+        :type tv: Union[pd.Series, pd.DataFrame, StreamingSummary]
+        :return: The SCREEN_COLUMNS of the position.
+        :rtype: pd.Series
+        """
+        if isinstance(tv, StreamingSummary):
+            values = pd.Series({column: tv.stats[column].mean for column in COLUMNS})
+        elif isinstance(tv, pd.DataFrame):
+            values = tv[list(COLUMNS)].mean()
+            values["TV"] = self.simulator.estimate(tv["TV"], tv["Terminal Price Deviation"])[0]
+        else:
+            values = tv
+
+        volatility = float(self.simulator.lognormal_params(*staged_data["price_sim_params"])[1][-1])
+        returns = values["TV"] / self.amount - 1
+        return pd.Series(
+            {
+                "TV": values["TV"],
+                "Fees USD": values["Fees USD"],
+                "IL USD": values["Deposit Amounts USD"] - self.hodl_value(staged_data),
+                "Volatility": volatility,
+                "Return": returns,
+                "Risk Adjusted Return": returns / volatility if volatility > 0 else np.nan,
+            }
+        )
+
+    def hodl_value(self, staged_data: dict) -> float:
+        """
+        Calculate the expected value in USD at the end of the simulation of holding the tokens deposited in a
+        position instead of providing liquidity.
+
+        :param staged_data: Staged data of the TV calculator.
+        :type staged_data: dict
+        :return: The expected value of the tokens.
+        :rtype: float
+        """
+        price, _, _, _ = staged_data["price_sim_params"]
+        amount0, amount1 = utils.amounts_delta_array(
+            staged_data["liquidity"],
+            price,
+            staged_data["token_0_lowerprice"],
+            staged_data["token_0_upperprice"],
+            *staged_data["decimals"],
+        )
+        price_usd, r, _, T = staged_data["price_usd_sim_params"]
+        # The pool and USD prices are simulated independently, so the expectation of the product factors.
+        return float(
+            (amount0 + amount1 * staged_data["expected_terminal_price"]) * self.simulator.expected_terminal(price_usd, r, T)
+        )
+
+
+def rank(results: List[pd.Series]) -> pd.DataFrame:
+    """
+    Rank screened pools by descending Risk Adjusted Return.
+
+    :param results: The SCREEN_COLUMNS of every pool, named by the pool ID.
+    :type results: List[pd.Series]
+    :return: The SCREEN_COLUMNS of every pool, by descending Risk Adjusted Return.
+    :rtype: pd.DataFrame
+    """
+    ranking = pd.DataFrame(results, columns=SCREEN_COLUMNS)
+    return ranking.sort_values("Risk Adjusted Return", ascending=False, na_position="last")
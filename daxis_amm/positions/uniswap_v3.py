@@ -1,19 +1,30 @@
 """
 Module defining the Uniswap V3 Liquidity Position Class.
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime
+from typing import ClassVar
 
+import numpy as np
 import pandas as pd
 
 from daxis_amm.calculations import montecarlo
+from daxis_amm.calculations.stats import StreamingSummary
 from daxis_amm.calculations.uniswap.v3.deposit_amounts import UniswapV3DepositAmountsCalculator
-from daxis_amm.calculations.uniswap.v3.tv import UniswapV3TVCalculator
-from daxis_amm.calculations.uniswap.v3.pnl import UniswapV3PnLCalculator
-from daxis_amm.graphs.uniswap.v3.graph import get_pool
+from daxis_amm.calculations.uniswap.v3.tv import (
+    UniswapV3AnalyticTVCalculator,
+    UniswapV3TVCalculator,
+    UniswapV3TVGridCalculator,
+)
+from daxis_amm.calculations.uniswap.v3.pnl import UniswapV3PnLCalculator, UniswapV3PnLGridCalculator
+from daxis_amm.graphs.base import run_sync
+from daxis_amm.graphs.uniswap.v3.graph import UniswapV3Graph
+from daxis_amm.graphs.uniswap.v3.registry import PoolRegistry
 from daxis_amm.instruments.uniswap_v3 import Pool
 from daxis_amm.positions.base import BasePosition
 
+TV_ENGINES = {"montecarlo": UniswapV3TVCalculator, "analytic": UniswapV3AnalyticTVCalculator}
+
 
 @dataclass
 class UniswapV3LP(BasePosition):
@@ -21,6 +32,12 @@ class UniswapV3LP(BasePosition):
     Class defining a Uniswap V3 Liquidity Position.
 
     Amount in USD.
+
+    Positions are built without network access; the static Pool information is looked up in the registry on
+    first use. Load a book with ``UniswapV3LP.registry.load(pool_ids)`` to fetch every missing pool in bulk.
+
+    Every valuation has an async counterpart (atv, apnl, adeposit_amounts) so many positions can be valued
+    concurrently with asyncio.gather, e.g. from inside Jupyter or a running service.
     """
 
     pool_id: str
@@ -29,14 +46,33 @@ class UniswapV3LP(BasePosition):
     end_date: datetime
     min_percentage: float
     max_percentage: float
+    # Static pool information shared by every position, e.g. UniswapV3LP.registry = PoolRegistry("pools.json").
+    registry: ClassVar[PoolRegistry] = PoolRegistry()
+
+    @property
+    def pool(self) -> Pool:
+        """
+        Get the Pool of the LP from the registry, fetching it on first use.
+
+        :return: The Pool of the LP.
+        :rtype: Pool
+        """
+        return self.registry.get(self.pool_id)
 
-    def __post_init__(self):
+    @classmethod
+    async def acreate(cls, pool_id: str, *args, **kwargs) -> "UniswapV3LP":
         """
-        Initialize the UniswapV3LP object.
+        Create a UniswapV3LP object with its Pool registered, without blocking the event loop.
 
-        :return: None
+        :param pool_id: The ID of the pool.
+        :type pool_id: str
+        :param args: Remaining fields of the UniswapV3LP object.
+        :param kwargs: Remaining fields of the UniswapV3LP object.
+        :return: The UniswapV3LP object.
+        :rtype: UniswapV3LP
         """
-        self.pool: Pool = get_pool(self.pool_id)
+        await cls.registry.aget(pool_id)
+        return cls(pool_id, *args, **kwargs)
 
     def __str__(self):
         """
@@ -65,9 +101,22 @@ class UniswapV3LP(BasePosition):
         :return: The deposit amounts for each token.
         :rtype: Any
         """
-        return UniswapV3DepositAmountsCalculator(position=self, date=date).run()
+        return run_sync(self.adeposit_amounts(date))
+
+    async def adeposit_amounts(self, date):
+        """
+        Calculate the deposit amounts for each token without blocking the event loop.
+
+        :param date: The date for which to calculate the deposit amounts.
+        :type date: datetime
+        :return: The deposit amounts for each token.
+        :rtype: Any
+        """
+        await self.registry.aget(self.pool_id)
+        with UniswapV3Graph.memoize():
+            return await UniswapV3DepositAmountsCalculator(position=self, date=date).arun()
 
-    def tv(self, value_date, simulator=montecarlo.MonteCarlo(), return_type="sum"):
+    def tv(self, value_date, simulator=montecarlo.MonteCarlo(), return_type="sum", engine="montecarlo"):
         """
         Calculate the Theoretical Value of the LP.
 
@@ -77,8 +126,67 @@ class UniswapV3LP(BasePosition):
         :type simulator: montecarlo.MonteCarlo
         :param return_type: The type of return to calculate. Default is "sum".
         :type return_type: str
-        :return: The theoretical value of the LP.
-        :rtype: Union[pd.Series, Any]
+        :param engine: "montecarlo" to simulate paths or "analytic" to integrate over the lognormal price
+            distribution of the simulator (requires scipy). Default is "montecarlo".
+        :type engine: str
+        :return: The theoretical value of the LP and its standard error, or the value of every path (a summary
+            of the paths for a streaming simulator, the expected fees, deposit value and fee share for the
+            analytic engine).
+        :rtype: Union[pd.Series, pd.DataFrame]
+        """
+        return run_sync(self.atv(value_date, simulator, return_type, engine))
+
+    async def atv(self, value_date, simulator=montecarlo.MonteCarlo(), return_type="sum", engine="montecarlo"):
+        """
+        Calculate the Theoretical Value of the LP without blocking the event loop.
+
+        :param value_date: The date at which to calculate the theoretical value.
+        :type value_date: datetime
+        :param simulator: The Monte Carlo simulator object. Default is montecarlo.MonteCarlo().
+        :type simulator: montecarlo.MonteCarlo
+        :param return_type: The type of return to calculate. Default is "sum".
+        :type return_type: str
+        :param engine: "montecarlo" to simulate paths or "analytic" to integrate over the lognormal price
+            distribution of the simulator (requires scipy). Default is "montecarlo".
+        :type engine: str
+        :return: The theoretical value of the LP and its standard error, or the value of every path (a summary
+            of the paths for a streaming simulator, the expected fees, deposit value and fee share for the
+            analytic engine).
+        :rtype: Union[pd.Series, pd.DataFrame]
+        """
+        calculator = self.tv_calculator(value_date, simulator, engine)
+        await self.registry.aget(self.pool_id)
+        # The nested deposit amounts calculator reuses the data fetched for the TV.
+        with UniswapV3Graph.memoize():
+            tv = await calculator.arun()
+
+        if engine == "analytic":
+            return pd.Series({"TV": tv["TV"], "TV Std Error": 0.0}) if return_type == "sum" else tv
+
+        if isinstance(tv, StreamingSummary):
+            if return_type == "sum":
+                return pd.Series({"TV": tv.stats["TV"].mean, "TV Std Error": tv.stats["TV"].std_error})
+            return tv.to_frame()
+
+        if return_type == "sum":
+            value, std_error = simulator.estimate(tv["TV"], tv["Terminal Price Deviation"])
+            return pd.Series({"TV": value, "TV Std Error": std_error})
+
+        return tv
+
+    def tv_calculator(self, value_date, simulator=montecarlo.MonteCarlo(), engine="montecarlo"):
+        """
+        Get the calculator of the Theoretical Value of the LP.
+
+        :param value_date: The date at which to calculate the theoretical value.
+        :type value_date: datetime
+        :param simulator: The Monte Carlo simulator object. Default is montecarlo.MonteCarlo().
+        :type simulator: montecarlo.MonteCarlo
+        :param engine: "montecarlo" or "analytic". Default is "montecarlo".
+        :type engine: str
+        :return: The calculator.
+        :rtype: UniswapV3TVCalculator
+        :raises ValueError: If the engine is unknown.
         """
         # TODO: Need to get ticks for the specific valuation date.
 
@@ -87,15 +195,12 @@ class UniswapV3LP(BasePosition):
         else:
             raise Exception("Unable to TV when valuation date is before self.start_date")
 
+        if engine not in TV_ENGINES:
+            raise ValueError(f"engine must be one of {tuple(TV_ENGINES)}")
+
         start_date = int(self.start_date.timestamp())
         value_date = int(value_date.timestamp())
-
-        tv = UniswapV3TVCalculator(position=self, simulator=simulator, start_date=start_date, value_date=value_date).run()
-
-        if return_type == "sum":
-            return pd.Series({"TV": tv["TV"].mean()})
-
-        return tv
+        return TV_ENGINES[engine](position=self, simulator=simulator, start_date=start_date, value_date=value_date)
 
     def pnl(self, value_date):
         """
@@ -106,13 +211,138 @@ class UniswapV3LP(BasePosition):
         :return: The profit or loss of the position.
         :rtype: float
         """
+        return run_sync(self.apnl(value_date))
+
+    async def apnl(self, value_date):
+        """
+        Calculate the profit or loss without blocking the event loop.
+
+        :param value_date: The date at which to calculate the profit or loss.
+        :type value_date: datetime
+        :return: The profit or loss of the position.
+        :rtype: float
+        """
+        calculator = self.pnl_calculator(value_date)
+        if calculator is None:
+            return 0.0
+
+        await self.registry.aget(self.pool_id)
+        with UniswapV3Graph.memoize():
+            return await calculator.arun()
+
+    def pnl_calculator(self, value_date):
+        """
+        Get the calculator of the profit or loss.
+
+        :param value_date: The date at which to calculate the profit or loss.
+        :type value_date: datetime
+        :return: The calculator, None if the position starts after the value date.
+        :rtype: Optional[UniswapV3PnLCalculator]
+        """
         start_date = int(self.start_date.timestamp())
         end_date = int(self.end_date.timestamp())
 
         if self.start_date >= value_date:
-            return 0.0
+            return None
 
         if self.start_date < value_date < self.end_date:
             end_date = int(value_date.timestamp())
 
-        return UniswapV3PnLCalculator(position=self, start_date=start_date, end_date=end_date).run()
+        return UniswapV3PnLCalculator(position=self, start_date=start_date, end_date=end_date)
+
+    def range_grid(self, min_percentages, max_percentages):
+        """
+        Get the position with every combination of min and max percentages as its ranges.
+
+        :param min_percentages: The min percentages of the grid.
+        :type min_percentages: ArrayLike
+        :param max_percentages: The max percentages of the grid.
+        :type max_percentages: ArrayLike
+        :return: The position whose min and max percentages are arrays of the ranges of the grid.
+        :rtype: UniswapV3LP
+        """
+        min_percentage, max_percentage = np.meshgrid(min_percentages, max_percentages, indexing="ij")
+        return replace(self, min_percentage=min_percentage.ravel(), max_percentage=max_percentage.ravel())
+
+    def tv_surface(self, value_date, min_percentages, max_percentages, simulator=montecarlo.MonteCarlo()):
+        """
+        Calculate the Theoretical Value of the LP over a grid of ranges.
+
+        :param value_date: The date at which to calculate the theoretical values.
+        :type value_date: datetime
+        :param min_percentages: The min percentages of the grid.
+        :type min_percentages: ArrayLike
+        :param max_percentages: The max percentages of the grid.
+        :type max_percentages: ArrayLike
+        :param simulator: The Monte Carlo simulator object. Default is montecarlo.MonteCarlo().
+        :type simulator: montecarlo.MonteCarlo
+        :return: The TV and TV Std Error of every range, indexed by its min and max percentage; unstack a column
+            for the surface.
+        :rtype: pd.DataFrame
+        """
+        return run_sync(self.atv_surface(value_date, min_percentages, max_percentages, simulator))
+
+    async def atv_surface(self, value_date, min_percentages, max_percentages, simulator=montecarlo.MonteCarlo()):
+        """
+        Calculate the Theoretical Value of the LP over a grid of ranges without blocking the event loop.
+
+        The pool data is fetched and the paths are simulated once for the whole grid.
+
+        :param value_date: The date at which to calculate the theoretical values.
+        :type value_date: datetime
+        :param min_percentages: The min percentages of the grid.
+        :type min_percentages: ArrayLike
+        :param max_percentages: The max percentages of the grid.
+        :type max_percentages: ArrayLike
+        :param simulator: The Monte Carlo simulator object. Default is montecarlo.MonteCarlo().
+        :type simulator: montecarlo.MonteCarlo
+        :return: The TV and TV Std Error of every range, indexed by its min and max percentage; unstack a column
+            for the surface.
+        :rtype: pd.DataFrame
+        """
+        grid = self.range_grid(min_percentages, max_percentages)
+        calculator = grid.tv_calculator(value_date, simulator)
+        calculator = UniswapV3TVGridCalculator(
+            position=grid, start_date=calculator.start_date, value_date=calculator.value_date, simulator=simulator
+        )
+        await self.registry.aget(self.pool_id)
+        with UniswapV3Graph.memoize():
+            return await calculator.arun()
+
+    def pnl_surface(self, value_date, min_percentages, max_percentages):
+        """
+        Calculate the profit or loss of the LP over a grid of ranges.
+
+        :param value_date: The date at which to calculate the profit or loss.
+        :type value_date: datetime
+        :param min_percentages: The min percentages of the grid.
+        :type min_percentages: ArrayLike
+        :param max_percentages: The max percentages of the grid.
+        :type max_percentages: ArrayLike
+        :return: The Fees USD, Deposit Amounts USD and PnL of every range, indexed by its min and max percentage.
+        :rtype: Union[pd.DataFrame, float]
+        """
+        return run_sync(self.apnl_surface(value_date, min_percentages, max_percentages))
+
+    async def apnl_surface(self, value_date, min_percentages, max_percentages):
+        """
+        Calculate the profit or loss of the LP over a grid of ranges without blocking the event loop.
+
+        :param value_date: The date at which to calculate the profit or loss.
+        :type value_date: datetime
+        :param min_percentages: The min percentages of the grid.
+        :type min_percentages: ArrayLike
+        :param max_percentages: The max percentages of the grid.
+        :type max_percentages: ArrayLike
+        :return: The Fees USD, Deposit Amounts USD and PnL of every range, indexed by its min and max percentage.
+        :rtype: Union[pd.DataFrame, float]
+        """
+        grid = self.range_grid(min_percentages, max_percentages)
+        calculator = grid.pnl_calculator(value_date)
+        if calculator is None:
+            return 0.0
+
+        calculator = UniswapV3PnLGridCalculator(position=grid, start_date=calculator.start_date, end_date=calculator.end_date)
+        await self.registry.aget(self.pool_id)
+        with UniswapV3Graph.memoize():
+            return await calculator.arun()
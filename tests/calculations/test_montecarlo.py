@@ -0,0 +1,149 @@
+"""
+Module for testing Montecarlo calculations.
+"""
+import importlib.util
+from unittest import TestCase, skipUnless
+
+import numpy as np
+import pandas as pd
+
+from daxis_amm.calculations.montecarlo import MonteCarlo, brownian_bridge
+
+
+def terminal_prices(simulator, batch, price):
+    "Batch function of the parallel tests, the terminal price and batch index of every path."
+    paths = simulator.sim(price, 0.0, 0.1, 1, batch=batch)
+    return np.column_stack([paths[-1], np.full(simulator.num_sims, batch)])
+
+
+def asset_returns(simulator, batch):
+    "Batch function of the parallel tests, the terminal log return of two assets simulated in the same batch."
+    first = simulator.sim(1.0, 0.0, 0.1, 1, batch=batch)
+    second = simulator.sim(1.0, 0.0, 0.1, 1, batch=batch, stream=1)
+    return np.log(np.column_stack([first[-1], second[-1]]))
+
+
+class TestMonteCarlo(TestCase):
+    "Test the Monte Carlo simulator."
+
+    def test_sim(self):
+        paths = MonteCarlo(24, 1000, seed=1).sim(100.0, 0.0, 0.2, 1)
+        self.assertIsInstance(paths, pd.DataFrame)
+        self.assertTupleEqual(paths.shape, (24, 1000))
+        np.testing.assert_array_equal(paths.iloc[0], 100.0)
+        pd.testing.assert_frame_equal(paths, MonteCarlo(24, 1000, seed=1).sim(100.0, 0.0, 0.2, 1))
+
+    def test_matches_stepwise_paths(self):
+        simulator = MonteCarlo(5, 4, seed=2, as_frame=False)
+        paths = simulator.sim(10.0, 0.05, 0.3, 2)
+        shocks = simulator.rng().standard_normal((4, 4))
+        expected = [np.full(4, 10.0)]
+        for w in shocks:
+            expected.append(expected[-1] * (1 + 0.05 * 0.4 + 0.3 * np.sqrt(0.4) * w))
+        np.testing.assert_allclose(paths, expected, rtol=1e-12)
+
+    def test_float32_and_buffer(self):
+        simulator = MonteCarlo(24, 100, seed=3, dtype=np.float32, as_frame=False)
+        self.assertEqual(simulator.sim(1.0, 0.0, 0.1, 1).dtype, np.float32)
+
+        buffer = np.empty((24, 100), dtype=np.float32)
+        self.assertIs(simulator.sim(1.0, 0.0, 0.1, 1, out=buffer), buffer)
+        with self.assertRaises(ValueError):
+            simulator.sim(1.0, 0.0, 0.1, 1, out=np.empty((23, 100)))
+
+    def test_chunks(self):
+        simulator = MonteCarlo(24, 1000, seed=6, chunk_size=250, antithetic=True, as_frame=False)
+        chunk = simulator.batch_simulator()
+        self.assertEqual((chunk.num_sims, chunk.seed, chunk.antithetic), (250, 6, True))
+        self.assertEqual(simulator.max_batches, 4)
+        self.assertEqual(chunk.sim(1.0, 0.0, 0.1, 1, batch=2).shape, (24, 250))
+        self.assertEqual(MonteCarlo(24, 1000).batch_simulator().num_sims, 1000)
+        with self.assertRaises(ValueError):
+            MonteCarlo(24, 1000, chunk_size=300)
+        with self.assertRaises(ValueError):
+            MonteCarlo(24, 1000, chunk_size=125, antithetic=True)
+
+    def test_batch_seeds(self):
+        simulator = MonteCarlo(24, 10, seed=7)
+        child = np.random.SeedSequence(7).spawn(3)[2]
+        np.testing.assert_array_equal(simulator.rng(3).standard_normal(5), np.random.default_rng(child).standard_normal(5))
+
+    def test_streams(self):
+        simulator = MonteCarlo(24, 100, seed=7, as_frame=False)
+        returns = asset_returns(simulator, 2)
+        self.assertFalse(np.allclose(returns[:, 0], returns[:, 1]))
+        np.testing.assert_array_equal(returns, asset_returns(simulator, 2))
+        np.testing.assert_array_equal(
+            simulator.sim(1.0, 0.0, 0.1, 1, batch=2), simulator.sim(1.0, 0.0, 0.1, 1, batch=2, stream=0)
+        )
+        self.assertNotEqual(simulator.cache_key(1.0, 0.0, 0.1, 1, 2), simulator.cache_key(1.0, 0.0, 0.1, 1, 2, 1))
+
+    def test_unseeded_workers(self):
+        # Unseeded runs draw the assets of a batch independently for any number of workers.
+        for workers in (None, 2):
+            simulator = MonteCarlo(24, 8000, chunk_size=2000, as_frame=False, workers=workers)
+            returns = np.concatenate(list(simulator.map_batches(asset_returns, range(4), 2)))
+            self.assertIsNone(simulator.seed)
+            self.assertLess(abs(np.corrcoef(returns.T)[0, 1]), 0.05)
+            np.testing.assert_allclose(returns.std(axis=0), 0.1 * np.sqrt(23 / 24), rtol=0.05)
+
+    def test_map_batches(self):
+        serial = MonteCarlo(24, 600, seed=8, chunk_size=100, as_frame=False)
+        expected = list(serial.map_batches(terminal_prices, range(6), 2, 1.0))
+        for workers in (1, 2, 4):
+            simulator = MonteCarlo(24, 600, seed=8, chunk_size=100, as_frame=False, workers=workers)
+            results = list(simulator.map_batches(terminal_prices, range(6), 2, 1.0))
+            self.assertEqual(len(results), 6)
+            for result, batch in zip(results, expected):
+                np.testing.assert_array_equal(result, batch)
+        with self.assertRaises(ValueError):
+            MonteCarlo(24, 600, workers=2)
+        with self.assertRaises(ValueError):
+            MonteCarlo(24, 600, chunk_size=100, workers=0)
+
+    def test_global_random_state_is_untouched(self):
+        state = np.random.get_state()[1].copy()
+        MonteCarlo(24, 10, seed=4).sim(1.0, 0.0, 0.1, 1)
+        np.testing.assert_array_equal(np.random.get_state()[1], state)
+
+
+class TestVarianceReduction(TestCase):
+    "Test the variance reduction options of the Monte Carlo simulator."
+
+    def terminal_estimate(self, simulator):
+        paths = simulator.sim(100.0, 0.0, 0.2, 1)
+        terminal = np.asarray(paths)[-1]
+        return simulator.estimate(np.maximum(terminal - 100.0, 0.0), terminal - simulator.expected_terminal(100.0, 0.0, 1))
+
+    def test_antithetic(self):
+        paths = MonteCarlo(24, 10, seed=1, antithetic=True, as_frame=False).sim(1.0, 0.0, 0.1, 1)
+        shocks = paths[1:] / paths[:-1] - 1
+        np.testing.assert_allclose(shocks[:, :5], -shocks[:, 5:])
+        with self.assertRaises(ValueError):
+            MonteCarlo(24, 11, antithetic=True)
+
+    def test_control_variate(self):
+        _, plain = self.terminal_estimate(MonteCarlo(24, 4000, seed=1))
+        value, controlled = self.terminal_estimate(MonteCarlo(24, 4000, seed=1, control_variate=True))
+        self.assertLess(controlled, plain / 1.5)
+        # E[max(S - K, 0)] with S ~ 100 (1 + 0.2 sqrt(dt) w)^23 is about 100 * 0.2 * 0.96 / sqrt(2 pi).
+        self.assertAlmostEqual(value, 7.7, delta=0.5)
+
+    @skipUnless(importlib.util.find_spec("scipy"), "the sobol sampler requires scipy")
+    def test_sobol(self):
+        simulator = MonteCarlo(24, 4096, seed=1, sampler="sobol", as_frame=False)
+        paths = simulator.sim(1.0, 0.0, 0.1, 1)
+        np.testing.assert_array_equal(paths, simulator.sim(1.0, 0.0, 0.1, 1))
+
+        _, plain = self.terminal_estimate(MonteCarlo(24, 4096, seed=1))
+        _, sobol = self.terminal_estimate(simulator)
+        self.assertLess(sobol, plain / 2)
+        with self.assertRaises(ValueError):
+            MonteCarlo(24, 100, sampler="sobol", qmc_replicates=8)
+
+    def test_brownian_bridge(self):
+        normals = np.random.default_rng(5).standard_normal((23, 20000))
+        increments = brownian_bridge(normals)
+        np.testing.assert_allclose(increments.sum(axis=0), np.sqrt(23) * normals[0])
+        np.testing.assert_allclose(increments.std(axis=1), 1.0, atol=0.03)
+        np.testing.assert_allclose(np.corrcoef(increments)[0, 1:], 0.0, atol=0.03)
@@ -0,0 +1,51 @@
+"""
+Module for testing the cache of simulated price paths.
+"""
+import pickle
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from daxis_amm.calculations.montecarlo import MonteCarlo
+from daxis_amm.calculations.paths import PathCache
+
+
+class TestPathCache(TestCase):
+    "Test the cache of simulated price paths."
+
+    def test_lru_eviction(self):
+        cache = PathCache(max_bytes=2 * 800)
+        for key in "abc":
+            cache.put((key,), np.zeros(100))
+            cache.get(("a",))
+        self.assertEqual(list(cache.entries), [("c",), ("a",)])
+        self.assertIsNone(cache.get(("b",)))
+        self.assertEqual((cache.hits, cache.misses, cache.nbytes), (3, 1, 1600))
+        with self.assertRaises(ValueError):
+            cache.get(("a",))[0] = 1.0
+
+    def test_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = PathCache(max_bytes=0, directory=directory)
+            cache.put(("a",), np.arange(5.0))
+            self.assertEqual(len(cache), 0)
+
+            worker_cache = pickle.loads(pickle.dumps(cache))
+            paths = worker_cache.get(("a",))
+            self.assertIsInstance(paths, np.memmap)
+            np.testing.assert_array_equal(paths, np.arange(5.0))
+            self.assertFalse(paths.flags.writeable)
+
+    def test_shared_simulation(self):
+        simulator = MonteCarlo(24, 100, seed=1, as_frame=False, cache=PathCache())
+        paths = simulator.sim(10.0, 0.0, 0.2, 1)
+        self.assertIs(simulator.sim(10.0, 0.0, 0.2, 1), paths)
+        np.testing.assert_array_equal(paths, MonteCarlo(24, 100, seed=1, as_frame=False).sim(10.0, 0.0, 0.2, 1))
+        self.assertIsNot(simulator.sim(10.0, 0.0, 0.3, 1), paths)
+        self.assertIsNot(simulator.sim(10.0, 0.0, 0.2, 1, batch=1), paths)
+        self.assertEqual((simulator.cache.hits, simulator.cache.misses), (1, 3))
+
+        unseeded = MonteCarlo(24, 100, as_frame=False, cache=PathCache())
+        unseeded.sim(10.0, 0.0, 0.2, 1)
+        self.assertEqual(len(unseeded.cache), 0)
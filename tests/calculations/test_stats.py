@@ -0,0 +1,82 @@
+"""
+Module for testing streaming statistics.
+"""
+from unittest import TestCase
+
+import numpy as np
+
+from daxis_amm.calculations.stats import QuantileSketch, RunningStats, StreamingSummary
+
+
+class TestRunningStats(TestCase):
+    "Test the running mean and standard error."
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.controls = rng.standard_normal(1000)
+        self.values = 3.0 + 2.0 * self.controls + rng.standard_normal(1000)
+
+    def test_batches(self):
+        stats = RunningStats()
+        for values in np.array_split(self.values, 7):
+            stats.update(values)
+        self.assertAlmostEqual(stats.mean, self.values.mean())
+        self.assertAlmostEqual(stats.std_error, self.values.std(ddof=1) / np.sqrt(1000))
+
+    def test_control_variate(self):
+        stats = RunningStats()
+        for values, controls in zip(np.array_split(self.values, 3), np.array_split(self.controls, 3)):
+            stats.update(values, controls)
+        beta = np.cov(self.values, self.controls, bias=True)[0, 1] / self.controls.var()
+        adjusted = self.values - beta * self.controls
+        self.assertAlmostEqual(stats.mean, adjusted.mean())
+        self.assertAlmostEqual(stats.std_error, adjusted.std(ddof=1) / np.sqrt(1000))
+
+    def test_empty(self):
+        self.assertTrue(np.isnan(RunningStats().update([1.0]).std_error))
+
+
+class TestQuantileSketch(TestCase):
+    "Test the mergeable quantile sketch."
+
+    def setUp(self):
+        self.values = np.random.default_rng(1).normal(1.0, 3.0, 10000)
+
+    def test_quantiles(self):
+        sketch = QuantileSketch(0.01).update(self.values)
+        quantiles = [0.01, 0.25, 0.5, 0.75, 0.99]
+        exact = np.quantile(self.values, quantiles, method="lower")
+        np.testing.assert_allclose(sketch.quantile(quantiles), exact, rtol=0.02)
+        self.assertEqual(sketch.count, 10000)
+
+    def test_merge(self):
+        merged = QuantileSketch()
+        for values in np.array_split(self.values, 5):
+            merged.merge(QuantileSketch().update(values))
+        whole = QuantileSketch().update(self.values)
+        np.testing.assert_array_equal(merged.histogram()[0], whole.histogram()[0])
+        np.testing.assert_array_equal(merged.histogram()[1], whole.histogram()[1])
+        with self.assertRaises(ValueError):
+            merged.merge(QuantileSketch(0.05))
+
+    def test_zeros_and_empty(self):
+        sketch = QuantileSketch().update([0.0, 0.0, 0.0, np.nan, 5.0])
+        self.assertEqual(sketch.count, 4)
+        self.assertEqual(sketch.quantile(0.5), 0.0)
+        self.assertTrue(np.isnan(QuantileSketch().quantile(0.5)))
+
+
+class TestStreamingSummary(TestCase):
+    "Test the streaming summary of per path columns."
+
+    def test_chunks(self):
+        values = np.random.default_rng(2).standard_normal(1000)
+        summary = StreamingSummary(["x"])
+        for chunk in np.array_split(values, 4):
+            summary.update({"x": chunk}, {"x": (chunk, None)})
+        frame = summary.to_frame((0.5,))
+
+        self.assertEqual(summary.paths, 1000)
+        self.assertAlmostEqual(frame.loc["x", "Mean"], values.mean())
+        self.assertAlmostEqual(frame.loc["x", "Std Error"], values.std(ddof=1) / np.sqrt(1000))
+        self.assertAlmostEqual(frame.loc["x", "Q0.5"], np.median(values), delta=0.05)
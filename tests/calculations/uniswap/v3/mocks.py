@@ -1,6 +1,6 @@
 "Module for mocked graph classes."
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from daxis_amm.positions.base import BasePosition
 
@@ -9,6 +9,8 @@ from daxis_amm.positions.base import BasePosition
 class MockToken:
     "Class representing a Uniswap V3 Token."
     id: str
+    decimals: int = 18
+    symbol: str = "TEST"
 
 
 @dataclass
@@ -31,7 +33,7 @@ class MockUniswapLP(BasePosition):
     end_date: datetime
     min_percentage: float
     max_percentage: float
-    pool: MockPool = MockPool("test", 0, MockToken("test"), MockToken("test"))
+    pool: MockPool = field(default_factory=lambda: MockPool("test", 0, MockToken("test"), MockToken("test")))
 
     def tv(self, value_date, simulator, return_type):
         pass
@@ -57,3 +59,7 @@ class MockUniswapV3Graph:
     @classmethod
     def run(cls, funcs):
         return
+
+    @classmethod
+    async def gather(cls, funcs):
+        return
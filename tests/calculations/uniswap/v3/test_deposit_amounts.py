@@ -4,6 +4,8 @@ Module for testing Uniswap V3 Deposit Calculators.
 from datetime import datetime
 from unittest import TestCase, mock
 
+import numpy as np
+
 from daxis_amm.calculations.uniswap.v3.deposit_amounts import UniswapV3DepositAmountsCalculator
 from tests.calculations.uniswap.v3.mocks import MockUniswapV3Graph, MockUniswapLP
 from tests import helpers
@@ -28,14 +30,24 @@ class TestDepositAmounts(TestCase):
         }
         self.mock_calculation_value = (1.0, 1.0)
 
-    @mock.patch("daxis_amm.calculations.uniswap.v3.deposit_amounts.UniswapV3Graph", MockUniswapV3Graph)
+    @mock.patch("daxis_amm.calculations.uniswap.v3.deposit_amounts._UniswapV3Graph", MockUniswapV3Graph)
     def test_get_data(self):
         self.calculator.get_data()
 
     def test_stage_data(self):
         self.assertDictEqual(self.calculator.stage_data(self.data), self.staged_data)
 
-    @mock.patch("daxis_amm.calculations.uniswap.v3.deposit_amounts.utils.get_deposit_amounts")
+    @mock.patch("daxis_amm.calculations.uniswap.v3.deposit_amounts._utils.get_deposit_amounts")
     def test_calculate(self, mock_get_deposit_amounts):
         mock_get_deposit_amounts.return_value = self.mock_calculation_value
         self.assertTupleEqual(self.calculator.calculation(self.staged_data), self.mock_calculation_value)
+
+    def test_calculate_grid(self):
+        staged_data = dict(
+            self.staged_data, price_high=np.array([0.0007308732561641057, 0.0004]), price_low=0.0002436244187213686
+        )
+        amount0, amount1 = self.calculator.calculation(staged_data)
+        for index, price_high in enumerate(staged_data["price_high"]):
+            expected = self.calculator.calculation(dict(staged_data, price_high=price_high))
+            self.assertAlmostEqual(amount0[index], expected[0])
+            self.assertAlmostEqual(amount1[index], expected[1])
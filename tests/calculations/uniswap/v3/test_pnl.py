@@ -1,3 +1,126 @@
 """
 Module for testing Uniswap V3 PnL Calculators.
-"""
\ No newline at end of file
+"""
+import os
+from datetime import datetime
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from daxis_amm.calculations.uniswap.v3.deposit_amounts import UniswapV3DepositAmountsCalculator
+from daxis_amm.calculations.uniswap.v3.pnl import (
+    UniswapV3BacktestCalculator,
+    UniswapV3PnLCalculator,
+    UniswapV3PnLGridCalculator,
+)
+from tests import helpers
+from tests.calculations.uniswap.v3.mocks import MockPool, MockToken, MockUniswapLP
+
+START = int(datetime(2022, 5, 1).timestamp()) // 86400 * 86400
+
+
+def backtest_data(days: int = 12) -> dict:
+    "Hour, day and tick data of a USDC/WETH pool for a backtest starting at START, with a few missing hours."
+    rng = np.random.default_rng(5)
+    hours = START + 3600 * np.arange(24 * days + 1)
+    close = 2800.0 * np.exp(np.cumsum(rng.normal(0.0, 0.005, len(hours))))
+    ohlc_hour_df = pd.DataFrame(
+        {
+            "Close": close,
+            "High": close * (1 + rng.uniform(0, 0.004, len(hours))),
+            "Low": close * (1 - rng.uniform(0, 0.004, len(hours))),
+            "Open": close,
+            "psUnix": hours,
+        }
+    ).drop(index=[30, 31, 100])
+    return {
+        "token0_hour_usd_price_df": pd.DataFrame({"Close": 1 + rng.normal(0, 0.001, len(hours)), "psUnix": hours}),
+        "token1_hour_usd_price_df": pd.DataFrame({"Close": close * (1 + rng.normal(0, 0.001, len(hours))), "psUnix": hours}),
+        "ohlc_hour_df": ohlc_hour_df,
+        "ohlc_day_df": pd.DataFrame(
+            {"Date": (START + 86400 * np.arange(days + 1)).astype(float), "FeesUSD": rng.uniform(1e5, 3e5, days + 1)}
+        ),
+        "ticks_df": pd.read_csv(os.path.join(helpers.DATA_DIR, "ticks.csv.gz"), index_col=0),
+    }
+
+
+class TestPnLGrid(TestCase):
+    "Test the Uniswap v3 PnL calculator of a grid of ranges."
+
+    def setUp(self):
+        self.pool = MockPool("test", 500, MockToken("usdc", 6, "USDC"), MockToken("weth", 18, "WETH"))
+        self.staged_data = {
+            "average_liquidity": 2e16,
+            "last_price": 2900.0,
+            "usd_x": 1.0,
+            "total_fees": 500000.0,
+        }
+
+    def test_grid_calculation(self):
+        grid = MockUniswapLP("test", 10000, None, None, np.array([0.1, 0.1, 0.2]), np.array([0.1, 0.5, 0.3]), self.pool)
+        staged_data = dict(
+            self.staged_data,
+            liquidity=np.array([1e15, 5e14, 7e14]),
+            token_0_lowerprice=2800.0 * (1 - grid.min_percentage),
+            token_0_upperprice=2800.0 * (1 + grid.max_percentage),
+        )
+        result = UniswapV3PnLGridCalculator(position=grid, start_date=0, end_date=86400).calculation(staged_data)
+        self.assertEqual(list(result.index), [(0.1, 0.1), (0.1, 0.5), (0.2, 0.3)])
+
+        for row, (min_percentage, max_percentage) in enumerate(result.index):
+            position = MockUniswapLP("test", 10000, None, None, min_percentage, max_percentage, self.pool)
+            range_data = {key: value[row] if isinstance(value, np.ndarray) else value for key, value in staged_data.items()}
+            expected = UniswapV3PnLCalculator(position=position, start_date=0, end_date=86400).calculation(range_data)
+            pd.testing.assert_series_equal(result.iloc[row], expected, check_names=False)
+
+
+class TestBacktest(TestCase):
+    "Test the Uniswap v3 PnL calculator of rolling windows against the PnL calculator of every window."
+
+    def setUp(self):
+        self.pool = MockPool("test", 500, MockToken("wbtc", 6, "WBTC"), MockToken("weth", 18, "WETH"))
+        self.position = MockUniswapLP("test", 10000, None, None, 0.1, 0.2, self.pool)
+        self.data = backtest_data()
+
+    def window_pnl(self, start_date: int, end_date: int) -> pd.Series:
+        "PnL of a window, slicing the data as the Subgraph would return it."
+
+        def window(name: str, start: int, end: int, index: str = "psUnix") -> pd.DataFrame:
+            df = self.data[name]
+            return df[(df[index] >= start) & (df[index] <= end)].copy()
+
+        deposit_amounts = UniswapV3DepositAmountsCalculator(position=self.position, date=end_date)
+        deposit_data = {
+            "token0_hour_usd_price_df": window("token0_hour_usd_price_df", end_date - 3600, end_date),
+            "token1_hour_usd_price_df": window("token1_hour_usd_price_df", end_date - 3600, end_date),
+            "ohlc_hour_df": window("ohlc_hour_df", end_date - 3600, end_date),
+        }
+        data = {
+            "token0_hour_usd_price_df": window("token0_hour_usd_price_df", start_date, end_date),
+            "ohlc_hour_df": window("ohlc_hour_df", start_date, end_date),
+            "ohlc_day_df": window("ohlc_day_df", start_date, end_date, "Date"),
+            "ticks_df": self.data["ticks_df"],
+            "deposit_amounts": deposit_amounts.calculation(deposit_amounts.stage_data(deposit_data)),
+        }
+        calculator = UniswapV3PnLCalculator(position=self.position, start_date=start_date, end_date=end_date)
+        return calculator.calculation(calculator.stage_data(data))
+
+    def test_windows(self):
+        entry_dates = START + 3600 * np.arange(0, 24 * 10, 2)
+        calculator = UniswapV3BacktestCalculator(
+            position=self.position,
+            start_date=START,
+            end_date=START + 12 * 86400,
+            entry_dates=entry_dates,
+            holding_period=2 * 86400,
+        )
+        result = calculator.calculation(calculator.stage_data(self.data))
+
+        # Windows entering or exiting in a missing hour are left out.
+        missing = START + 3600 * np.array([30, 31, 100])
+        expected_dates = [date for date in entry_dates if date not in missing and date + 2 * 86400 not in missing]
+        self.assertListEqual(list(result.index), expected_dates)
+        for entry_date in expected_dates:
+            expected = self.window_pnl(entry_date, entry_date + 2 * 86400)
+            np.testing.assert_allclose(result.loc[entry_date].to_numpy(), expected.to_numpy(), rtol=1e-9)
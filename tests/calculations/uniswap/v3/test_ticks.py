@@ -0,0 +1,53 @@
+"""
+Module for testing the Uniswap V3 tick liquidity index.
+"""
+import os
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from daxis_amm.calculations.uniswap.v3 import utils
+from daxis_amm.calculations.uniswap.v3.ticks import TickLiquidityIndex
+from tests import helpers
+
+
+class TestTickLiquidityIndex(TestCase):
+    "Test the tick liquidity index against the expand_ticks DataFrame."
+
+    def setUp(self):
+        ticks_df = pd.read_csv(os.path.join(helpers.DATA_DIR, "ticks.csv.gz"), index_col=0)
+        self.expanded = utils.expand_ticks(ticks_df, 6, 18, 500)
+        self.index = TickLiquidityIndex.from_ticks(ticks_df.sample(frac=1, random_state=0), 500)
+
+    def test_size(self):
+        self.assertEqual(len(self.index), len(self.expanded))
+        self.assertLess(len(self.index.boundaries), len(self.expanded))
+
+    def test_liquidity_at(self):
+        np.testing.assert_array_equal(self.index.liquidity_at(self.expanded.index.to_numpy()), self.expanded.Liquidity.to_numpy())
+        ticks = np.array([[self.index.min_tick - 10, self.index.max_tick], [self.index.min_tick + 5, self.index.min_tick]])
+        np.testing.assert_array_equal(self.index.liquidity_at(ticks), [[0.0, 0.0], [0.0, self.expanded.Liquidity.iloc[0]]])
+
+    def test_liquidity_histogram(self):
+        rng = np.random.default_rng(4)
+        ticks = self.index.min_tick + 10 * rng.integers(-50, len(self.index) + 50, (24, 300))
+        levels, counts = self.index.liquidity_histogram(ticks)
+        self.assertEqual(counts.shape, (len(levels), 300))
+        np.testing.assert_array_equal(counts.sum(axis=0), 24)
+        for function in [np.sqrt, lambda liquidity: 1e15 / (liquidity + 1e15)]:
+            np.testing.assert_allclose(
+                function(levels) @ counts, function(self.index.liquidity_at(ticks)).sum(axis=0), rtol=1e-12
+            )
+
+    def test_range_mean(self):
+        rng = np.random.default_rng(3)
+        lows = rng.integers(self.index.min_tick - 1000, self.index.max_tick, 200)
+        highs = lows + rng.integers(-100, 20000, 200)
+        means = self.index.range_mean(lows, highs)
+        for low, high, mean in zip(lows, highs, means):
+            expected = self.expanded.Liquidity[(self.expanded.index >= low) & (self.expanded.index <= high)].mean()
+            if np.isnan(expected):
+                self.assertTrue(np.isnan(mean))
+            else:
+                self.assertAlmostEqual(mean / expected, 1.0, places=9)
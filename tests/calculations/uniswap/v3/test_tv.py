@@ -1,3 +1,222 @@
 """
 Module for testing Uniswap V3 Theoretical Value calculators.
 """
+import os
+from datetime import datetime
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from daxis_amm.calculations.montecarlo import MonteCarlo
+from daxis_amm.calculations.paths import PathCache
+from daxis_amm.calculations.uniswap.v3 import utils
+from daxis_amm.calculations.uniswap.v3.ticks import TickLiquidityIndex
+from daxis_amm.calculations.uniswap.v3.tv import (
+    UniswapV3AnalyticTVCalculator,
+    UniswapV3TVCalculator,
+    UniswapV3TVGridCalculator,
+    bridge_histogram,
+    path_matrix,
+    range_values,
+)
+from tests import helpers
+from tests.calculations.uniswap.v3.mocks import MockPool, MockToken, MockUniswapLP
+
+
+class TestTV(TestCase):
+    "Test Uniswap v3 theoretical value calculator."
+
+    def setUp(self):
+        pool = MockPool("test", 500, MockToken("usdc", 6, "USDC"), MockToken("weth", 18, "WETH"))
+        position = MockUniswapLP("test", 10000, datetime(2022, 5, 1), datetime(2022, 5, 2), 0.1, 0.1, pool)
+        self.position = position
+        self.calculator = UniswapV3TVCalculator(
+            position=position, start_date=0, value_date=86400, simulator=MonteCarlo(24, 200, seed=1)
+        )
+
+        ticks_df = pd.read_csv(os.path.join(helpers.DATA_DIR, "ticks.csv.gz"), index_col=0)
+        self.tick_index = utils.expand_ticks(ticks_df, 6, 18, 500).to_dict("index")
+        self.staged_data = {
+            "decimals": (6, 18),
+            "average_day_fees": 250000.0,
+            "tick_index": TickLiquidityIndex.from_ticks(ticks_df, 500),
+            "price_sim_params": (2800.0, 0.0, 0.02, 1),
+            "price_usd_sim_params": (1.0, 0.0, 0.001, 1),
+            "expected_terminal_price": 2800.0,
+            "liquidity": 1e15,
+            "token_0_lowerprice": 2520.0,
+            "token_0_upperprice": 3080.0,
+        }
+
+    def scalar_calculation(self, staged_data):
+        "Node by node calculation the vectorized calculation has to reproduce."
+        price_sim = self.calculator.simulator.sim(*staged_data["price_sim_params"])
+        price_usd_sim = self.calculator.simulator.sim(*staged_data["price_usd_sim_params"], stream=1)
+        staged_data = dict(staged_data, price_sim=price_sim, price_usd_sim=price_usd_sim)
+        fees, deposit_amounts_usd = [], []
+        for col in staged_data["price_sim"]:
+            col_fees = []
+            for node in staged_data["price_sim"][col]:
+                tick = utils.price_to_tick(node, 6, 18)
+                tick_liquidity = self.tick_index.get(tick - tick % 10, {}).get("Liquidity", 0.0)
+                col_fees.append(
+                    (staged_data["liquidity"] / (tick_liquidity + staged_data["liquidity"]))
+                    * staged_data["average_day_fees"]
+                    / 24
+                )
+            fees.append(sum(col_fees))
+
+            last_price = staged_data["price_sim"][col].iloc[-1]
+            x_delta, y_delta = utils.amounts_delta(
+                staged_data["liquidity"], last_price, staged_data["token_0_lowerprice"], staged_data["token_0_upperprice"], 6, 18
+            )
+            deposit_amounts_usd.append((x_delta + y_delta * last_price) * staged_data["price_usd_sim"][col].iloc[-1])
+
+        tvs = [fee + imp for imp, fee in zip(deposit_amounts_usd, fees)]
+        deviations = staged_data["price_sim"].iloc[-1].to_numpy() - staged_data["expected_terminal_price"]
+        return pd.DataFrame(
+            {"Fees USD": fees, "Deposit Amounts USD": deposit_amounts_usd, "TV": tvs, "Terminal Price Deviation": deviations}
+        )
+
+    def test_calculation(self):
+        result = self.calculator.calculation(self.staged_data)
+        assert_frame_equal(result, self.scalar_calculation(self.staged_data), check_exact=False, rtol=1e-12)
+        self.assertEqual(len(result), 200)
+
+    def test_adaptive_calculation(self):
+        self.calculator.simulator = MonteCarlo(24, 200, seed=1, antithetic=True, target_std_error=0.2, max_sims=4000)
+        result = self.calculator.calculation(self.staged_data)
+        _, std_error = self.calculator.simulator.estimate(result["TV"], result["Terminal Price Deviation"])
+
+        self.assertEqual(len(result) % 200, 0)
+        self.assertTrue(std_error <= 0.2 or len(result) == 4000)
+        self.assertGreater(len(result), 200)
+
+        self.calculator.simulator = MonteCarlo(24, 200, seed=1, time_budget=0.0)
+        self.assertEqual(len(self.calculator.calculation(self.staged_data)), 200)
+
+    def test_streaming_calculation(self):
+        self.calculator.simulator = MonteCarlo(24, 600, seed=1, chunk_size=200, control_variate=True)
+        summary = self.calculator.calculation(self.staged_data)
+        chunk = MonteCarlo(24, 200, seed=1, control_variate=True)
+        paths = pd.concat([self.calculator.path_values(self.staged_data, batch, chunk) for batch in range(3)])
+        value, std_error = chunk.estimate(paths["TV"], paths["Terminal Price Deviation"])
+
+        self.assertEqual(summary.paths, 600)
+        self.assertAlmostEqual(summary.stats["TV"].mean, value)
+        self.assertAlmostEqual(summary.stats["TV"].std_error, std_error)
+        self.assertAlmostEqual(summary.stats["Fees USD"].mean_x, paths["Fees USD"].mean())
+        self.assertAlmostEqual(summary.to_frame().loc["TV", "Q0.5"], paths["TV"].median(), delta=abs(value) * 0.05)
+
+    def test_parallel_calculation(self):
+        self.calculator.simulator = MonteCarlo(24, 600, seed=1, chunk_size=200, antithetic=True)
+        serial = self.calculator.calculation(self.staged_data).to_frame()
+        self.calculator.simulator = MonteCarlo(24, 600, seed=1, chunk_size=200, antithetic=True, workers=2)
+        assert_frame_equal(self.calculator.calculation(self.staged_data).to_frame(), serial, check_exact=True)
+
+    def test_bridge_fee_share(self):
+        def fee_share(num_steps, bridge):
+            simulator = MonteCarlo(num_steps, 5000, seed=3, as_frame=False, bridge=bridge)
+            return path_matrix(simulator, 0, self.staged_data)[:, 0].mean() / num_steps
+
+        fine = fee_share(240, False)
+        self.assertLess(abs(fee_share(24, True) - fine), abs(fee_share(24, False) - fine) / 3)
+
+    def test_bridge_fee_share_of_many_ranges(self):
+        staged_data = dict(
+            self.staged_data,
+            liquidity=np.array([1e15, 3e15, 2e14]),
+            token_0_lowerprice=np.array([2520.0, 2700.0, 2000.0]),
+            token_0_upperprice=np.array([3080.0, 2900.0, 3500.0]),
+        )
+        for vol in (0.02, 0.0):
+            simulator = MonteCarlo(24, 500, seed=3, as_frame=False, bridge=True)
+            staged_data["price_sim_params"] = (2800.0, 0.0, vol, 1)
+            price_sim = simulator.sim(*staged_data["price_sim_params"])
+            price_usd_sim = simulator.sim(*staged_data["price_usd_sim_params"], stream=1)
+            fees, _ = range_values(staged_data, simulator, price_sim, price_usd_sim)
+            for i in range(3):
+                single = dict(
+                    staged_data,
+                    liquidity=staged_data["liquidity"][i],
+                    token_0_lowerprice=staged_data["token_0_lowerprice"][i],
+                    token_0_upperprice=staged_data["token_0_upperprice"][i],
+                )
+                histogram = bridge_histogram(single, simulator, price_sim)
+                np.testing.assert_allclose(fees[i], range_values(single, simulator, price_sim, price_usd_sim, histogram)[0][0])
+            # Paths not moving between the nodes spend every step at the level of their nodes.
+            if vol == 0.0:
+                no_bridge = MonteCarlo(24, 500, seed=3, as_frame=False)
+                np.testing.assert_allclose(fees, range_values(staged_data, no_bridge, price_sim, price_usd_sim)[0])
+
+    def test_shared_paths(self):
+        self.calculator.simulator = MonteCarlo(24, 200, seed=1, cache=PathCache())
+        first = self.calculator.calculation(self.staged_data)
+        ladder = dict(self.staged_data, token_0_lowerprice=2700.0, token_0_upperprice=2900.0)
+        second = self.calculator.calculation(ladder)
+
+        self.assertEqual((self.calculator.simulator.cache.hits, self.calculator.simulator.cache.misses), (2, 2))
+        assert_frame_equal(first[["Terminal Price Deviation"]], second[["Terminal Price Deviation"]])
+
+
+class TestTVGrid(TestCase):
+    "Test the Uniswap v3 theoretical value calculator of a grid of ranges."
+
+    setUp = TestTV.setUp
+
+    def test_grid_calculation(self):
+        grid = MockUniswapLP(
+            "test", 10000, datetime(2022, 5, 1), datetime(2022, 5, 2), np.array([0.1, 0.1, 0.2]), np.array([0.1, 0.3, 0.1])
+        )
+        staged_data = dict(
+            self.staged_data,
+            liquidity=np.array([1e15, 6e14, 8e14]),
+            token_0_lowerprice=2800.0 * (1 - grid.min_percentage),
+            token_0_upperprice=2800.0 * (1 + grid.max_percentage),
+        )
+        for simulator in [MonteCarlo(24, 200, seed=1, control_variate=True), MonteCarlo(24, 200, seed=1, chunk_size=50)]:
+            calculator = UniswapV3TVGridCalculator(
+                position=grid, start_date=0, value_date=86400, simulator=simulator, ranges_per_chunk=2
+            )
+            result = calculator.calculation(staged_data)
+            self.assertEqual(list(result.index), [(0.1, 0.1), (0.1, 0.3), (0.2, 0.1)])
+            for row, (liquidity, lower, upper) in enumerate(
+                zip(staged_data["liquidity"], staged_data["token_0_lowerprice"], staged_data["token_0_upperprice"])
+            ):
+                range_data = dict(staged_data, liquidity=liquidity, token_0_lowerprice=lower, token_0_upperprice=upper)
+                batches = range(simulator.max_batches)
+                paths = np.vstack([path_matrix(simulator.batch_simulator(), batch, range_data) for batch in batches])
+                self.assertAlmostEqual(result["TV"].iloc[row], simulator.estimate(paths[:, 2], paths[:, 3])[0])
+
+
+class TestAnalyticTV(TestCase):
+    "Test the analytic Uniswap v3 theoretical value calculator against the Monte Carlo calculator."
+
+    setUp = TestTV.setUp
+
+    def analytic_and_mc(self, staged_data):
+        simulator = MonteCarlo(24, 20000, seed=2, as_frame=False)
+        analytic = UniswapV3AnalyticTVCalculator(
+            position=self.position, start_date=0, value_date=86400, simulator=simulator
+        ).calculation(staged_data)
+        self.calculator.simulator = simulator
+        return analytic, self.calculator.calculation(staged_data)
+
+    def test_analytic_calculation(self):
+        for vol, lower, upper in [(0.02, 2520.0, 3080.0), (0.1, 2700.0, 2900.0)]:
+            staged_data = dict(
+                self.staged_data, price_sim_params=(2800.0, 0.0, vol, 1), token_0_lowerprice=lower, token_0_upperprice=upper
+            )
+            analytic, paths = self.analytic_and_mc(staged_data)
+            for column in ["Fees USD", "Deposit Amounts USD", "TV"]:
+                std_error = paths[column].std() / len(paths) ** 0.5
+                self.assertAlmostEqual(analytic[column], paths[column].mean(), delta=4 * std_error)
+            self.assertAlmostEqual(analytic["Fees USD"], analytic["Fee Share"] * 24 * 250000.0 / 24)
+
+    def test_deterministic_prices(self):
+        staged_data = dict(self.staged_data, price_sim_params=(2800.0, 0.0, 0.0, 1), price_usd_sim_params=(1.0, 0.0, 0.0, 1))
+        analytic, paths = self.analytic_and_mc(staged_data)
+        for column in ["Fees USD", "Deposit Amounts USD", "TV"]:
+            self.assertAlmostEqual(analytic[column], paths[column].iloc[0], places=6)
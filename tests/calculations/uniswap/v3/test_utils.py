@@ -1,8 +1,10 @@
 """
 Module for testing Uniswap V3 utility functions.
 """
+import math
 from unittest import TestCase
 
+import numpy as np
 import pandas as pd
 from pandas.testing import assert_frame_equal
 
@@ -59,3 +61,132 @@ class TestUtils(TestCase):
 
         built_ticks = utils.expand_ticks(ticks_df, 6, 18, 500)
         assert_frame_equal(built_ticks, built_ticks_results, check_dtype=False)
+
+
+def reference_sqrt_price_x96(price, decimals_x, decimals_y):
+    return math.sqrt(1 / price * 10**decimals_y / 10**decimals_x) * 2**96
+
+
+def reference_amounts_delta(liquidity, price_current, price_low, price_high, decimals_x, decimals_y):
+    lower = reference_sqrt_price_x96(price_high, decimals_x, decimals_y)
+    upper = reference_sqrt_price_x96(price_low, decimals_x, decimals_y)
+    cprice = reference_sqrt_price_x96(price_current, decimals_x, decimals_y)
+    if lower >= cprice:
+        x_delta, y_delta = liquidity * (upper - lower) / (upper * lower / 2**96), 0.0
+    elif cprice <= upper:
+        x_delta, y_delta = liquidity * (upper - cprice) / (cprice * upper / 2**96), liquidity / 2**96 * (cprice - lower)
+    else:
+        x_delta, y_delta = 0.0, liquidity / 2**96 * (upper - lower)
+    return x_delta / 10**decimals_x, y_delta / 10**decimals_y
+
+
+def reference_calculate_liquidity(amount_x, amount_y, decimals_x, decimals_y, price_current, price_low, price_high):
+    lower = reference_sqrt_price_x96(price_high, decimals_x, decimals_y)
+    upper = reference_sqrt_price_x96(price_low, decimals_x, decimals_y)
+    cprice = reference_sqrt_price_x96(price_current, decimals_x, decimals_y)
+    amount_x, amount_y = amount_x * 10**decimals_x, amount_y * 10**decimals_y
+    if cprice <= lower:
+        return amount_x * (upper * lower / 2**96) / (upper - lower)
+    if cprice <= upper:
+        return min(amount_x * (upper * cprice / 2**96) / (upper - cprice), amount_y * 2**96 / (cprice - lower))
+    return amount_y * 2**96 / (upper - lower)
+
+
+def reference_deposit_amounts(price_current, price_low, price_high, price_usd_x, price_usd_y, target_amounts):
+    sqrt_upper, sqrt_lower, sqrt_price = math.sqrt(price_high), math.sqrt(price_low), math.sqrt(price_current)
+    delta_l = target_amounts / ((sqrt_price - sqrt_lower) * price_usd_y + (1 / sqrt_price - 1 / sqrt_upper) * price_usd_x)
+    delta_y = min(max(delta_l * (sqrt_price - sqrt_lower), 0.0), target_amounts / price_usd_y)
+    delta_x = min(max(delta_l * (1 / sqrt_price - 1 / sqrt_upper), 0.0), target_amounts / price_usd_x)
+    return delta_x, delta_y
+
+
+class TestArrayUtils(TestCase):
+    "Test the array versions of the utility functions against math based scalar implementations."
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        size = 500
+        self.price_low = rng.uniform(100, 3000, size)
+        self.price_high = self.price_low * rng.uniform(1.01, 2.0, size)
+        # Current prices below, inside and above the ranges.
+        self.price_current = rng.uniform(self.price_low * 0.5, self.price_high * 1.5)
+        self.liquidity = rng.uniform(1e12, 1e18, size)
+        self.amount_x = rng.uniform(0, 1e4, size)
+        self.amount_y = rng.uniform(0, 10, size)
+        self.price_usd_x = rng.uniform(0.5, 2, size)
+        self.price_usd_y = rng.uniform(100, 5000, size)
+        self.target_amounts = rng.uniform(1, 1e6, size)
+        self.ticks = rng.integers(-800000, 800000, size)
+
+    def assert_matches(self, arrays, reference, *args):
+        expected = np.array([reference(*values) for values in zip(*args)])
+        np.testing.assert_allclose(np.stack(arrays, axis=-1) if isinstance(arrays, tuple) else arrays, expected, rtol=1e-12)
+
+    def test_price_to_tick(self):
+        ticks = utils.price_to_tick_array(self.price_current, 6, 18)
+        expected = [math.floor(math.log(1 / price * 10**18 / 10**6) / math.log(1.0001)) for price in self.price_current]
+        np.testing.assert_array_equal(ticks, expected)
+        self.assertIsInstance(utils.price_to_tick(1000, 6, 18), int)
+
+    def test_tick_to_price(self):
+        prices = utils.tick_to_price_array(self.ticks, 6, 18)
+        np.testing.assert_allclose(prices, [1.0001**tick * 10**6 / 10**18 for tick in self.ticks], rtol=1e-9)
+
+    def test_get_sqrt_price_x96(self):
+        self.assert_matches(
+            utils.get_sqrt_price_x96_array(self.price_current, 6, 18),
+            reference_sqrt_price_x96,
+            self.price_current,
+            [6] * 500,
+            [18] * 500,
+        )
+
+    def test_amounts_delta(self):
+        self.assert_matches(
+            utils.amounts_delta_array(self.liquidity, self.price_current, self.price_low, self.price_high, 6, 18),
+            lambda *values: reference_amounts_delta(*values, 6, 18),
+            self.liquidity,
+            self.price_current,
+            self.price_low,
+            self.price_high,
+        )
+
+    def test_calculate_liquidity(self):
+        self.assert_matches(
+            utils.calculate_liquidity_array(
+                self.amount_x, self.amount_y, 6, 18, self.price_current, self.price_low, self.price_high
+            ),
+            lambda *values: reference_calculate_liquidity(values[0], values[1], 6, 18, *values[2:]),
+            self.amount_x,
+            self.amount_y,
+            self.price_current,
+            self.price_low,
+            self.price_high,
+        )
+
+    def test_get_deposit_amounts(self):
+        self.assert_matches(
+            utils.get_deposit_amounts_array(
+                self.price_current, self.price_low, self.price_high, self.price_usd_x, self.price_usd_y, self.target_amounts
+            ),
+            reference_deposit_amounts,
+            self.price_current,
+            self.price_low,
+            self.price_high,
+            self.price_usd_x,
+            self.price_usd_y,
+            self.target_amounts,
+        )
+
+    def test_broadcasting(self):
+        x_delta, y_delta = utils.amounts_delta_array(
+            1e15, self.price_current[:, None], self.price_low[:3], self.price_high[:3], 6, 18
+        )
+        self.assertTupleEqual(x_delta.shape, (500, 3))
+        self.assertEqual(
+            y_delta[10, 2], utils.amounts_delta(1e15, self.price_current[10], self.price_low[2], self.price_high[2], 6, 18)[1]
+        )
+
+    def test_nan_price(self):
+        with self.assertRaises(ValueError):
+            utils.amounts_delta(1e15, float("nan"), 1.0, 2.0, 6, 18)
@@ -0,0 +1,267 @@
+"""
+Module for testing the Base Graph.
+"""
+import asyncio
+import gc
+import os
+import re
+import tempfile
+import threading
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+import pandas as pd
+from aiohttp import web
+from graphql import parse
+
+from daxis_amm.graphs.base import BaseGraph, coalesce, run_sync
+from daxis_amm.graphs.limits import RetryPolicy
+from daxis_amm.graphs.replay import Recordings, ReplayTransport
+
+
+class MockGraph(BaseGraph):
+    "Graph answering paged queries for rows with a cursor of 0..2499 step 10."
+
+    url = "test"
+    page_size = 100
+    queries = []
+
+    @classmethod
+    async def query_gql(cls, queries):
+        cls.queries.extend(queries)
+        results = []
+        for query in queries:
+            after, until = (int(value) for value in re.findall(r"-?\d+", query))
+            rows = [{"cursor": value} for value in range(0, 2500, 10) if after < value <= until]
+            results.append({"rows": rows[: cls.page_size]})
+        return results
+
+
+class TestPagination(IsolatedAsyncioTestCase):
+    "Test cursor based pagination."
+
+    def setUp(self):
+        MockGraph.queries = []
+
+    async def test_paginate(self):
+        results = await MockGraph.paginate(lambda after: f"{after} 100000", lambda result: result["rows"], "cursor", -1)
+        rows = [row["cursor"] for result in results for row in result["rows"]]
+        self.assertListEqual(rows, list(range(0, 2500, 10)))
+        self.assertEqual(len(MockGraph.queries), 3)
+
+    async def test_paginate_short_range(self):
+        results = await MockGraph.paginate(lambda after: f"{after} 30", lambda result: result["rows"], "cursor", -1)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(len(results[0]["rows"]), 4)
+
+    async def test_paginate_range(self):
+        results = await MockGraph.paginate_range(
+            lambda after, until: f"{after} {until}", lambda result: result["rows"], "cursor", 0, 2490, 10
+        )
+        rows = [row["cursor"] for result in results for row in result["rows"]]
+        self.assertListEqual(rows, list(range(0, 2500, 10)))
+        self.assertEqual(len(MockGraph.queries), 3)
+
+
+class TestSession(IsolatedAsyncioTestCase):
+    "Test the shared client session."
+
+    async def asyncSetUp(self):
+        self.peers = set()
+        self.documents = []
+        self.statuses = []
+        # Set to hold requests until the gate opens, received is set when a held request arrives.
+        self.gate = None
+        self.received = asyncio.Event()
+
+        async def handler(request):
+            self.peers.add(request.transport.get_extra_info("peername"))
+            if self.gate is not None:
+                self.received.set()
+                await self.gate.wait()
+            if self.statuses:
+                return web.Response(status=self.statuses.pop(0), text="error")
+            self.documents.append((await request.json())["query"])
+            fields = parse(self.documents[-1]).definitions[0].selection_set.selections
+            data = {(field.alias or field.name).value: None if field.name.value == "bad" else 1 for field in fields}
+            errors = [{"message": "bad field", "path": [key]} for key, value in data.items() if value is None]
+            return web.json_response({"data": data, "errors": errors} if errors else {"data": data})
+
+        app = web.Application()
+        app.router.add_post("/", handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        self.schema_file = tempfile.NamedTemporaryFile("w", suffix=".graphql", delete=False)
+        self.schema_file.write("type Query { ok: Int bad: Int }")
+        self.schema_file.close()
+        self.graph = type(
+            "Graph",
+            (BaseGraph,),
+            {"url": f"http://127.0.0.1:{port}/", "schema_path": self.schema_file.name, "retry_policy": RetryPolicy(base_delay=0)},
+        )
+
+    async def asyncTearDown(self):
+        await self.graph.close()
+        await self.runner.cleanup()
+        os.remove(self.schema_file.name)
+
+    async def test_session_is_reused(self):
+        session = await self.graph.session()
+        first = await self.graph.query_gql(["{ok}", "{ok}"])
+        second = await self.graph.query_gql(["{ok}"])
+
+        self.assertIs(await self.graph.session(), session)
+        self.assertListEqual(list(first) + list(second), [{"ok": 1}] * 3)
+        self.assertLessEqual(len(self.peers), 2)
+
+    async def test_queries_are_batched(self):
+        results = await asyncio.gather(self.graph.query_gql(["{ok}"]), self.graph.query_gql(["{ok}", "{a: ok}"]))
+
+        self.assertListEqual([list(result) for result in results], [[{"ok": 1}], [{"ok": 1}, {"a": 1}]])
+        self.assertEqual(len(self.documents), 1)
+
+    async def test_batch_size_is_bounded(self):
+        self.graph.max_batch_queries = 2
+        results = await self.graph.query_gql(["{ok}"] * 5)
+
+        self.assertListEqual(list(results), [{"ok": 1}] * 5)
+        self.assertEqual(len(self.documents), 3)
+
+    async def test_batches_are_referenced_until_done(self):
+        self.gate = asyncio.Event()
+        query = asyncio.ensure_future(self.graph.query_gql(["{ok}", "{a: ok}"]))
+        await self.received.wait()
+        self.assertEqual(len(BaseGraph._batches), 1)
+        self.gate.set()
+        await query
+        self.assertSetEqual(BaseGraph._batches, set())
+
+    async def test_field_errors_fail_only_their_queries(self):
+        results = await asyncio.gather(
+            self.graph.query_gql(["{ok}"]),
+            self.graph.query_gql(["{bad}"]),
+            self.graph.query_gql(["{a: ok}"]),
+            return_exceptions=True,
+        )
+
+        self.assertListEqual(list(results[0]), [{"ok": 1}])
+        self.assertIsInstance(results[1], Exception)
+        self.assertIn("bad field", str(results[1].__cause__))
+        self.assertListEqual(list(results[2]), [{"a": 1}])
+        self.assertEqual(len(self.documents), 1)
+
+    async def test_transient_errors_are_retried(self):
+        self.statuses = [429, 503]
+        self.assertListEqual(list(await self.graph.query_gql(["{ok}"])), [{"ok": 1}])
+
+    async def test_client_errors_fail_fast(self):
+        self.statuses = [400, 400]
+        with self.assertRaises(Exception):
+            await self.graph.query_gql(["{ok}"])
+        self.assertListEqual(self.statuses, [400])
+
+
+class TestMergeQueries(TestCase):
+    "Test merging queries into a single aliased document."
+
+    def test_merge_queries(self):
+        document, aliases = BaseGraph.merge_queries(['{pool(id: "a"){id}}', '{pool(id: "b"){id} bundles{ethPriceUSD}}'])
+
+        fields = parse(document).definitions[0].selection_set.selections
+        self.assertListEqual([field.alias.value for field in fields], ["q0_pool", "q1_pool", "q1_bundles"])
+        self.assertListEqual(aliases, [[("q0_pool", "pool")], [("q1_pool", "pool"), ("q1_bundles", "bundles")]])
+
+
+class CountingGraph(BaseGraph):
+    "Graph counting its fetches."
+
+    url = "test"
+    calls = []
+
+    @classmethod
+    @coalesce
+    async def get_info(cls, pool_id):
+        cls.calls.append(pool_id)
+        await asyncio.sleep(0)
+        return {"pool": pool_id}
+
+    @classmethod
+    async def fetch(cls, start, end):
+        cls.calls.append((start, end))
+        return pd.DataFrame({"psUnix": list(range(start, end + 1, 3600))})
+
+
+class TestCoalescing(IsolatedAsyncioTestCase):
+    "Test single-flight and memoized fetches."
+
+    def setUp(self):
+        CountingGraph.calls = []
+
+    async def test_concurrent_calls_share_a_fetch(self):
+        results = await asyncio.gather(*[CountingGraph.get_info("a") for _ in range(3)], CountingGraph.get_info("b"))
+        self.assertListEqual(results, [{"pool": "a"}] * 3 + [{"pool": "b"}])
+        self.assertListEqual(CountingGraph.calls, ["a", "b"])
+
+        await CountingGraph.get_info("a")
+        self.assertListEqual(CountingGraph.calls, ["a", "b", "a"])
+
+    async def test_memoize(self):
+        with CountingGraph.memoize():
+            await CountingGraph.get_info("a")
+            await CountingGraph.get_info("a")
+            full = await CountingGraph.cached_series("pool_hour", "a", "psUnix", 0, 36000, 3600, CountingGraph.fetch)
+            part = await CountingGraph.cached_series("pool_hour", "a", "psUnix", 3600, 7200, 3600, CountingGraph.fetch)
+
+        self.assertListEqual(CountingGraph.calls, ["a", (0, 36000)])
+        self.assertEqual(len(full), 11)
+        self.assertListEqual(part.psUnix.tolist(), [3600, 7200])
+
+
+class TestRunSync(TestCase):
+    "Test running the async API synchronously."
+
+    def test_run(self):
+        results = CountingGraph.run({"a": CountingGraph.get_info("a"), "b": CountingGraph.get_info("b")})
+        self.assertDictEqual(results, {"a": {"pool": "a"}, "b": {"pool": "b"}})
+
+    def test_loop_is_reused(self):
+        async def loop():
+            return asyncio.get_running_loop()
+
+        self.assertIs(run_sync(loop()), run_sync(loop()))
+
+    def test_thread_loop_and_sessions_are_closed(self):
+        opened = {}
+
+        class Transport(ReplayTransport):
+            async def close(self):
+                opened["closed"] = True
+
+        transport = Transport(Recordings(tempfile.mkdtemp()))
+        graph = type(
+            "Graph", (BaseGraph,), {"url": "thread", "validate_schema": False, "transport_factory": lambda cls: transport}
+        )
+
+        async def open_session():
+            await graph.session()
+            return asyncio.get_running_loop()
+
+        thread = threading.Thread(target=lambda: opened.update(loop=run_sync(open_session())))
+        thread.start()
+        thread.join()
+        del thread
+        gc.collect()
+
+        self.assertTrue(opened["loop"].is_closed())
+        self.assertNotIn(graph, BaseGraph._sessions.get(opened["loop"], {}))
+        self.assertTrue(opened["closed"])
+
+    def test_inside_running_loop(self):
+        async def nested():
+            return run_sync(asyncio.sleep(0))
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(nested())
@@ -0,0 +1,77 @@
+"""
+Module for testing the Graph cache.
+"""
+import threading
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+import pandas as pd
+
+from daxis_amm.graphs.base import BaseGraph
+from daxis_amm.graphs.cache import GraphCache
+
+
+class TestGraphCache(TestCase):
+    "Test the SQLite Graph cache."
+
+    def setUp(self):
+        self.cache = GraphCache()
+        self.df = pd.DataFrame({"Close": [1.0, 2.0, 3.0], "psUnix": [0, 3600, 7200]})
+
+    def test_missing(self):
+        self.assertListEqual(self.cache.missing("pool_hour", "a", 0, 7200), [(0, 7200)])
+        self.cache.store("pool_hour", "a", "psUnix", 0, 3600, self.df)
+        self.assertListEqual(self.cache.missing("pool_hour", "a", 0, 7200), [(3601, 7200)])
+        self.assertListEqual(self.cache.missing("pool_hour", "b", 0, 7200), [(0, 7200)])
+
+    def test_store_merges_coverage(self):
+        self.cache.store("pool_hour", "a", "psUnix", 0, 3600, self.df)
+        self.cache.store("pool_hour", "a", "psUnix", 3601, 7200, self.df)
+        self.assertListEqual(self.cache.coverage("pool_hour", "a"), [(0, 7200)])
+        self.assertListEqual(self.cache.load("pool_hour", "a", "psUnix", 0, 7200).Close.tolist(), [1.0, 2.0, 3.0])
+
+    def test_snapshot(self):
+        self.assertIsNone(self.cache.load_snapshot("pool_ticks", "a", 60))
+        self.cache.store_snapshot("pool_ticks", "a", self.df)
+        pd.testing.assert_frame_equal(self.cache.load_snapshot("pool_ticks", "a", 60), self.df)
+        self.assertIsNone(self.cache.load_snapshot("pool_ticks", "a", -1))
+
+    def test_concurrent_stores(self):
+        df = pd.DataFrame({"Close": [float(hour) for hour in range(400)], "psUnix": list(range(400))})
+
+        def store(thread):
+            for hour in range(thread, 400, 8):
+                self.cache.store("pool_hour", "a", "psUnix", hour, hour, df)
+
+        threads = [threading.Thread(target=store, args=(thread,)) for thread in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertListEqual(self.cache.coverage("pool_hour", "a"), [(0, 399)])
+        self.assertListEqual(sorted(self.cache.load("pool_hour", "a", "psUnix", 0, 399).Close), df.Close.tolist())
+
+
+class TestCachedSeries(IsolatedAsyncioTestCase):
+    "Test the read-through time series fetch of the BaseGraph."
+
+    def setUp(self):
+        self.graph = type("Graph", (BaseGraph,), {"url": "test"})
+        self.graph.enable_cache()
+        self.calls = []
+
+    async def fetch(self, start, end):
+        self.calls.append((start, end))
+        index = list(range(start - start % 3600 + (3600 if start % 3600 else 0), end + 1, 3600))
+        return pd.DataFrame({"Close": [float(i) for i in index], "psUnix": index})
+
+    async def test_only_fetches_gaps(self):
+        first = await self.graph.cached_series("pool_hour", "a", "psUnix", 0, 36000, 3600, self.fetch)
+        second = await self.graph.cached_series("pool_hour", "a", "psUnix", 0, 72000, 3600, self.fetch)
+
+        self.assertListEqual(self.calls, [(0, 36000), (36001, 72000)])
+        self.assertListEqual(first.psUnix.tolist(), list(range(0, 36001, 3600)))
+        self.assertListEqual(second.psUnix.tolist(), list(range(0, 72001, 3600)))
+
+        await self.graph.cached_series("pool_hour", "a", "psUnix", 3600, 7200, 3600, self.fetch)
+        self.assertEqual(len(self.calls), 2)
@@ -0,0 +1,86 @@
+"""
+Module for testing the columnar decoding of Subgraph responses.
+"""
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from daxis_amm.graphs.decode import decode_pages
+from daxis_amm.graphs.uniswap.v3.graph import POOL_HOUR_COLUMNS, TICK_DAY_COLUMNS
+
+
+class TestDecodePages(TestCase):
+    "Test decoding pages of records into typed columns."
+
+    def setUp(self):
+        self.pages = [
+            {
+                "poolHourData": [
+                    {
+                        "periodStartUnix": 3600 * i,
+                        "close": str(i + 0.5),
+                        "high": "2",
+                        "low": "1",
+                        "open": "1.5",
+                        "feesUSD": "10.25",
+                    }
+                    for i in range(start, start + 3)
+                ]
+            }
+            for start in (0, 3)
+        ]
+
+    def test_decode_pages(self):
+        df = decode_pages(self.pages, lambda page: page["poolHourData"], POOL_HOUR_COLUMNS)
+        expected = pd.DataFrame(
+            [
+                [float(row["close"]), 2.0, 1.0, 1.5, 10.25, row["periodStartUnix"]]
+                for page in self.pages
+                for row in page["poolHourData"]
+            ],
+            columns=["Close", "High", "Low", "Open", "feesUSD", "psUnix"],
+        )
+        assert_frame_equal(df, expected)
+
+    def test_float32(self):
+        df = decode_pages(self.pages, lambda page: page["poolHourData"], POOL_HOUR_COLUMNS, np.float32)
+        self.assertEqual(df["Close"].dtype, np.float32)
+        self.assertEqual(df["psUnix"].dtype, np.int64)
+
+    def test_nested_fields_and_empty_pages(self):
+        pages = [
+            {"tickDayDatas": [{"tick": {"tickIdx": "-10"}, "liquidityNet": "5", "liquidityGross": "5"}]},
+            {"tickDayDatas": []},
+        ]
+        df = decode_pages(pages, lambda page: page["tickDayDatas"], TICK_DAY_COLUMNS)
+        self.assertListEqual(df["tickIdx"].tolist(), [-10])
+        self.assertListEqual(df["liquidityNet"].tolist(), [5.0])
+
+    def test_matches_per_row_decode(self):
+        pages = [
+            {
+                "poolHourData": [
+                    {
+                        "periodStartUnix": 3600 * i,
+                        "close": str(i + 0.25),
+                        "high": "2.5",
+                        "low": "1.5",
+                        "open": "2",
+                        "feesUSD": "10",
+                    }
+                    for i in range(100 * page, 100 * (page + 1))
+                ]
+            }
+            for page in range(3)
+        ]
+        rows = [row for page in pages for row in page["poolHourData"]]
+        expected = pd.DataFrame(
+            {
+                name: np.array([row[path] for row in rows], dtype=np.float64 if kind == "float" else np.int64)
+                for name, (path, kind) in POOL_HOUR_COLUMNS.items()
+            }
+        )
+
+        assert_frame_equal(decode_pages(pages, lambda page: page["poolHourData"], POOL_HOUR_COLUMNS), expected)
@@ -0,0 +1,65 @@
+"""
+Module for testing Graph request limits and retry policies.
+"""
+import asyncio
+from unittest import IsolatedAsyncioTestCase, TestCase, mock
+
+import aiohttp
+from gql.transport.exceptions import TransportQueryError, TransportServerError
+
+from daxis_amm.graphs.limits import RequestLimiter, RetryPolicy, TokenBucket
+
+
+class TestTokenBucket(TestCase):
+    "Test the token bucket."
+
+    def test_reserve(self):
+        bucket = TokenBucket(10, capacity=2)
+        waits = [bucket.reserve() for _ in range(4)]
+        self.assertListEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[2], 0.1, places=2)
+        self.assertAlmostEqual(waits[3], 0.2, places=2)
+
+
+class TestRequestLimiter(IsolatedAsyncioTestCase):
+    "Test the request limiter."
+
+    async def test_concurrency(self):
+        limiter = RequestLimiter(max_concurrency=2)
+        running = []
+
+        async def request():
+            async with limiter.limit():
+                running.append(1)
+                peak = len(running)
+                await asyncio.sleep(0.01)
+                running.pop()
+                return peak
+
+        self.assertEqual(max(await asyncio.gather(*[request() for _ in range(6)])), 2)
+
+    async def test_one_semaphore_per_loop(self):
+        limiter = RequestLimiter()
+        with mock.patch("asyncio.Semaphore", wraps=asyncio.Semaphore) as semaphore:
+            for _ in range(3):
+                async with limiter.limit():
+                    pass
+        self.assertEqual(semaphore.call_count, 1)
+        self.assertEqual(len(limiter._semaphores), 1)
+
+
+class TestRetryPolicy(TestCase):
+    "Test the retry policy."
+
+    def test_is_transient(self):
+        self.assertTrue(RetryPolicy.is_transient(TransportServerError("Too Many Requests", 429)))
+        self.assertTrue(RetryPolicy.is_transient(TransportServerError("Bad Gateway", 502)))
+        self.assertTrue(RetryPolicy.is_transient(aiohttp.ClientConnectionError()))
+        self.assertTrue(RetryPolicy.is_transient(asyncio.TimeoutError()))
+        self.assertFalse(RetryPolicy.is_transient(TransportServerError("Bad Request", 400)))
+        self.assertFalse(RetryPolicy.is_transient(TransportQueryError("Unknown field")))
+
+    def test_delay(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+        for attempt, cap in [(1, 1.0), (2, 2.0), (3, 4.0), (6, 4.0)]:
+            self.assertTrue(all(0 <= policy.delay(attempt) <= cap for _ in range(100)))
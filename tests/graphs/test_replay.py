@@ -0,0 +1,64 @@
+"""
+Module for testing recording and replaying of Subgraph responses.
+"""
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+
+from aiohttp import web
+from graphql import parse
+
+from daxis_amm.graphs.base import BaseGraph
+from daxis_amm.graphs.replay import Recordings, ReplayServer, ReplayTransport
+
+
+class TestRecordReplay(IsolatedAsyncioTestCase):
+    "Test recording responses from a server and replaying them without it."
+
+    async def asyncSetUp(self):
+        async def handler(request):
+            return web.json_response({"data": {"pool": {"id": "a"}}})
+
+        app = web.Application()
+        app.router.add_post("/", handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{self.runner.addresses[0][1]}/"
+        self.directory = tempfile.mkdtemp()
+
+    async def asyncTearDown(self):
+        await self.runner.cleanup()
+
+    async def test_record_then_replay(self):
+        recorder = type("Recorder", (BaseGraph,), {"url": self.url, "validate_schema": False})
+        recorder.record(self.directory)
+        self.assertListEqual(list(await recorder.query_gql(['{pool(id: "a"){id}}'])), [{"pool": {"id": "a"}}])
+        await recorder.close()
+        await self.runner.cleanup()
+
+        player = type("Player", (BaseGraph,), {"url": self.url, "validate_schema": False})
+        player.replay(self.directory)
+        self.assertListEqual(list(await player.query_gql(['{ pool(id: "a") { id } }'])), [{"pool": {"id": "a"}}])
+        with self.assertRaises(Exception):
+            await player.query_gql(['{pool(id: "b"){id}}'])
+        await player.close()
+
+    async def test_replay_server(self):
+        Recordings(self.directory).save(parse('{pool(id: "a"){id}}'), None, {"pool": {"id": "a"}})
+        server = ReplayServer(self.directory)
+        await server.start()
+        self.assertNotEqual(server.port, 0)
+
+        client = type("Client", (BaseGraph,), {"url": server.url, "validate_schema": False})
+        self.assertListEqual(list(await client.query_gql(['{pool(id: "a"){id}}'])), [{"pool": {"id": "a"}}])
+        self.assertEqual(server.requests, 1)
+        await client.close()
+        await server.stop()
+
+    def test_subscriptions_are_not_replayed(self):
+        with self.assertRaisesRegex(NotImplementedError, "Subscriptions cannot be replayed"):
+            ReplayTransport(Recordings(self.directory)).subscribe(parse("subscription { pool { id } }"))
+
+    def test_key_ignores_formatting(self):
+        self.assertEqual(Recordings.key('{pool(id: "a"){id}}'), Recordings.key('{\n  pool(id: "a") {\n    id\n  }\n}'))
@@ -1,23 +1,57 @@
 """
 Module for testing Uniswap V3 Graphs.
 """
+import os
 from unittest import IsolatedAsyncioTestCase
 
-from daxis_amm.graphs.uniswap.v3.graph import UniswapV3Graph
+from daxis_amm.graphs.replay import ReplayServer
+from daxis_amm.graphs.uniswap.v3.graph import UniswapV3Graph, pool_from_info
+from tests import helpers
+
+RECORDINGS = os.path.join(helpers.DATA_DIR, "recordings")
 
 
 class TestUniswapV3Graph(IsolatedAsyncioTestCase):
     """
-    Tests for Uniswap V3 Graph.
-
-    TODO: Remove dependecy external DB for testing. Introduce a MockDB.
+    Tests for Uniswap V3 Graph, answered from the recordings in tests/data/recordings.
     """
 
     def setUp(self):
-        self.graph = UniswapV3Graph
+        self.graph = type("ReplayUniswapV3Graph", (UniswapV3Graph,), {"validate_schema": False})
+        self.graph.replay(RECORDINGS)
+
+    async def asyncTearDown(self):
+        await self.graph.close()
 
     async def test_get_static_pool_info(self):
         return_value = await self.graph.get_static_pool_info("0x88e6a0c2ddd26feeb64f039a2c41296fcb3f5640")
         self.assertEqual(return_value["pool"]["id"], "0x88e6a0c2ddd26feeb64f039a2c41296fcb3f5640")
         self.assertEqual(return_value["pool"]["token0"]["decimals"], "6")
         self.assertEqual(return_value["pool"]["token1"]["symbol"], "WETH")
+
+    async def test_pool_from_info(self):
+        info = await self.graph.get_static_pool_info("0x88e6a0c2ddd26feeb64f039a2c41296fcb3f5640")
+        pool = pool_from_info(info["pool"])
+        self.assertEqual(pool.fee_tier, 500)
+        self.assertEqual(pool.token_0.decimals, 6)
+        self.assertEqual(pool.token_1.symbol, "WETH")
+
+
+class TestUniswapV3GraphOverHTTP(IsolatedAsyncioTestCase):
+    """
+    Tests for Uniswap V3 Graph against a local replay server.
+    """
+
+    async def asyncSetUp(self):
+        self.server = ReplayServer(RECORDINGS)
+        await self.server.start()
+        self.graph = type("LocalUniswapV3Graph", (UniswapV3Graph,), {"url": self.server.url, "validate_schema": False})
+
+    async def asyncTearDown(self):
+        await self.graph.close()
+        await self.server.stop()
+
+    async def test_get_static_pool_info(self):
+        return_value = await self.graph.get_static_pool_info("0x88e6a0c2ddd26feeb64f039a2c41296fcb3f5640")
+        self.assertEqual(return_value["pool"]["token1"]["symbol"], "WETH")
+        self.assertEqual(self.server.requests, 1)
@@ -0,0 +1,63 @@
+"""
+Module for testing the Uniswap V3 Pool registry.
+"""
+import os
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+
+from daxis_amm.graphs.uniswap.v3.graph import UniswapV3Graph
+from daxis_amm.graphs.uniswap.v3.registry import PoolRegistry
+
+USDC = {"id": "0xa0b8", "symbol": "USDC", "name": "USD Coin", "decimals": "6", "totalSupply": "100"}
+WETH = {"id": "0xc02a", "symbol": "WETH", "name": "Wrapped Ether", "decimals": "18", "totalSupply": "200"}
+POOLS = {
+    "0x88e6": {"id": "0x88e6", "feeTier": "500", "token0": USDC, "token1": WETH},
+    "0x8ad5": {"id": "0x8ad5", "feeTier": "3000", "token0": USDC, "token1": WETH},
+}
+
+
+class MockGraph(UniswapV3Graph):
+    "Graph answering static pool information from POOLS."
+
+    queries = []
+
+    @classmethod
+    async def get_static_pools_info(cls, pool_ids):
+        cls.queries.append(pool_ids)
+        return [POOLS[pool_id] for pool_id in pool_ids if pool_id in POOLS]
+
+
+class TestPoolRegistry(IsolatedAsyncioTestCase):
+    "Test the Pool registry."
+
+    def setUp(self):
+        MockGraph.queries = []
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "pools.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    async def test_missing_pools_are_loaded_in_bulk(self):
+        registry = PoolRegistry(graph=MockGraph)
+        pools = await registry.aload(["0x88E6", "0x8ad5", "0x88e6"])
+
+        self.assertListEqual(MockGraph.queries, [["0x88e6", "0x8ad5"]])
+        self.assertEqual(pools["0x88e6"].fee_tier, 500)
+        self.assertIs(pools["0x88e6"].token_0, pools["0x8ad5"].token_0)
+
+        await registry.aget("0x8ad5")
+        self.assertEqual(len(MockGraph.queries), 1)
+
+    async def test_unknown_pool(self):
+        with self.assertRaises(KeyError):
+            await PoolRegistry(graph=MockGraph).aget("0xdead")
+
+    async def test_persistence(self):
+        await PoolRegistry(self.path, graph=MockGraph).aload(list(POOLS))
+        registry = PoolRegistry(self.path, graph=MockGraph)
+
+        self.assertEqual(len(registry), 2)
+        self.assertEqual(registry.get("0x8ad5").token_1.decimals, 18)
+        self.assertEqual(registry.token("0xa0b8").symbol, "USDC")
+        self.assertEqual(len(MockGraph.queries), 1)
@@ -1,9 +1,12 @@
 "Helpers for unittests"
 "Unit test helper functions."
-import pickle
+import os
+
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 
 
 def read_pickle(file_name: str):
-    with open(f"/workspaces/daxis_amm/tests/data/{file_name}", "rb") as dill_file:
-        data = pickle.load(dill_file)
-    return data
+    # pandas' reader also unpickles objects pickled by older pandas versions.
+    return pd.read_pickle(os.path.join(DATA_DIR, file_name))
@@ -0,0 +1,40 @@
+"""
+Module for testing the Backtester of Uniswap V3 Liquidity Positions.
+"""
+from datetime import datetime, timedelta
+from unittest import TestCase, mock
+
+from daxis_amm.calculations.uniswap.v3.pnl import UniswapV3BacktestCalculator
+from daxis_amm.graphs.uniswap.v3.graph import pool_from_info
+from daxis_amm.graphs.uniswap.v3.registry import PoolRegistry
+from daxis_amm.positions.backtester import Backtester
+from daxis_amm.positions.uniswap_v3 import UniswapV3LP
+from tests.calculations.uniswap.v3.test_pnl import START, backtest_data
+from tests.graphs.uniswap.v3.test_registry import POOLS
+
+
+class TestBacktester(TestCase):
+    "Test the rolling backtest of a position."
+
+    def setUp(self):
+        registry = PoolRegistry()
+        registry.add(pool_from_info(POOLS["0x88e6"]))
+        self.registry = mock.patch.object(UniswapV3LP, "registry", registry)
+        self.registry.start()
+
+    def tearDown(self):
+        self.registry.stop()
+
+    def test_run(self):
+        start = datetime.fromtimestamp(START)
+        position = UniswapV3LP("0x88e6", 10000, start, start + timedelta(days=2), 0.1, 0.1)
+        entry_dates = [start + timedelta(hours=hours) for hours in (0, 30, 24, 24, 72)]
+        data = mock.AsyncMock(return_value=backtest_data())
+        with mock.patch.object(UniswapV3BacktestCalculator, "aget_data", data):
+            result = Backtester(position, entry_dates).run()
+
+        self.assertListEqual(list(result.index), entry_dates)
+        self.assertListEqual(list(result["Exit Date"]), [entry_date + timedelta(days=2) for entry_date in entry_dates])
+        self.assertTrue(result.loc[entry_dates[1]].drop("Exit Date").isna().all())
+        self.assertEqual(result.iloc[2]["PnL"], result.iloc[3]["PnL"])
+        self.assertAlmostEqual(result.iloc[0]["PnL"], result.iloc[0]["Fees USD"] + result.iloc[0]["Deposit Amounts USD"] - 10000)
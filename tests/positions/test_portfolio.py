@@ -0,0 +1,71 @@
+"""
+Module for testing the Portfolio of Uniswap V3 Liquidity Positions.
+"""
+from datetime import datetime
+from unittest import TestCase, mock
+
+import numpy as np
+
+from daxis_amm.calculations.montecarlo import MonteCarlo
+from daxis_amm.calculations.stats import RunningStats
+from daxis_amm.calculations.uniswap.v3.tv import path_matrix, portfolio_path_matrix
+from daxis_amm.positions.portfolio import Portfolio
+from daxis_amm.positions.uniswap_v3 import UniswapV3LP
+from tests.calculations.uniswap.v3 import test_tv
+
+
+class TestPortfolio(TestCase):
+    "Test the batched valuation of a portfolio."
+
+    def setUp(self):
+        test_tv.TestTV.setUp(self)
+        self.portfolio = Portfolio(
+            [
+                UniswapV3LP("0xPool", 10000, datetime(2022, 5, 1), datetime(2022, 5, 2), 0.1, 0.1),
+                UniswapV3LP("0xpool", 5000, datetime(2022, 5, 1), datetime(2022, 5, 2), 0.05, 0.2),
+                UniswapV3LP("0xpool", 5000, datetime(2022, 5, 1), datetime(2022, 5, 3), 0.1, 0.1),
+            ]
+        )
+        self.staged = [
+            self.staged_data,
+            dict(self.staged_data, liquidity=3e14, token_0_lowerprice=2660.0, token_0_upperprice=3360.0),
+            dict(self.staged_data, price_sim_params=(2800.0, 0.0, 0.02, 2), price_usd_sim_params=(1.0, 0.0, 0.001, 2)),
+        ]
+
+    def test_groups(self):
+        self.assertEqual(
+            self.portfolio.groups(),
+            {
+                ("0xpool", datetime(2022, 5, 1), datetime(2022, 5, 2)): [0, 1],
+                ("0xpool", datetime(2022, 5, 1), datetime(2022, 5, 3)): [2],
+            },
+        )
+
+    def test_portfolio_path_matrix(self):
+        simulator = MonteCarlo(24, 100, seed=1)
+        group = dict(
+            self.staged[0],
+            liquidity=np.array([1e15, 3e14]),
+            token_0_lowerprice=np.array([2520.0, 2660.0]),
+            token_0_upperprice=np.array([3080.0, 3360.0]),
+        )
+        values = portfolio_path_matrix(simulator, 0, [group])
+        for column, staged_data in enumerate(self.staged[:2]):
+            np.testing.assert_allclose(values[:, column], path_matrix(simulator, 0, staged_data)[:, 2], rtol=1e-12)
+        np.testing.assert_allclose(values[:, 2], path_matrix(simulator, 0, self.staged[0])[:, 3], rtol=1e-12)
+
+    def test_tv(self):
+        simulator = MonteCarlo(24, 100, seed=1, control_variate=True)
+        with mock.patch.object(Portfolio, "astage", mock.AsyncMock(return_value=self.staged)):
+            result = self.portfolio.tv(datetime(2022, 5, 1), simulator)
+
+        values = [path_matrix(simulator, 0, staged_data) for staged_data in self.staged]
+        for index, matrix in enumerate(values):
+            stats = RunningStats().update(*simulator.samples(matrix[:, 2], matrix[:, 3]))
+            self.assertAlmostEqual(result.loc[index, "TV"], stats.mean)
+            self.assertAlmostEqual(result.loc[index, "TV Std Error"], stats.std_error)
+
+        # The portfolio TV is adjusted by the deviations of both groups, so only the unadjusted sum is exact.
+        total = sum(matrix[:, 2] for matrix in values)
+        self.assertAlmostEqual(result.loc["Total", "TV"], total.mean(), delta=3 * result.loc["Total", "TV Std Error"])
+        self.assertEqual(list(result.index), [0, 1, 2, "Total"])
@@ -0,0 +1,101 @@
+"""
+Module for testing the Screener of Uniswap V3 Pools.
+"""
+import asyncio
+import threading
+from datetime import datetime
+from unittest import IsolatedAsyncioTestCase, TestCase, mock
+
+import numpy as np
+import pandas as pd
+
+from daxis_amm.calculations.montecarlo import MonteCarlo
+from daxis_amm.calculations.uniswap.v3 import utils
+from daxis_amm.calculations.uniswap.v3.tv import UniswapV3AnalyticTVCalculator
+from daxis_amm.graphs.uniswap.v3.registry import PoolRegistry
+from daxis_amm.positions.screener import SCREEN_COLUMNS, Screener
+from daxis_amm.positions.uniswap_v3 import UniswapV3LP
+from tests.calculations.uniswap.v3 import test_tv
+from tests.graphs.uniswap.v3.test_registry import POOLS, MockGraph
+
+
+class TopPoolsGraph(MockGraph):
+    "Graph answering the top pools by TVL from POOLS."
+
+    @classmethod
+    async def get_top_pools_info(cls, count):
+        return list(POOLS.values())[:count]
+
+
+class TestScreenerMetrics(TestCase):
+    "Test the screened metrics of a position."
+
+    def setUp(self):
+        test_tv.TestTV.setUp(self)
+
+    def test_metrics(self):
+        screener = Screener(simulator=MonteCarlo(24, 2000, seed=1))
+        analytic = UniswapV3AnalyticTVCalculator(
+            position=self.position, start_date=0, value_date=86400, simulator=screener.simulator
+        ).calculation(self.staged_data)
+        metrics = screener.metrics(self.staged_data, analytic)
+
+        self.assertListEqual(list(metrics.index), SCREEN_COLUMNS)
+        amount0, amount1 = utils.amounts_delta_array(1e15, 2800.0, 2520.0, 3080.0, 6, 18)
+        self.assertAlmostEqual(metrics["IL USD"], analytic["Deposit Amounts USD"] - float(amount0 + amount1 * 2800.0))
+        self.assertLess(metrics["IL USD"], 0.0)
+        self.assertAlmostEqual(metrics["Volatility"], np.log1p(0.02**2 / 24) ** 0.5 * 23**0.5)
+        self.assertAlmostEqual(metrics["Risk Adjusted Return"], (analytic["TV"] / 10000.0 - 1) / metrics["Volatility"])
+
+        paths = self.calculator.calculation(self.staged_data)
+        self.assertAlmostEqual(screener.metrics(self.staged_data, paths)["Fees USD"], paths["Fees USD"].mean())
+
+
+class TestScreener(IsolatedAsyncioTestCase):
+    "Test the concurrent screening of pools."
+
+    def setUp(self):
+        self.registry = mock.patch.object(UniswapV3LP, "registry", PoolRegistry(graph=TopPoolsGraph))
+        self.registry.start()
+        MockGraph.queries = []
+        self.running = self.max_running = 0
+
+    def tearDown(self):
+        self.registry.stop()
+
+    async def avalue(self, screener, pool_id, value_date):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01 * (int(pool_id[-1]) % 3))
+        self.running -= 1
+        if pool_id.endswith("7"):
+            raise ValueError("No pool data")
+        return pd.Series(dict(zip(SCREEN_COLUMNS, [0.0] * 5 + [int(pool_id[-1])])), name=pool_id)
+
+    async def test_stream(self):
+        screener = Screener(pool_ids=[f"0x{i}" for i in range(10)], max_concurrency=3)
+        with mock.patch.object(Screener, "adiscover", mock.AsyncMock(return_value=screener.pool_ids)):
+            with mock.patch.object(Screener, "avalue", lambda *args: self.avalue(*args)):
+                rankings = [ranking async for ranking in screener.astream(None)]
+
+        self.assertEqual(len(rankings), 9)
+        self.assertEqual(len(rankings[0]), 1)
+        self.assertLessEqual(self.max_running, 3)
+        self.assertListEqual(list(rankings[-1].index), [f"0x{i}" for i in [9, 8, 6, 5, 4, 3, 2, 1, 0]])
+
+    async def test_valuation_runs_off_the_event_loop(self):
+        threads = []
+        calculator = mock.Mock(aget_data=mock.AsyncMock(return_value={}))
+        calculator.stage_data.side_effect = lambda data: threads.append(threading.current_thread()) or {}
+        calculator.calculation.side_effect = lambda staged_data: threads.append(threading.current_thread())
+        with mock.patch.object(UniswapV3LP, "tv_calculator", return_value=calculator):
+            with mock.patch.object(Screener, "metrics", return_value=pd.Series(dtype=float)):
+                await Screener().avalue("0x88e6", datetime(2022, 5, 2))
+
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    async def test_discover(self):
+        self.assertListEqual(await Screener(top=1).adiscover(), ["0x88e6"])
+        self.assertEqual(UniswapV3LP.registry.pools["0x88e6"].fee_tier, 500)
+        self.assertListEqual(MockGraph.queries, [])